@@ -1,8 +1,17 @@
 import math
 import tkinter as tk
-from tkinter import ttk
-import csv
-import os
+from tkinter import filedialog, ttk
+import time
+
+import numpy as np
+
+import arm_solver
+import pose_batch
+import run_log
+import workspace_cache
+from instrumentation import LatencyStats
+from payload_envelope import payload_envelope
+from solve_scheduler import SolveScheduler
 
 class DualScenarioApp(tk.Tk):
     def __init__(self):
@@ -12,27 +21,42 @@ class DualScenarioApp(tk.Tk):
         self.geometry("1250x700")
 
         # -------------------------------------------------------
-        # 1) Define parameters (only masses, no link lengths) and motor limits
+        # 1) Parameters (only masses, no link lengths), motor limits and the
+        #    fixed link lengths all come from arm_solver
         # -------------------------------------------------------
-        self.PARAMS = [
-            {"name": "Rock Mass [kg]",      "default": 4.0,   "min": 0,   "max": 10,  "key": "rock_mass"},
-            {"name": "Link 1 Mass [kg]",    "default": 0.367,   "min": 0,   "max": 10,  "key": "m1"},
-            {"name": "Link 2 Mass [kg]",    "default": 0.44,   "min": 0,   "max": 10,  "key": "m2"},
-            {"name": "Link 3 Mass [kg]",    "default": 0.15,   "min": 0,   "max": 10,  "key": "m3"},
-            {"name": "Joint elbow Mass [kg]",   "default": 1.09, "min": 0, "max": 10,  "key": "m4"},
-            {"name": "Joint wrist Mass [kg]",   "default": 0.82, "min": 0, "max": 10,  "key": "m5"},
-        ]
-        self.MOTOR_LIMITS = [
-            {"name": "Shoulder Limit [Nm]", "default": 33.0,  "min": 0,   "max": 200, "key": "shoulder_limit"},
-            {"name": "Elbow Limit [Nm]",    "default": 21.0,   "min": 0,   "max": 100, "key": "elbow_limit"},
-        ]
-        self.L1_mm = 400
-        self.L2_mm = 450
-        self.L3_mm = 180
+        self.PARAMS = arm_solver.PARAMS
+        self.MOTOR_LIMITS = arm_solver.MOTOR_LIMITS
+        self.L1_mm, self.L2_mm, self.L3_mm = arm_solver.DEFAULT_LENGTHS_MM
+        workspace_cache.enable()
+        self.results = arm_solver.ResultCache()
         self.param_vars = {}
         self.limit_vars = {}
+        self.length_vars = {}
+        self.reach_mode = tk.StringVar(value="grid")
+        self.reach_resolution = tk.StringVar(value="default")
+        self.canvas_items = {}
+        self.canvas_inputs = {}
+        self.last_result = None
+        self.envelope = None
+        self.stats = LatencyStats()
+        self.show_timings = tk.BooleanVar(value=False)
+        self.status_after_id = None
+        self.auto_log = tk.BooleanVar(value=False)
+        self.log_format = tk.StringVar(value="csv")
+        self.run_log = None
+        self.log_check_id = None
+        self.pose_batch = None
+        self.pose_window = None
         self.row_index = 0
         self.build_ui()
+        self.scheduler = SolveScheduler(
+            self, self.solve, self.show_results, on_error=self.on_solve_error,
+            stats=self.stats, name="solve"
+        )
+        self.envelope_scheduler = SolveScheduler(
+            self, self.solve_envelope, self.show_envelope, on_error=self.on_solve_error,
+            stats=self.stats, name="envelope"
+        )
         self.update_scenarios()
     # -------------------------------------------------------------------------
     # BUILD THE GUI
@@ -66,6 +90,38 @@ class DualScenarioApp(tk.Tk):
             ent = ttk.Entry(self, textvariable=var, width=8)
             ent.grid(row=self.row_index, column=2, padx=5, pady=1)
             self.row_index += 1
+        lbl = ttk.Label(self, text="Reach Solver")
+        lbl.grid(row=self.row_index, column=0, sticky="w", padx=5, pady=1)
+        self.reach_mode.trace_add("write", self.on_var_changed)
+        mode_box = ttk.Combobox(
+            self, textvariable=self.reach_mode,
+            values=list(arm_solver.REACH_MODES), state="readonly", width=12
+        )
+        mode_box.grid(row=self.row_index, column=1, sticky="w", padx=5, pady=1)
+        # Angle step [deg] of the grid and adaptive solvers
+        self.reach_resolution.trace_add("write", self.on_var_changed)
+        ttk.Combobox(
+            self, textvariable=self.reach_resolution,
+            values=["default", "1", "0.5", "0.25", "0.1", "0.05", "0.01"],
+            state="readonly", width=7
+        ).grid(row=self.row_index, column=2, padx=5, pady=1)
+        self.row_index += 1
+        lbl = ttk.Label(self, text="Link Lengths [mm]")
+        lbl.grid(row=self.row_index, column=0, sticky="w", padx=5, pady=1)
+        lengths = ttk.Frame(self)
+        lengths.grid(row=self.row_index, column=1, sticky="w", padx=5, pady=1)
+        for key, value in zip(arm_solver.LENGTH_KEYS, (self.L1_mm, self.L2_mm, self.L3_mm)):
+            var = tk.StringVar(value=str(value))
+            self.length_vars[key] = var
+            ent = ttk.Entry(lengths, textvariable=var, width=6)
+            ent.pack(side=tk.LEFT, padx=(0, 4))
+            ent.bind("<Return>", self.apply_link_lengths)
+        ttk.Button(self, text="Apply", command=self.apply_link_lengths).grid(
+            row=self.row_index, column=2, padx=5, pady=1)
+        self.row_index += 1
+        # Payload envelope plot to the right of the inputs
+        self.canvas3 = tk.Canvas(self, width=550, height=250, bg="white")
+        self.canvas3.grid(row=0, column=3, rowspan=self.row_index, sticky="n", padx=5, pady=1)
         self.scenario1_label = ttk.Label(self, text="Scenario 1", font=("Arial", 10, "bold"))
         self.scenario1_label.grid(row=self.row_index, column=0, columnspan=3, sticky="w", pady=1)
         self.row_index += 1
@@ -73,52 +129,151 @@ class DualScenarioApp(tk.Tk):
         self.scenario2_label.grid(row=self.row_index, column=0, columnspan=3, sticky="w", pady=1)
         self.row_index += 1
         frame = ttk.Frame(self)
-        frame.grid(row=self.row_index, column=0, columnspan=3, pady=1)
+        frame.grid(row=self.row_index, column=0, columnspan=4, pady=1)
         self.canvas1 = tk.Canvas(frame, width=550, height=400, bg="white")
         self.canvas1.pack(side=tk.LEFT, padx=5)
         self.canvas2 = tk.Canvas(frame, width=550, height=400, bg="white")
         self.canvas2.pack(side=tk.LEFT, padx=5)
         self.row_index += 1
 
-        save_button = ttk.Button(self, text="Save to CSV", command=self.save_to_csv)
-        save_button.grid(row=self.row_index, column=0, columnspan=3, pady=1)
+        buttons = ttk.Frame(self)
+        buttons.grid(row=self.row_index, column=0, columnspan=4, pady=1)
+        save_button = ttk.Button(buttons, text="Log Result", command=self.log_result)
+        save_button.pack(side=tk.LEFT, padx=5)
+        ttk.Checkbutton(buttons, text="Auto-log", variable=self.auto_log).pack(
+            side=tk.LEFT, padx=5)
+        self.log_format.trace_add("write", self.close_run_log)
+        ttk.Combobox(
+            buttons, textvariable=self.log_format, values=["csv", "columnar"],
+            state="readonly", width=9
+        ).pack(side=tk.LEFT, padx=5)
+        ttk.Checkbutton(
+            buttons, text="Show timings", variable=self.show_timings,
+            command=self.toggle_status_bar
+        ).pack(side=tk.LEFT, padx=5)
+        ttk.Button(buttons, text="Dump timings", command=self.dump_timings).pack(
+            side=tk.LEFT, padx=5)
+        ttk.Button(buttons, text="Pose batch...", command=self.open_pose_batch).pack(
+            side=tk.LEFT, padx=5)
+        # Errors of the run log writer thread, which keeps going after one
+        self.log_status = ttk.Label(buttons, text="", foreground="red")
+        self.log_status.pack(side=tk.LEFT, padx=5)
         self.row_index += 1
-    # -------------------------
-    # 
-    # 
-    def save_to_csv(self):
-        """Save the current parameter and limit values to a CSV file."""
-        # Define the file name
-        file_name = "robotic_arm_data.csv"
-
-        # Collect the current values
-        data = {
-            **{key: var.get() for key, var in self.param_vars.items()},
-            **{key: var.get() for key, var in self.limit_vars.items()}
-        }
-
-        # Check if the file exists to determine if we need a header
-        file_exists = os.path.isfile(file_name)
 
-        # Write the data to the CSV file
-        with open(file_name, mode="a", newline="") as file:
-            writer = csv.writer(file)
-
-            # Write the header if the file is new
-            if not file_exists:
-                writer.writerow(data.keys())
-
-            # Write the data row
-            writer.writerow(data.values())
-
-        # Notify the user
-        print(f"Data saved to {file_name}")
+        # Latency status bar, only gridded while "Show timings" is checked
+        self.status_row = self.row_index
+        self.status_label = ttk.Label(self, text="", anchor="w")
+        self.row_index += 1
+    # -------------------------------------------------------------------------
+    # RUN LOG
+    # -------------------------------------------------------------------------
+    def get_run_log(self):
+        """
+        Open the run log in the selected format on first use; None (with the
+        error shown) if it cannot be opened.
+        """
+        if self.run_log is None:
+            try:
+                if self.log_format.get() == "columnar":
+                    sink = run_log.ColumnarRunLog()
+                else:
+                    sink = run_log.CsvRunLog()
+            except OSError as exc:
+                self.log_status.config(text=f"Run log error: {exc}")
+                return None
+            self.log_status.config(text="")
+            self.run_log = run_log.BackgroundRunLog(sink)
+            self.check_run_log()
+        return self.run_log
+
+    def show_run_log_error(self, log):
+        if log.error is not None:
+            self.log_status.config(
+                text=f"Run log error: {log.error} ({log.dropped} records not written)")
+
+    def check_run_log(self):
+        """Poll the writer thread for errors once a second while the log is open."""
+        self.log_check_id = None
+        if self.run_log is not None:
+            self.show_run_log_error(self.run_log)
+            self.log_check_id = self.after(1000, self.check_run_log)
+
+    def close_run_log(self, *args):
+        if self.log_check_id is not None:
+            self.after_cancel(self.log_check_id)
+            self.log_check_id = None
+        if self.run_log is not None:
+            log, self.run_log = self.run_log, None
+            try:
+                log.close()
+            except OSError as exc:
+                log.error = exc
+            self.show_run_log_error(log)
+
+    def log_result(self):
+        """Log the state on screen (inputs and results) and flush it."""
+        if self.last_result is None:
+            return
+        log = self.get_run_log()
+        if log is None:
+            return
+        self.show_run_log_error(log)
+        inputs, result = self.last_result
+        log.log(run_log.make_record(inputs, (self.L1_mm, self.L2_mm, self.L3_mm), result))
+        log.flush()
+        print(f"Result logged to {log.sink.location}")
 
     # ------------------------------------------------
     # EVENT: a parameter changed
     # -------------------------------------------------------------------------
     def on_var_changed(self, *args):
-        self.update_scenarios()
+        try:
+            inputs = self.read_inputs()
+        except (ValueError, tk.TclError):
+            self.show_invalid_input()
+            return
+        self.scheduler.submit(inputs)
+        self.envelope_scheduler.submit(inputs)
+
+    def on_solve_error(self, inputs, error):
+        if not isinstance(error, ValueError):
+            raise error
+        self.show_invalid_input()
+
+    def destroy(self):
+        self.scheduler.close()
+        self.envelope_scheduler.close()
+        if self.status_after_id is not None:
+            self.after_cancel(self.status_after_id)
+        self.close_run_log()
+        super().destroy()
+    # -------------------------------------------------------------------------
+    # LATENCY STATUS BAR
+    # -------------------------------------------------------------------------
+    def toggle_status_bar(self):
+        if self.show_timings.get():
+            self.status_label.grid(row=self.status_row, column=0, columnspan=4,
+                                   sticky="we", padx=5, pady=1)
+            self.refresh_status_bar()
+        else:
+            self.status_label.grid_remove()
+            if self.status_after_id is not None:
+                self.after_cancel(self.status_after_id)
+                self.status_after_id = None
+
+    def refresh_status_bar(self):
+        """Redraw the p50/p95/p99 line twice a second while it is shown."""
+        cache = self.results.info()
+        self.status_label.config(
+            text=f"{self.stats.format_status()}   |   "
+                 f"cache {cache['hits']} hits / {cache['misses']} misses"
+        )
+        self.status_after_id = self.after(500, self.refresh_status_bar)
+
+    def dump_timings(self):
+        file_name = time.strftime("latency_%Y%m%d_%H%M%S.json")
+        self.stats.dump(file_name)
+        print(f"Timings saved to {file_name}")
     # -------------------------------------------------------------------------
     # UPDATE SCENARIOS
     # -------------------------------------------------------------------------
@@ -126,167 +281,174 @@ class DualScenarioApp(tk.Tk):
         """
         - Scenario 1: Hard-coded geometry -> compute & display Shoulder/Elbow torque
         - Scenario 2: Use the (fixed) link lengths but vary angles to find max X
+
+        Runs synchronously; slider/entry changes go through self.scheduler
+        instead, which runs solve() on a worker thread.
         """
         try:
-            rock_mass = self.param_vars["rock_mass"].get()
-            m1 = self.param_vars["m1"].get()
-            m2 = self.param_vars["m2"].get()
-            m3 = self.param_vars["m3"].get()
-            m4 = self.param_vars["m4"].get()
-            m5 = self.param_vars["m5"].get()
-            shoulder_limit = self.limit_vars["shoulder_limit"].get()
-            elbow_limit    = self.limit_vars["elbow_limit"].get()
-            Ts1, Te1 = self.calculate_scenario1_torques(m1, m2, m3, m4, m5, rock_mass)
-            Ts1_abs = abs(Ts1)
-            Te1_abs = abs(Te1)
-            self.scenario1_label.config(
-                text=(
-                    f"Scenario 1: "
-                    f"Shoulder Torque = {Ts1_abs:.3f} Nm   |   "
-                    f"Elbow Torque = {Te1_abs:.3f} Nm"
-                )
-            )
+            inputs = self.read_inputs()
+            result = self.solve(inputs)
+        except (ValueError, tk.TclError):
+            self.show_invalid_input()
+            return
+        self.show_results(inputs, result)
+        self.envelope_scheduler.submit(inputs)
+
+    def read_inputs(self):
+        """Snapshot the masses, limits, reach mode and resolution (UI thread only)."""
+        inputs = {key: var.get() for key, var in self.param_vars.items()}
+        inputs.update({key: var.get() for key, var in self.limit_vars.items()})
+        inputs["mode"] = self.reach_mode.get()
+        if self.reach_resolution.get() != "default":
+            inputs["resolution_deg"] = float(self.reach_resolution.get())
+        return inputs
+
+    def solve(self, inputs):
+        """
+        Compute both scenarios for an input snapshot (arm_solver.solve_scenarios),
+        rounded to the display precision and memoized in self.results.
+        Touches no Tk state, so it is safe to call from the scheduler's worker
+        thread.
+        """
+        return self.results.solve(
+            inputs, (self.L1_mm, self.L2_mm, self.L3_mm), stats=self.stats
+        )
+
+    def apply_link_lengths(self, event=None):
+        """Read the link length entries (mm) and switch the arm to them."""
+        try:
+            lengths = [float(self.length_vars[key].get()) for key in arm_solver.LENGTH_KEYS]
+        except ValueError:
+            self.show_invalid_input()
+            return
+        if min(lengths) <= 0:
+            self.show_invalid_input()
+            return
+        if tuple(lengths) != (self.L1_mm, self.L2_mm, self.L3_mm):
+            self.set_link_lengths(*lengths)
+
+    def set_link_lengths(self, L1_mm, L2_mm, L3_mm):
+        """
+        Change the Scenario 2 link lengths. Results cached for the old
+        lengths are dropped so the cache only holds the current arm.
+        Resubmitted through the schedulers, so a solve still running for the
+        old lengths is superseded.
+        """
+        self.results.invalidate((self.L1_mm, self.L2_mm, self.L3_mm))
+        self.L1_mm, self.L2_mm, self.L3_mm = L1_mm, L2_mm, L3_mm
+        self.on_var_changed()
+
+    def show_results(self, inputs, result):
+        """Update both labels and canvases with a solve() result."""
+        Ts1_abs = abs(result["shoulder_torque"])
+        Te1_abs = abs(result["elbow_torque"])
+        self.scenario1_label.config(
+            text=(
+                f"Scenario 1: "
+                f"Shoulder Torque = {Ts1_abs:.3f} Nm   |   "
+                f"Elbow Torque = {Te1_abs:.3f} Nm"
+            ),
+            foreground=""
+        )
+        with self.stats.time("draw_scenario_fixed_points"):
             self.draw_scenario_fixed_points(self.canvas1, label="Scenario 1")
-            L1_m = self.L1_mm / 1000.0
-            L2_m = self.L2_mm / 1000.0
-            L3_m = self.L3_mm / 1000.0
-            max_x, best_t1, best_t2, best_t3 = self.find_max_X(
-                L1_m, L2_m, L3_m,
-                m1, m2, m3, m4, m5,
-                rock_mass,
-                shoulder_limit, elbow_limit
-            )
-            self.scenario2_label.config(
-                text=(f"Scenario 2 (Max X): "
-                      f"X = {max_x*1000:.1f} mm   |   "
-                      f"Angles = ({abs(math.degrees(best_t1)):.1f}°, "
-                                 f"{abs(math.degrees(best_t2)):.1f}°)")
-            )
+        max_x = result["max_x"]
+        self.scenario2_label.config(
+            text=(f"Scenario 2 (Max X, {self.mode_text(inputs)}): "
+                  f"X = {max_x*1000:.1f} mm   |   "
+                  f"Angles = ({abs(math.degrees(result['t1'])):.1f}°, "
+                             f"{abs(math.degrees(result['t2'])):.1f}°)")
+        )
+        with self.stats.time("draw_scenario"):
             self.draw_scenario(
                 self.canvas2,
-                best_t1, best_t2, best_t3,
+                result["t1"], result["t2"], result["t3"],
                 self.L1_mm, self.L2_mm, self.L3_mm,
                 label="Scenario 2",
                 highlight_distance=max_x*1000
             )
-        except ValueError:
-            self.scenario1_label.config(text="Invalid Input", foreground="red")
-            self.scenario2_label.config(text="Invalid Input", foreground="red")
+        # The result was solved from the rounded inputs (ResultCache), so
+        # keep and log those next to it
+        inputs = self.results.quantize(inputs)
+        self.last_result = (inputs, result)
+        log = self.get_run_log() if self.auto_log.get() else None
+        if log is not None:
+            log.log(run_log.make_record(
+                inputs, (self.L1_mm, self.L2_mm, self.L3_mm), result))
+        self.draw_current_envelope()
+
+    def solve_envelope(self, inputs):
+        """Payload envelope for an input snapshot (scheduler worker thread)."""
+        inputs = self.results.quantize(inputs)
+        lengths_mm = (self.L1_mm, self.L2_mm, self.L3_mm)
+        masses_limits = tuple(inputs[k] for k in arm_solver.MASS_KEYS[:5]) + (
+            inputs["shoulder_limit"], inputs["elbow_limit"])
+        return lengths_mm + masses_limits, payload_envelope(
+            *(L / 1000.0 for L in lengths_mm), *masses_limits
+        )
+
+    def show_envelope(self, inputs, envelope):
+        self.envelope = envelope
+        self.draw_current_envelope()
+
+    def draw_current_envelope(self):
+        """Draw the latest envelope with the latest (max_x, rock) marker."""
+        if self.envelope is None:
+            return
+        key, (reach_m, max_rock) = self.envelope
+        rock_mass = max_x = None
+        # No marker on the envelope of the previous arm until the new one arrives
+        if self.last_result is not None and key[:3] == (self.L1_mm, self.L2_mm, self.L3_mm):
+            inputs, result = self.last_result
+            rock_mass, max_x = inputs["rock_mass"], result["max_x"]
+        with self.stats.time("draw_envelope"):
+            self.draw_envelope(self.canvas3, key, reach_m, max_rock, rock_mass, max_x)
+
+    def show_invalid_input(self):
+        self.scenario1_label.config(text="Invalid Input", foreground="red")
+        self.scenario2_label.config(text="Invalid Input", foreground="red")
     # -------------------------------------------------------------------------
     # SCENARIO 1: DIRECT TORQUE COMPUTATION
     # -------------------------------------------------------------------------
     def calculate_scenario1_torques(self, m1, m2, m3, m4, m5, rock_mass):
         """
-        Return (ShoulderTorque, ElbowTorque) for the
-        following geometry (in cm):
-
-             O=(0,30) -- A=... -- B=(40,18) -- E=(40,0)
-
-        We'll treat:
-         - Link1 mass at midpoint of O->A
-         - Link2 mass at midpoint of A->B
-         - Link3 mass at midpoint of B->E
-         - Elbow-joint mass at A
-         - Wrist-joint mass at B
-         - Rock at E
-
-        Then:
-         - Shoulder pivot = O
-         - Elbow pivot = A
+        Return (ShoulderTorque, ElbowTorque) for the reference pose
+        (arm_solver.SCENARIO1_POSE). Its lever arms are precomputed in
+        arm_solver, so this is a single dot product with the masses.
         """
-        g = 9.87
-        Ox, Oy = (0.0, 30.0)
-        Ax, Ay = (
-            (6595.0 / 436.0) + (27.0  * math.sqrt(116319.0) / 872.0),
-            (22203.0 / 872.0) + (45.0 * math.sqrt(116319.0) / 436.0)
+        return arm_solver.calculate_scenario1_torques(
+            m1, m2, m3, m4, m5, rock_mass
         )
-        Bx, By = (40.0, 18.0)
-        Ex, Ey = (40.0,  0.0)
-        def cm_to_m(c): return 0.01 * c
-        O_m = (cm_to_m(Ox), cm_to_m(Oy))
-        A_m = (cm_to_m(Ax), cm_to_m(Ay))
-        B_m = (cm_to_m(Bx), cm_to_m(By))
-        E_m = (cm_to_m(Ex), cm_to_m(Ey))
-        link1_mid = ((O_m[0] + A_m[0]) / 2.0, (O_m[1] + A_m[1]) / 2.0)
-        link2_mid = ((A_m[0] + B_m[0]) / 2.0, (A_m[1] + B_m[1]) / 2.0)
-        link3_mid = ((B_m[0] + E_m[0]) / 2.0, (B_m[1] + E_m[1]) / 2.0)
-        elbow_pos = A_m
-        wrist_pos = B_m
-        rock_pos = E_m
-        T_shoulder = 0.0
-        for (mx, my, mass) in [
-            (link1_mid[0], link1_mid[1], m1),
-            (link2_mid[0], link2_mid[1], m2),
-            (link3_mid[0], link3_mid[1], m3),
-            (elbow_pos[0], elbow_pos[1], m4),
-            (wrist_pos[0], wrist_pos[1], m5),
-            (rock_pos[0],  rock_pos[1],  rock_mass),
-        ]:
-            rx = mx - O_m[0]
-            ry = my - O_m[1]
-            Fx = 0.0
-            Fy = -mass * g
-            torque_i = rx * Fy - ry * Fx
-            T_shoulder += torque_i
-        T_elbow = 0.0
-        for (mx, my, mass) in [
-            (link2_mid[0], link2_mid[1], m2),
-            (link3_mid[0], link3_mid[1], m3),
-            (wrist_pos[0], wrist_pos[1], m5),
-            (rock_pos[0],  rock_pos[1],  rock_mass),
-        ]:
-            rx = mx - A_m[0]
-            ry = my - A_m[1]
-            Fx = 0.0
-            Fy = -mass * g
-            torque_i = rx * Fy - ry * Fx
-            T_elbow += torque_i
-        return (T_shoulder, T_elbow)
 
     # -------------------------------------------------------------------------
     # SCENARIO 2: FIND MAX X
     # -------------------------------------------------------------------------
+    def mode_text(self, inputs):
+        """The reach mode, with its angle step unless it is continuous."""
+        resolution = arm_solver.reach_resolution(inputs["mode"], inputs.get("resolution_deg"))
+        return inputs["mode"] if resolution is None else f"{inputs['mode']} {resolution:g}°"
+
     def find_max_X(self, L1_m, L2_m, L3_m,
                    m1, m2, m3, m4, m5, rock_mass,
-                   shoulder_limit, elbow_limit):
+                   shoulder_limit, elbow_limit, mode="grid", resolution_deg=None):
         """
-        Brute-force search for angles that produce the largest end-effector X
+        Search for angles that produce the largest end-effector X
         subject to:
-          - B (the end of link2) is at y=0.18 m
-          - Link3 is straight down => theta3 = -90°
-          - E is then at y=0
+          - B (the end of link2) is at y=0.12 m
+          - Link3 is straight down => theta3 = 90°
           - The joint torques must not exceed (shoulder_limit, elbow_limit).
+
+        mode "grid" is the 1° search (lever arms cached per link length in
+        arm_solver); mode "continuous" solves the yB constraint exactly;
+        mode "adaptive" returns the 0.01° grid answer by coarse-to-fine
+        refinement. ``resolution_deg`` changes the grid step of "grid" and
+        "adaptive".
         """
-        max_x = 0.0
-        best_t1 = 0.0
-        best_t2 = 0.0
-        best_t3 = 0.0
-        t3 = math.radians(90)
-        for t1_deg in range(-90,30):
-            for t2_deg in range(0, 271):
-                t1 = math.radians(t1_deg)
-                t2 = math.radians(t2_deg)
-                yB = L1_m * math.sin(t1) + L2_m * math.sin(t1 + t2)
-                if abs(yB - 0.12) < 0.001:
-                    Ts, Te = self.calculate_torques(
-                        t1, t2, t3,
-                        L1_m, L2_m, L3_m,
-                        m1, m2, m3,
-                        m4, m5,
-                        rock_mass
-                    )
-                    if (abs(Ts) <= shoulder_limit) and (abs(Te) <= elbow_limit):
-                        x_end = (
-                            L1_m * math.cos(t1)
-                            + L2_m * math.cos(t1 + t2)
-                            + L3_m * math.cos(t3)
-                        )
-                        if x_end > max_x:
-                            max_x = x_end
-                            best_t1 = t1
-                            best_t2 = t2
-                            best_t3 = t3
-        return max_x, best_t1, best_t2, best_t3
+        return arm_solver.find_max_x(
+            L1_m, L2_m, L3_m,
+            m1, m2, m3, m4, m5, rock_mass,
+            shoulder_limit, elbow_limit, mode=mode, resolution_deg=resolution_deg
+        )
 
     # -------------------------------------------------------------------------
     # TORQUE CALCULATION (for scenario2)
@@ -294,107 +456,41 @@ class DualScenarioApp(tk.Tk):
     def calculate_torques(self, theta1, theta2, theta3,
                         L1_m, L2_m, L3_m,
                         m1, m2, m3, m4, m5, rock_mass):
-        """
-        Approx torque at shoulder (Ts) & elbow (Te), 
-        now including the elbow mass (m4) at the elbow pivot
-        and the wrist mass (m5) at the wrist pivot,
-        plus the rock at the end.
-
-        Pivot layout in scenario2 (standard 2D):
-        - Shoulder pivot at (0,0)
-        - Elbow pivot at (Xel, Yel) = end of link1
-        - Wrist pivot at (Xwr, Ywr) = end of link2
-        """
-        g = 9.87
-
-        x1 = (L1_m/2) * math.cos(theta1)
-        y1 = (L1_m/2) * math.sin(theta1)
-        F1 = m1*g
-        x2 = (L1_m * math.cos(theta1) +
-            (L2_m/2)*math.cos(theta1 + theta2))
-        y2 = (L1_m * math.sin(theta1) +
-            (L2_m/2)*math.sin(theta1 + theta2))
-        F2 = m2*g
-        x3 = (L1_m * math.cos(theta1) +
-            L2_m * math.cos(theta1 + theta2) +
-            (L3_m/2)*math.cos(theta3))
-        y3 = (L1_m * math.sin(theta1) +
-            L2_m * math.sin(theta1 + theta2) +
-            (L3_m/2)*math.sin(theta3))
-        F3 = m3*g
-
-        # ---------------------------
-        # Joint masses
-        # ---------------------------
-        x_elbow = L1_m * math.cos(theta1)
-        y_elbow = L1_m * math.sin(theta1)
-        F4 = m4*g
-        x_wrist = (L1_m * math.cos(theta1) +
-                L2_m * math.cos(theta1 + theta2))
-        y_wrist = (L1_m * math.sin(theta1) +
-                L2_m * math.sin(theta1 + theta2))
-        F5 = m5*g
-        # ---------------------------
-        # Rock at end
-        # ---------------------------
-        xr = (L1_m * math.cos(theta1) +
-            L2_m * math.cos(theta1 + theta2) +
-            L3_m * math.cos(theta3))
-        yr = (L1_m * math.sin(theta1) +
-            L2_m * math.sin(theta1 + theta2) +
-            L3_m * math.sin(theta3))
-        Fr = rock_mass*g
-        def torque_shoulder(x, y, mass_g):
-            return x * (-mass_g)
-        Ts = 0.0
-        Ts += torque_shoulder(x1, y1, F1)
-        Ts += torque_shoulder(x2, y2, F2)
-        Ts += torque_shoulder(x3, y3, F3)
-        Ts += torque_shoulder(x_elbow, y_elbow, F4)
-        Ts += torque_shoulder(x_wrist, y_wrist, F5)
-        Ts += torque_shoulder(xr, yr, Fr)
-
-        # ---------------------------
-        # Elbow torque (about end of link1 = (x_elbow, y_elbow))
-        # We only sum link2, link3, wrist, rock masses (and possibly elbow mass 
-        # if it's not exactly at the pivot, but we assume it is).
-        # ---------------------------
-        def torque_elbow(x, y, pivot_x, pivot_y, mass_g):
-            rx = x - pivot_x
-            ry = y - pivot_y
-            return rx * (-mass_g)
-
-        Te = 0.0
-        # link2 midpoint
-        Te += torque_elbow(x2, y2, x_elbow, y_elbow, F2)
-        # link3 midpoint
-        Te += torque_elbow(x3, y3, x_elbow, y_elbow, F3)
-        # wrist mass
-        Te += torque_elbow(x_wrist, y_wrist, x_elbow, y_elbow, F5)
-        # rock
-        Te += torque_elbow(xr, yr, x_elbow, y_elbow, Fr)
-
-        return Ts, Te
+        """Approx torque at shoulder (Ts) & elbow (Te); see arm_solver."""
+        return arm_solver.calculate_torques(
+            theta1, theta2, theta3,
+            L1_m, L2_m, L3_m,
+            m1, m2, m3, m4, m5, rock_mass
+        )
 
     # -------------------------------------------------------------------------
     # DRAW SCENARIO 1: FIXED FOUR POINTS
     # -------------------------------------------------------------------------
-    def draw_scenario_fixed_points(self, canvas, label=""):
+    def draw_scenario_fixed_points(self, canvas, label="", points=None):
         """
-        Hard-code the 4 points in cm:
-           Origin = (0, 30)
-           A = ...
-           B = (40, 18)
-           End = (40, 0)
+        Draw the 4 points O (Origin), A, B, End of a Scenario 1 pose in cm,
+        by default the reference pose (arm_solver.scenario1_points()).
+
+        The canvas is retained: items are created on the first call and
+        only moved afterwards, and nothing is touched while the inputs are
+        unchanged (which, for the reference pose, is every later call).
         """
-        canvas.delete("all")
-        self.draw_grid_and_axes(canvas, 550, 400, 0, 400, spacing=50)
-        canvas.create_text(10, 10, text=label, anchor="nw", font=("Arial",12,"bold"))
-        Ox, Oy = (0.0, 30.0)
-        Ax = (6595.0/436.0) + (27.0  * math.sqrt(116319.0) / 872.0)
-        Ay = (22203.0/872.0) + (45.0 * math.sqrt(116319.0) / 436.0)
-        Bx, By = (40.0, 18.0)
-        Ex, Ey = (40.0,  0.0)
+        if points is None:
+            points = arm_solver.scenario1_points()
+        if not self.canvas_changed(canvas, (label, points)):
+            return
+        items = self.canvas_items.get(canvas)
+        if items is None:
+            self.draw_grid_and_axes(canvas, 550, 400, 0, 400, spacing=50)
+            items = self.canvas_items[canvas] = {
+                "title": canvas.create_text(10, 10, anchor="nw", font=("Arial",12,"bold")),
+                "links": [canvas.create_line(0, 0, 0, 0, width=4, fill=color)
+                          for color in ("blue", "green", "red")],
+                "joints": [canvas.create_oval(0, 0, 0, 0, fill="black") for _ in range(4)],
+                "names": [canvas.create_text(0, 0, text=name, anchor="w", fill="blue")
+                          for name in ("Origin", "A", "B", "End")],
+            }
+        canvas.itemconfig(items["title"], text=label)
         scale = 6.0
         offset_x = 60
         offset_y = 350
@@ -402,20 +498,146 @@ class DualScenarioApp(tk.Tk):
             cx = offset_x + x_cm * scale
             cy = offset_y - y_cm * scale
             return (cx, cy)
-        Opx, Opy = to_canvas(Ox, Oy)
-        Apx, Apy = to_canvas(Ax, Ay)
-        Bpx, Bpy = to_canvas(Bx, By)
-        Epx, Epy = to_canvas(Ex, Ey)
-        canvas.create_line(Opx, Opy, Apx, Apy, width=4, fill="blue")
-        canvas.create_line(Apx, Apy, Bpx, Bpy, width=4, fill="green")
-        canvas.create_line(Bpx, Bpy, Epx, Epy, width=4, fill="red")
-        for (xx, yy) in [(Opx, Opy), (Apx, Apy), (Bpx, Bpy), (Epx, Epy)]:
-            r = 4
-            canvas.create_oval(xx-r, yy-r, xx+r, yy+r, fill="black")
-        canvas.create_text(Opx+10, Opy, text="Origin", anchor="w", fill="blue")
-        canvas.create_text(Apx+10, Apy, text="A",      anchor="w", fill="blue")
-        canvas.create_text(Bpx+10, Bpy, text="B",      anchor="w", fill="blue")
-        canvas.create_text(Epx+10, Epy, text="End",    anchor="w", fill="blue")
+        pixels = [to_canvas(x, y) for (x, y) in points]
+        for link, (p, q) in zip(items["links"], zip(pixels, pixels[1:])):
+            canvas.coords(link, *p, *q)
+        r = 4
+        for joint, name, (xx, yy) in zip(items["joints"], items["names"], pixels):
+            canvas.coords(joint, xx-r, yy-r, xx+r, yy+r)
+            canvas.coords(name, xx+10, yy)
+
+    # -------------------------------------------------------------------------
+    # POSE BATCH (SCENARIO 1)
+    # -------------------------------------------------------------------------
+    # Rows listed in the window at most; Export CSV writes all of them
+    POSE_BATCH_ROWS = 5000
+
+    def open_pose_batch(self):
+        """
+        Window for a pose table x mass-set table (pose_batch.PoseBatch).
+        Selecting a row draws that pose in the Scenario 1 canvas from the
+        stored torques; the next input change shows the reference pose again.
+        """
+        if self.pose_window is not None and self.pose_window.winfo_exists():
+            self.pose_window.lift()
+            return
+        window = self.pose_window = tk.Toplevel(self)
+        window.title("Scenario 1 Pose Batch")
+        self.pose_paths = {"poses": None, "masses": None}
+        self.violations_only = tk.BooleanVar(value=False)
+        bar = ttk.Frame(window)
+        bar.pack(side=tk.TOP, fill=tk.X, padx=5, pady=2)
+        ttk.Button(bar, text="Poses...",
+                   command=lambda: self.choose_pose_table("poses")).pack(side=tk.LEFT, padx=5)
+        ttk.Button(bar, text="Mass sets...",
+                   command=lambda: self.choose_pose_table("masses")).pack(side=tk.LEFT, padx=5)
+        ttk.Checkbutton(bar, text="Violations only", variable=self.violations_only,
+                        command=self.fill_pose_table).pack(side=tk.LEFT, padx=5)
+        ttk.Button(bar, text="Export CSV...", command=self.export_pose_batch).pack(
+            side=tk.LEFT, padx=5)
+        self.pose_status = ttk.Label(window, text="Load a pose table (CSV)", anchor="w")
+        self.pose_status.pack(side=tk.TOP, fill=tk.X, padx=5, pady=2)
+        columns = ("pose", "mass_set", "shoulder", "elbow", "limits")
+        tree = self.pose_tree = ttk.Treeview(window, columns=columns, show="headings", height=20)
+        for column, heading in zip(columns, ("Pose", "Mass set", "Shoulder [Nm]",
+                                             "Elbow [Nm]", "Limits")):
+            tree.heading(column, text=heading)
+            tree.column(column, width=110, anchor="e" if column in ("shoulder", "elbow") else "w")
+        tree.tag_configure("over", foreground="red")
+        tree.bind("<<TreeviewSelect>>", self.on_pose_row_selected)
+        scroll = ttk.Scrollbar(window, orient=tk.VERTICAL, command=tree.yview)
+        tree.configure(yscrollcommand=scroll.set)
+        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(5, 0), pady=2)
+        scroll.pack(side=tk.LEFT, fill=tk.Y, pady=2)
+
+    def choose_pose_table(self, which):
+        path = filedialog.askopenfilename(
+            parent=self.pose_window, filetypes=[("CSV", "*.csv"), ("All files", "*")])
+        if path:
+            self.pose_paths[which] = path
+            self.load_pose_batch()
+
+    def load_pose_batch(self):
+        """Evaluate the tables; the current inputs fill in missing mass columns."""
+        if self.pose_paths["poses"] is None:
+            return
+        try:
+            defaults = self.read_inputs()
+            with self.stats.time("pose_batch"):
+                self.pose_batch = pose_batch.load_batch(
+                    self.pose_paths["poses"], self.pose_paths["masses"], defaults)
+        except (OSError, ValueError, tk.TclError) as exc:
+            self.pose_status.config(text=str(exc), foreground="red")
+            return
+        self.fill_pose_table()
+
+    def fill_pose_table(self):
+        batch = self.pose_batch
+        if batch is None:
+            return
+        tree = self.pose_tree
+        tree.delete(*tree.get_children())
+        # Unreachable poses are flagged (and listed) along with the violations
+        flagged = (batch.violations | ~batch.reachable[:, None]).ravel()
+        rows = np.flatnonzero(flagged) if self.violations_only.get() else np.arange(len(batch))
+        shown = rows[:self.POSE_BATCH_ROWS]
+        for i in shown.tolist():
+            row = batch.row(i)
+            tree.insert("", tk.END, iid=str(i), tags=("over",) if flagged[i] else (),
+                        values=(row["pose_name"], row["set_name"],
+                                f"{abs(row['shoulder_torque']):.3f}",
+                                f"{abs(row['elbow_torque']):.3f}",
+                                self.limits_text(row)))
+        summary = batch.summary()
+        text = (f"{summary['poses']} poses x {summary['mass_sets']} mass sets: "
+                f"{summary['violations']} over a limit, "
+                f"{summary['safe_poses']} poses within limits for every set")
+        if summary["unreachable_poses"]:
+            text += f", {len(summary['unreachable_poses'])} out of reach"
+        if len(shown) < len(rows):
+            text += f"   (listing {len(shown)} of {len(rows)})"
+        self.pose_status.config(text=text, foreground="")
+
+    @staticmethod
+    def limits_text(row):
+        if not row["reachable"]:
+            return "out of reach"
+        over = [joint for joint in ("shoulder", "elbow") if row[f"{joint}_over"]]
+        return " + ".join(over) + " over" if over else "ok"
+
+    def on_pose_row_selected(self, event=None):
+        """Show the selected row's stored torques and pose (no solve)."""
+        selection = self.pose_tree.selection()
+        if not selection or self.pose_batch is None:
+            return
+        row = self.pose_batch.row(int(selection[0]))
+        if not row["reachable"]:
+            self.scenario1_label.config(
+                text=f"Scenario 1 ({row['pose_name']}): wrist out of reach",
+                foreground="red")
+            return
+        self.scenario1_label.config(
+            text=(
+                f"Scenario 1 ({row['pose_name']}, {row['set_name']}): "
+                f"Shoulder Torque = {abs(row['shoulder_torque']):.3f} Nm   |   "
+                f"Elbow Torque = {abs(row['elbow_torque']):.3f} Nm"
+            ),
+            foreground="red" if row["shoulder_over"] or row["elbow_over"] else ""
+        )
+        with self.stats.time("draw_scenario_fixed_points"):
+            self.draw_scenario_fixed_points(
+                self.canvas1, label=f"Pose {row['pose_name']}",
+                points=self.pose_batch.points(row["pose"]))
+
+    def export_pose_batch(self):
+        if self.pose_batch is None:
+            return
+        path = filedialog.asksaveasfilename(
+            parent=self.pose_window, defaultextension=".csv",
+            initialfile="pose_torques.csv", filetypes=[("CSV", "*.csv")])
+        if path:
+            self.pose_batch.write_csv(path)
+            print(f"Pose batch saved to {path}")
 
     # -------------------------------------------------------------------------
     # DRAW SCENARIO 2
@@ -434,15 +656,31 @@ class DualScenarioApp(tk.Tk):
                       label="", highlight_distance=None):
         """
         Draw an arm with angles (t1,t2,t3) using the fixed link lengths.
-        """
-        canvas.delete("all")
-        self.draw_grid_and_axes(canvas, 550, 400, 300, 300, spacing=50)
-
-        canvas.create_text(10, 10, text=label, anchor="nw", font=("Arial",12,"bold"))
 
+        Like draw_scenario_fixed_points, the grid and items are created once
+        and then moved with coords/itemconfig; unchanged inputs are a no-op.
+        """
+        if not self.canvas_changed(
+                canvas, (t1, t2, t3, L1_mm, L2_mm, L3_mm, label, highlight_distance)):
+            return
         scale = 200
         bx, by = 300, 300
 
+        items = self.canvas_items.get(canvas)
+        if items is None:
+            self.draw_grid_and_axes(canvas, 550, 400, bx, by, spacing=50)
+            items = self.canvas_items[canvas] = {
+                "title": canvas.create_text(10, 10, anchor="nw", font=("Arial",12,"bold")),
+                "links": [canvas.create_line(0, 0, 0, 0, width=4, fill=color)
+                          for color in ("blue", "green", "red")],
+                "joints": [canvas.create_oval(0, 0, 0, 0, fill="black") for _ in range(4)],
+                "coords": [canvas.create_text(0, 0, anchor="w", fill="blue", font=("Arial",8))
+                           for _ in range(4)],
+                "angles": canvas.create_text(bx+80, by-250, fill="blue", anchor="w"),
+                "distance": canvas.create_text(10, 30, anchor="nw", fill="maroon"),
+            }
+        canvas.itemconfig(items["title"], text=label)
+
         L1_m = L1_mm/1000.0
         L2_m = L2_mm/1000.0
         L3_m = L3_mm/1000.0
@@ -457,36 +695,119 @@ class DualScenarioApp(tk.Tk):
         x3 = x2 + scale * L3_m * math.cos(t3)
         y3 = y2 + scale * L3_m * math.sin(t3)
 
-        # Draw links
-        canvas.create_line(bx, by, x1, y1, width=4, fill="blue")
-        canvas.create_line(x1, y1, x2, y2, width=4, fill="green")
-        canvas.create_line(x2, y2, x3, y3, width=4, fill="red")
+        # Move links
+        pixels = [(bx, by), (x1, y1), (x2, y2), (x3, y3)]
+        for link, (p, q) in zip(items["links"], zip(pixels, pixels[1:])):
+            canvas.coords(link, *p, *q)
 
-        # Draw joints
+        # Move joints
         r = 5
-        points = [
-            ("O",   (bx,  by)),
-            ("A", (x1, y1)),
-            ("B", (x2, y2)),
-            ("E",    (x3, y3)),
-        ]
-        for name, (xx, yy) in points:
-            canvas.create_oval(xx-r, yy-r, xx+r, yy+r, fill="black")
+        names = ["O", "A", "B", "E"]
+        for joint, text, name, (xx, yy) in zip(items["joints"], items["coords"], names, pixels):
+            canvas.coords(joint, xx-r, yy-r, xx+r, yy+r)
             rx_mm = -((300 - xx) / 200)*1000
- 
+
             ry_mm = -((yy - 300) / 200)*1000+300
 
             coords_label = f"{name}\n({rx_mm:.1f}mm, {ry_mm:.1f}mm)"
-            canvas.create_text(xx+10, yy-50, text=coords_label, anchor="w", fill="blue", font=("Arial",8))
+            canvas.coords(text, xx+10, yy-50)
+            canvas.itemconfig(text, text=coords_label)
         shoulder_deg = math.degrees(t1)
         elbow_deg    = math.degrees(t2)
         angle_text = f"Shoulder={abs(shoulder_deg):.1f}°, Elbow={abs(elbow_deg):.1f}°"
-        canvas.create_text(bx+80, by-250, text=angle_text, fill="blue", anchor="w")
+        canvas.itemconfig(items["angles"], text=angle_text)
 
         if highlight_distance is not None:
-            canvas.create_text(10, 30,
-                               text=f"Distance = {highlight_distance:.1f} mm",
-                               anchor="nw", fill="maroon")
+            canvas.itemconfig(items["distance"], state="normal",
+                              text=f"Distance = {highlight_distance:.1f} mm")
+        else:
+            canvas.itemconfig(items["distance"], state="hidden")
+
+    def canvas_changed(self, canvas, inputs):
+        """Record ``inputs`` for ``canvas``; False if they match the last draw."""
+        if self.canvas_inputs.get(canvas) == inputs:
+            return False
+        self.canvas_inputs[canvas] = inputs
+        return True
+
+    # -------------------------------------------------------------------------
+    # DRAW PAYLOAD ENVELOPE
+    # -------------------------------------------------------------------------
+    def draw_envelope(self, canvas, key, reach_m, max_rock,
+                      rock_mass=None, max_x=None):
+        """
+        Plot the heaviest rock vs. reach (payload_envelope) and mark the
+        current rock mass and its max reach. ``key`` (the link lengths in mm,
+        then the masses and limits) identifies the envelope so unchanged
+        inputs skip the redraw; the reach axis spans the envelope's own
+        L1+L2+L3 and is redrawn when that changes. Rock masses are clipped to
+        the rock slider's range.
+        """
+        if not self.canvas_changed(canvas, (key, rock_mass, max_x)):
+            return
+        width, height = 550, 250
+        left, right, top, bottom = 50, 15, 25, 30
+        x_max_mm = sum(key[:3])
+        y_max = next(p["max"] for p in self.PARAMS if p["key"] == "rock_mass")
+        def to_canvas(x_mm, kg):
+            cx = left + x_mm / x_max_mm * (width - left - right)
+            cy = height - bottom - min(kg, y_max) / y_max * (height - top - bottom)
+            return (cx, cy)
+
+        items = self.canvas_items.get(canvas)
+        if items is None:
+            items = self.canvas_items[canvas] = {
+                "curve": canvas.create_line(0, 0, 0, 0, width=2, fill="blue"),
+                "rock": canvas.create_line(0, 0, 0, 0, dash=(4, 2), fill="maroon"),
+                "marker": canvas.create_oval(0, 0, 0, 0, fill="red", outline="red"),
+                "x_max_mm": None,
+            }
+        if items["x_max_mm"] != x_max_mm:
+            # Grid, ticks and labels depend on the reach scale
+            canvas.delete("axes")
+            x0, y0 = to_canvas(0, 0)
+            x1, y1 = to_canvas(x_max_mm, y_max)
+            for x_mm in range(0, int(x_max_mm) + 1, 200):
+                cx, _ = to_canvas(x_mm, 0)
+                canvas.create_line(cx, y0, cx, y1, fill="#e0e0e0", tags="axes")
+                canvas.create_text(cx, y0+10, text=str(x_mm), font=("Arial",8), tags="axes")
+            for kg in range(0, int(y_max) + 1, 2):
+                _, cy = to_canvas(0, kg)
+                canvas.create_line(x0, cy, x1, cy, fill="#e0e0e0", tags="axes")
+                canvas.create_text(x0-10, cy, text=str(kg), anchor="e", font=("Arial",8),
+                                   tags="axes")
+            canvas.create_line(x0, y0, x1, y0, width=2, fill="black", tags="axes")
+            canvas.create_line(x0, y0, x0, y1, width=2, fill="black", tags="axes")
+            canvas.create_text(10, 5, text="Max Rock Mass vs Reach", anchor="nw",
+                               font=("Arial",12,"bold"), tags="axes")
+            canvas.create_text(x1, y0+22, text="Reach X [mm]", anchor="e", font=("Arial",8),
+                               tags="axes")
+            canvas.create_text(x0+5, y1, text="Rock [kg]", anchor="w", font=("Arial",8),
+                               tags="axes")
+            canvas.tag_lower("axes")
+            items["x_max_mm"] = x_max_mm
+
+        valid = np.isfinite(max_rock)
+        if valid.sum() >= 2:
+            points = [c for x, kg in zip(reach_m[valid], max_rock[valid])
+                      for c in to_canvas(x * 1000, kg)]
+            canvas.coords(items["curve"], *points)
+            canvas.itemconfig(items["curve"], state="normal")
+        else:
+            canvas.itemconfig(items["curve"], state="hidden")
+
+        if rock_mass is None:
+            canvas.itemconfig(items["rock"], state="hidden")
+            canvas.itemconfig(items["marker"], state="hidden")
+            return
+        x0, cy = to_canvas(0, rock_mass)
+        x1, _ = to_canvas(x_max_mm, rock_mass)
+        canvas.coords(items["rock"], x0, cy, x1, cy)
+        canvas.itemconfig(items["rock"], state="normal")
+        cx, _ = to_canvas(max_x * 1000, rock_mass)
+        r = 4
+        canvas.coords(items["marker"], cx-r, cy-r, cx+r, cy+r)
+        canvas.itemconfig(items["marker"], state="normal" if max_x > 0 else "hidden")
 
     # -------------------------------------------------------------------------
     # DRAW GRID + AXES
@@ -0,0 +1,1136 @@
+"""
+Tkinter-free physics for the robotic arm torque analysis.
+
+Everything DualScenarioApp computes lives here so it can be used from batch
+jobs on display-less machines. Run as a script for a one-shot JSON result:
+
+    python arm_solver.py --rock_mass 5 --shoulder_limit 40 --L2_mm 420
+
+or with --jsonl to solve one case per stdin line with a single start-up.
+"""
+import time
+
+_START = time.perf_counter()
+
+import argparse
+import collections
+import contextlib
+import functools
+import json
+import math
+import sys
+import threading
+
+import numpy as np
+
+from instrumentation import LatencyStats
+from kinematic_chain import G, KinematicChain, link_angles, two_link_elbow
+
+# -------------------------------------------------------------------------
+# CONSTANTS
+# -------------------------------------------------------------------------
+# G (9.87) comes from kinematic_chain
+
+# Masses and motor limits exposed in the GUI (and on the command line)
+PARAMS = [
+    {"name": "Rock Mass [kg]",      "default": 4.0,   "min": 0,   "max": 10,  "key": "rock_mass"},
+    {"name": "Link 1 Mass [kg]",    "default": 0.367,   "min": 0,   "max": 10,  "key": "m1"},
+    {"name": "Link 2 Mass [kg]",    "default": 0.44,   "min": 0,   "max": 10,  "key": "m2"},
+    {"name": "Link 3 Mass [kg]",    "default": 0.15,   "min": 0,   "max": 10,  "key": "m3"},
+    {"name": "Joint elbow Mass [kg]",   "default": 1.09, "min": 0, "max": 10,  "key": "m4"},
+    {"name": "Joint wrist Mass [kg]",   "default": 0.82, "min": 0, "max": 10,  "key": "m5"},
+]
+MOTOR_LIMITS = [
+    {"name": "Shoulder Limit [Nm]", "default": 33.0,  "min": 0,   "max": 200, "key": "shoulder_limit"},
+    {"name": "Elbow Limit [Nm]",    "default": 21.0,   "min": 0,   "max": 100, "key": "elbow_limit"},
+]
+LENGTH_KEYS = ("L1_mm", "L2_mm", "L3_mm")
+DEFAULT_LENGTHS_MM = (400, 450, 180)
+
+# Scenario 2 search space (integer degrees) and the wrist-height constraint
+T1_RANGE_DEG = range(-90, 30)
+T2_RANGE_DEG = range(0, 271)
+T3 = math.radians(90)
+YB_TARGET = 0.12
+YB_TOLERANCE = 0.001
+
+
+# -------------------------------------------------------------------------
+# TORQUE CALCULATION (for scenario2)
+# -------------------------------------------------------------------------
+def calculate_torques(theta1, theta2, theta3,
+                      L1_m, L2_m, L3_m,
+                      m1, m2, m3, m4, m5, rock_mass):
+    """
+    Approx torque at shoulder (Ts) & elbow (Te),
+    now including the elbow mass (m4) at the elbow pivot
+    and the wrist mass (m5) at the wrist pivot,
+    plus the rock at the end.
+
+    Pivot layout in scenario2 (standard 2D):
+    - Shoulder pivot at (0,0)
+    - Elbow pivot at (Xel, Yel) = end of link1
+    - Wrist pivot at (Xwr, Ywr) = end of link2
+    """
+    g = G
+
+    x1 = (L1_m/2) * math.cos(theta1)
+    y1 = (L1_m/2) * math.sin(theta1)
+    F1 = m1*g
+    x2 = (L1_m * math.cos(theta1) +
+        (L2_m/2)*math.cos(theta1 + theta2))
+    y2 = (L1_m * math.sin(theta1) +
+        (L2_m/2)*math.sin(theta1 + theta2))
+    F2 = m2*g
+    x3 = (L1_m * math.cos(theta1) +
+        L2_m * math.cos(theta1 + theta2) +
+        (L3_m/2)*math.cos(theta3))
+    y3 = (L1_m * math.sin(theta1) +
+        L2_m * math.sin(theta1 + theta2) +
+        (L3_m/2)*math.sin(theta3))
+    F3 = m3*g
+
+    # ---------------------------
+    # Joint masses
+    # ---------------------------
+    x_elbow = L1_m * math.cos(theta1)
+    y_elbow = L1_m * math.sin(theta1)
+    F4 = m4*g
+    x_wrist = (L1_m * math.cos(theta1) +
+            L2_m * math.cos(theta1 + theta2))
+    y_wrist = (L1_m * math.sin(theta1) +
+            L2_m * math.sin(theta1 + theta2))
+    F5 = m5*g
+    # ---------------------------
+    # Rock at end
+    # ---------------------------
+    xr = (L1_m * math.cos(theta1) +
+        L2_m * math.cos(theta1 + theta2) +
+        L3_m * math.cos(theta3))
+    yr = (L1_m * math.sin(theta1) +
+        L2_m * math.sin(theta1 + theta2) +
+        L3_m * math.sin(theta3))
+    Fr = rock_mass*g
+    def torque_shoulder(x, y, mass_g):
+        return x * (-mass_g)
+    Ts = 0.0
+    Ts += torque_shoulder(x1, y1, F1)
+    Ts += torque_shoulder(x2, y2, F2)
+    Ts += torque_shoulder(x3, y3, F3)
+    Ts += torque_shoulder(x_elbow, y_elbow, F4)
+    Ts += torque_shoulder(x_wrist, y_wrist, F5)
+    Ts += torque_shoulder(xr, yr, Fr)
+
+    # ---------------------------
+    # Elbow torque (about end of link1 = (x_elbow, y_elbow))
+    # We only sum link2, link3, wrist, rock masses (and possibly elbow mass
+    # if it's not exactly at the pivot, but we assume it is).
+    # ---------------------------
+    def torque_elbow(x, y, pivot_x, pivot_y, mass_g):
+        rx = x - pivot_x
+        ry = y - pivot_y
+        return rx * (-mass_g)
+
+    Te = 0.0
+    # link2 midpoint
+    Te += torque_elbow(x2, y2, x_elbow, y_elbow, F2)
+    # link3 midpoint
+    Te += torque_elbow(x3, y3, x_elbow, y_elbow, F3)
+    # wrist mass
+    Te += torque_elbow(x_wrist, y_wrist, x_elbow, y_elbow, F5)
+    # rock
+    Te += torque_elbow(xr, yr, x_elbow, y_elbow, Fr)
+
+    return Ts, Te
+
+
+# -------------------------------------------------------------------------
+# SCENARIO 2: FIND MAX X (scalar reference)
+# -------------------------------------------------------------------------
+def find_max_x_scalar(L1_m, L2_m, L3_m,
+                      m1, m2, m3, m4, m5, rock_mass,
+                      shoulder_limit, elbow_limit):
+    """
+    Brute-force search for angles that produce the largest end-effector X
+    subject to:
+      - B (the end of link2) is at y=0.12 m
+      - Link3 is straight down => theta3 = 90°
+      - The joint torques must not exceed (shoulder_limit, elbow_limit).
+
+    This is the original pure-Python loop; it is kept as the reference for
+    find_max_x(), whose "grid" mode returns the same result, bit for bit,
+    also when a limit equals a pose's torque exactly (compare_reach.py
+    checks both random and such boundary limits).
+    """
+    max_x = 0.0
+    best_t1 = 0.0
+    best_t2 = 0.0
+    best_t3 = 0.0
+    t3 = T3
+    for t1_deg in T1_RANGE_DEG:
+        for t2_deg in T2_RANGE_DEG:
+            t1 = math.radians(t1_deg)
+            t2 = math.radians(t2_deg)
+            yB = L1_m * math.sin(t1) + L2_m * math.sin(t1 + t2)
+            if abs(yB - YB_TARGET) < YB_TOLERANCE:
+                Ts, Te = calculate_torques(
+                    t1, t2, t3,
+                    L1_m, L2_m, L3_m,
+                    m1, m2, m3,
+                    m4, m5,
+                    rock_mass
+                )
+                if (abs(Ts) <= shoulder_limit) and (abs(Te) <= elbow_limit):
+                    x_end = (
+                        L1_m * math.cos(t1)
+                        + L2_m * math.cos(t1 + t2)
+                        + L3_m * math.cos(t3)
+                    )
+                    if x_end > max_x:
+                        max_x = x_end
+                        best_t1 = t1
+                        best_t2 = t2
+                        best_t3 = t3
+    return max_x, best_t1, best_t2, best_t3
+
+
+# -------------------------------------------------------------------------
+# SCENARIO 1: FIXED POSE
+# -------------------------------------------------------------------------
+# Mass order used by every lever-arm matrix below
+MASS_KEYS = ("m1", "m2", "m3", "m4", "m5", "rock_mass")
+
+
+# Scenario 1 link lengths in cm: link1 O->A, link2 A->B, link3 B->E
+SCENARIO1_LENGTHS_CM = (40.0, 45.0, 18.0)
+# Shoulder pivot O and wrist B of the reference pose, in cm
+SCENARIO1_BASE_CM = (0.0, 30.0)
+SCENARIO1_WRIST_CM = (40.0, 18.0)
+
+
+def scenario1_pose(wrist_cm=SCENARIO1_WRIST_CM, link3_deg=-90.0):
+    """
+    Return the absolute link angles (radians) of the Scenario 1 arm with
+    the wrist B at ``wrist_cm`` and link3 at ``link3_deg`` from the x axis
+    (-90: straight down). The elbow A is where link1 (from O) and link2 (to
+    B) meet, elbow up. Raises ValueError if B is out of reach.
+    """
+    L1, L2, L3 = SCENARIO1_LENGTHS_CM
+    A = two_link_elbow(SCENARIO1_BASE_CM, wrist_cm, L1, L2)
+    return np.append(link_angles([SCENARIO1_BASE_CM, A, wrist_cm]),
+                     math.radians(link3_deg))
+
+
+# The arm in metres; every Scenario 1 pose is a set of absolute link angles
+SCENARIO1_CHAIN = KinematicChain([0.01 * L for L in SCENARIO1_LENGTHS_CM],
+                                 absolute=True,
+                                 base=[0.01 * v for v in SCENARIO1_BASE_CM])
+SCENARIO1_POSE = scenario1_pose()
+
+
+def scenario1_points(pose=SCENARIO1_POSE):
+    """
+    Return the points O, A, B, E (cm) of a Scenario 1 pose; by default the
+    reference pose O=(0,30) -- A=... -- B=(40,18) -- E=(40,0).
+    """
+    x, y = SCENARIO1_CHAIN.positions(pose)
+    # Rounded to drop the float noise of the cos/sin round trip
+    return tuple((round(100 * float(px), 9), round(100 * float(py), 9))
+                 for px, py in zip(x, y))
+
+
+def scenario1_lever_arms(poses):
+    """
+    Return (..., 2, 6) arrays whose rows map the masses (MASS_KEYS order) to
+    the shoulder and elbow torque of each pose in ``poses`` (..., 3).
+
+    We'll treat:
+     - Link1 mass at midpoint of O->A
+     - Link2 mass at midpoint of A->B
+     - Link3 mass at midpoint of B->E
+     - Elbow-joint mass at A
+     - Wrist-joint mass at B
+     - Rock at E
+    with the shoulder pivot at O and the elbow pivot at A.
+    """
+    arms = SCENARIO1_CHAIN.lever_arms(poses)
+    # Shoulder and elbow rows; columns m1-m3, elbow and wrist joints, rock
+    return arms[..., :2, [0, 1, 2, 4, 5, 6]]
+
+
+SCENARIO1_LEVER_ARMS = scenario1_lever_arms(SCENARIO1_POSE)
+
+
+def calculate_scenario1_torques(m1, m2, m3, m4, m5, rock_mass):
+    """Return (ShoulderTorque, ElbowTorque) for the fixed Scenario 1 pose."""
+    Ts, Te = SCENARIO1_LEVER_ARMS @ (m1, m2, m3, m4, m5, rock_mass)
+    return float(Ts), float(Te)
+
+
+def scenario1_torque_matrix(poses, masses):
+    """
+    Scenario 1 torques of every pose under every mass set in one product:
+    ``poses`` is (P, 3) absolute link angles, ``masses`` (M, 6) in
+    MASS_KEYS order. Returns (Ts, Te), each (P, M).
+    """
+    arms = scenario1_lever_arms(np.atleast_2d(poses))
+    torques = arms @ np.atleast_2d(masses).T
+    return torques[:, 0], torques[:, 1]
+
+
+def scenario1_torque_batch(masses):
+    """
+    Scenario 1 torques of the fixed pose for each row of ``masses`` (M, 6),
+    MASS_KEYS order. Returns (Ts, Te), each (M,).
+    """
+    Ts, Te = scenario1_torque_matrix(SCENARIO1_POSE, masses)
+    return Ts[0], Te[0]
+
+
+# -------------------------------------------------------------------------
+# SCENARIO 2: GEOMETRY CACHE
+# -------------------------------------------------------------------------
+# Angles are converted with math.radians so the grid holds bit-for-bit the
+# same values the scalar loop uses.
+_T1_GRID = np.array([math.radians(d) for d in T1_RANGE_DEG])
+_T2_GRID = np.array([math.radians(d) for d in T2_RANGE_DEG])
+
+
+def angle_grid(resolution_deg=1):
+    """
+    Return the (t1, t2) grids in radians covering the same angle ranges as
+    T1_RANGE_DEG / T2_RANGE_DEG (ends included) with the given step.
+    """
+    if resolution_deg == 1:
+        return _T1_GRID, _T2_GRID
+    grids = []
+    for degrees in (T1_RANGE_DEG, T2_RANGE_DEG):
+        n = int((degrees[-1] - degrees[0]) / resolution_deg + 1e-9) + 1
+        grids.append(np.radians(degrees[0] + np.arange(n) * resolution_deg))
+    return tuple(grids)
+
+
+# Grids up to this many poses get shared sin/cos tables (about 8 bytes x 2
+# tables per pose); finer grids are filtered block by block instead.
+TRIG_TABLE_MAX_POSES = 1 << 20
+
+
+@functools.lru_cache(maxsize=4)
+def angle_trig(resolution_deg=1):
+    """
+    Return read-only (sin t1, cos t1, sin(t1 + t2), cos(t1 + t2)) over
+    angle_grid(resolution_deg): 1-D over t1, then (t1, t2) arrays. They do
+    not depend on the link lengths, so every geometry built in a process
+    shares them.
+    """
+    t1, t2 = angle_grid(resolution_deg)
+    phi = t1[:, None] + t2[None, :]
+    tables = (np.sin(t1), np.cos(t1), np.sin(phi), np.cos(phi))
+    for table in tables:
+        table.setflags(write=False)
+    return tables
+
+
+def _lever_arms(c1, c12, L1_m, L2_m, L3_m):
+    """
+    Return (shoulder_arms, elbow_arms, x_end) for poses given by
+    c1 = cos(t1) and c12 = cos(t1 + t2), with link3 hanging at T3.
+
+    Each arms array has one row per pose and one column per mass
+    (MASS_KEYS order) holding the horizontal distance (m) from the pivot,
+    so that ``Ts = _torque_sum(shoulder_arms, _weights(masses))``.
+    """
+    c3 = math.cos(T3)
+    x1 = (L1_m/2) * c1
+    x2 = L1_m * c1 + (L2_m/2) * c12
+    x3 = L1_m * c1 + L2_m * c12 + (L3_m/2) * c3
+    x_elbow = L1_m * c1
+    x_wrist = L1_m * c1 + L2_m * c12
+    xr = L1_m * c1 + L2_m * c12 + L3_m * c3
+    zeros = np.zeros_like(xr)
+    shoulder_arms = np.column_stack(
+        (x1, x2, x3, x_elbow, x_wrist, xr))
+    # The link1 and elbow-joint masses do not load the elbow
+    elbow_arms = np.column_stack(
+        (zeros, x2 - x_elbow, x3 - x_elbow, zeros,
+         x_wrist - x_elbow, xr - x_elbow))
+    return shoulder_arms, elbow_arms, xr
+
+
+def _weights(masses):
+    """Downward forces -(m * g) of ``masses``, as calculate_torques() forms them."""
+    return -(np.asarray(masses, dtype=float) * G)
+
+
+def _torque_sum(arms, weights):
+    """
+    Torques of ``arms`` (..., 6) under ``weights`` (6,) or (6, k) for k
+    mass sets at once, summed term by term in MASS_KEYS order like
+    calculate_torques(). A matrix product (or lever arms pre-multiplied
+    by -g) rounds differently and can flip a limit check when the limit
+    equals a pose's torque.
+    """
+    total = 0.0
+    for k in range(len(MASS_KEYS)):
+        column = arms[..., k] if weights.ndim == 1 else arms[..., k, None]
+        total = total + column * weights[k]
+    return total
+
+
+# theta1 and theta2 are relative joint angles, theta3 is absolute
+ARM_ABSOLUTE = (False, False, True)
+
+
+def arm_chain(L1_m, L2_m, L3_m, m1, m2, m3, m4, m5, rock_mass):
+    """The three-link arm of calculate_torques() as a KinematicChain."""
+    return KinematicChain((L1_m, L2_m, L3_m), link_masses=(m1, m2, m3),
+                          joint_masses=(0.0, m4, m5), payload=rock_mass,
+                          absolute=ARM_ABSOLUTE)
+
+
+def calculate_torques_array(theta1, theta2, theta3,
+                            L1_m, L2_m, L3_m,
+                            m1, m2, m3, m4, m5, rock_mass):
+    """
+    Array version of calculate_torques(): the angles are arrays of poses
+    (radians, theta3 absolute like the scalar model) and (Ts, Te) arrays
+    are returned. Evaluated with arm_chain().
+    """
+    poses = np.stack(np.broadcast_arrays(
+        np.asarray(theta1, dtype=float), theta2, theta3), axis=-1)
+    torques = arm_chain(L1_m, L2_m, L3_m,
+                        m1, m2, m3, m4, m5, rock_mass).torques(poses)
+    return torques[..., 0], torques[..., 1]
+
+
+class ReachGeometry:
+    """
+    Everything about the Scenario 2 search that depends only on the link
+    lengths: the poses that pass the yB band filter, their end-effector X
+    and their lever arms.
+
+    Both joint torques are linear in the six masses, so for every candidate
+    pose we store a row of lever arms (see _lever_arms) and a mass or limit
+    change only needs two weighted column sums (_torque_sum, which keeps
+    the scalar loop's rounding) and a mask.
+
+    Poses are kept sorted by decreasing x_end (stable, so equal-X poses stay
+    in the scalar loop's order), which turns the argmax into "first feasible
+    row".
+    """
+
+    # Rows of the packed table (see to_table)
+    TABLE_ROWS = 3 + 2 * len(MASS_KEYS)
+
+    def __init__(self, L1_m, L2_m, L3_m, resolution_deg=1, rows_per_block=256):
+        self.lengths = (L1_m, L2_m, L3_m)
+        self.resolution_deg = resolution_deg
+        t1_grid, t2_grid = angle_grid(resolution_deg)
+
+        if t1_grid.size * t2_grid.size <= TRIG_TABLE_MAX_POSES:
+            sin1, cos1, sin12, cos12 = angle_trig(resolution_deg)
+            yB = L1_m * sin1[:, None] + L2_m * sin12
+            i1, i2 = np.nonzero(np.abs(yB - YB_TARGET) < YB_TOLERANCE)
+            c1 = cos1[i1]
+            c12 = cos12[i1, i2]
+        else:
+            # Filter the grid a block of t1 rows at a time so fine resolutions
+            # never materialize the whole (t1, t2) array.
+            i1, i2 = [], []
+            for start in range(0, t1_grid.size, rows_per_block):
+                t1 = t1_grid[start:start + rows_per_block, None]
+                yB = L1_m * np.sin(t1) + L2_m * np.sin(t1 + t2_grid[None, :])
+                rows, cols = np.nonzero(np.abs(yB - YB_TARGET) < YB_TOLERANCE)
+                i1.append(rows + start)
+                i2.append(cols)
+            i1 = np.concatenate(i1)
+            i2 = np.concatenate(i2)
+            c1 = np.cos(t1_grid[i1])
+            c12 = np.cos(t1_grid[i1] + t2_grid[i2])
+        shoulder_arms, elbow_arms, xr = _lever_arms(c1, c12, L1_m, L2_m, L3_m)
+
+        order = np.argsort(-xr, kind="stable")
+        self.t1 = t1_grid[i1][order]
+        self.t2 = t2_grid[i2][order]
+        self.x_end = xr[order]
+        self.shoulder_arms = shoulder_arms[order]
+        self.elbow_arms = elbow_arms[order]
+
+    @property
+    def key(self):
+        return self.lengths, self.resolution_deg
+
+    def to_table(self):
+        """
+        Pack the geometry into one (TABLE_ROWS, n) float64 array: t1, t2,
+        x_end, then the six shoulder and six elbow lever-arm columns.
+        """
+        return np.vstack((self.t1, self.t2, self.x_end,
+                          self.shoulder_arms.T, self.elbow_arms.T))
+
+    @classmethod
+    def from_table(cls, L1_m, L2_m, L3_m, resolution_deg, table):
+        """
+        Rebuild a geometry from to_table() output without recomputing it.
+        The attributes are views into ``table``, which may be memory-mapped.
+        """
+        if table.ndim != 2 or table.shape[0] != cls.TABLE_ROWS:
+            raise ValueError(f"Bad reach geometry table shape {table.shape}")
+        k = len(MASS_KEYS)
+        geometry = cls.__new__(cls)
+        geometry.lengths = (L1_m, L2_m, L3_m)
+        geometry.resolution_deg = resolution_deg
+        geometry.t1, geometry.t2, geometry.x_end = table[:3]
+        geometry.shoulder_arms = table[3:3 + k].T
+        geometry.elbow_arms = table[3 + k:].T
+        return geometry
+
+    def __len__(self):
+        return self.x_end.size
+
+    def torques(self, masses):
+        """Return (Ts, Te) arrays for every candidate pose."""
+        weights = _weights(masses)
+        return (_torque_sum(self.shoulder_arms, weights),
+                _torque_sum(self.elbow_arms, weights))
+
+    def feasible(self, masses, shoulder_limit, elbow_limit):
+        """Boolean mask of the poses within both torque limits and X > 0."""
+        Ts, Te = self.torques(masses)
+        return ((np.abs(Ts) <= shoulder_limit)
+                & (np.abs(Te) <= elbow_limit)
+                & (self.x_end > 0.0))
+
+    def solve(self, masses, shoulder_limit, elbow_limit):
+        """Return (max_x, t1, t2, t3) for the given masses and limits."""
+        ok = self.feasible(masses, shoulder_limit, elbow_limit)
+        if not ok.any():
+            return 0.0, 0.0, 0.0, 0.0
+        best = int(np.argmax(ok))
+        return (float(self.x_end[best]),
+                float(self.t1[best]),
+                float(self.t2[best]),
+                T3)
+
+    def solve_batch(self, masses, shoulder_limits, elbow_limits):
+        """
+        Solve many mass / limit sets at once.
+
+        ``masses`` is (n, 6) in MASS_KEYS order; the limits are scalars or
+        (n,) arrays. Returns (max_x, t1, t2) arrays of length n, zero where
+        no pose is feasible (same fallback as solve()).
+        """
+        masses = np.atleast_2d(masses)
+        n = masses.shape[0]
+        if len(self) == 0:
+            return np.zeros(n), np.zeros(n), np.zeros(n)
+        weights = _weights(masses.T)
+        ok = ((np.abs(_torque_sum(self.shoulder_arms, weights)) <= shoulder_limits)
+              & (np.abs(_torque_sum(self.elbow_arms, weights)) <= elbow_limits)
+              & (self.x_end > 0.0)[:, None])
+        best = np.argmax(ok, axis=0)
+        found = ok[best, np.arange(n)]
+        return (np.where(found, self.x_end[best], 0.0),
+                np.where(found, self.t1[best], 0.0),
+                np.where(found, self.t2[best], 0.0))
+
+
+class GeometryCache:
+    """
+    Hold the ReachGeometry for the current link lengths, rebuilt on change.
+
+    If ``store`` is set (see workspace_cache.enable) geometries are loaded
+    from / saved to it instead of being recomputed. Safe to share between
+    threads (the GUI's solve and envelope workers): a caller always gets the
+    geometry for its own key, and a rebuild happens under a lock.
+    """
+
+    def __init__(self, store=None):
+        self.store = store
+        self._geometry = None
+        self._lock = threading.Lock()
+
+    def get(self, L1_m, L2_m, L3_m, resolution_deg=1):
+        key = ((L1_m, L2_m, L3_m), resolution_deg)
+        geometry = self._geometry
+        if geometry is not None and geometry.key == key:
+            return geometry
+        with self._lock:
+            geometry = self._geometry
+            if geometry is None or geometry.key != key:
+                if self.store is not None:
+                    geometry = self.store.get(L1_m, L2_m, L3_m, resolution_deg)
+                else:
+                    geometry = ReachGeometry(L1_m, L2_m, L3_m, resolution_deg)
+                self._geometry = geometry
+        return geometry
+
+    def clear(self):
+        with self._lock:
+            self._geometry = None
+
+
+GEOMETRY_CACHE = GeometryCache()
+
+
+# -------------------------------------------------------------------------
+# SCENARIO 2: FIND MAX X (vectorized)
+# -------------------------------------------------------------------------
+def find_max_x_grid(L1_m, L2_m, L3_m,
+                    m1, m2, m3, m4, m5, rock_mass,
+                    shoulder_limit, elbow_limit, resolution_deg=1, stats=None):
+    """
+    Array version of find_max_x_scalar().
+
+    The band-filtered poses and their lever arms come from GEOMETRY_CACHE and
+    are only rebuilt when the link lengths change; each call is then a
+    torque matrix-vector product, the limit mask and a first-feasible lookup.
+    ``resolution_deg`` refines the angle grid (1° reproduces the scalar loop).
+    ``stats`` (see instrumentation.LatencyStats) receives the pose counts.
+    """
+    geometry = GEOMETRY_CACHE.get(L1_m, L2_m, L3_m, resolution_deg)
+    if stats is not None:
+        stats.count("band_poses", len(geometry))
+        stats.count("torque_checked", len(geometry))
+    return geometry.solve(
+        np.array((m1, m2, m3, m4, m5, rock_mass)),
+        shoulder_limit, elbow_limit
+    )
+
+
+# -------------------------------------------------------------------------
+# SCENARIO 2: FIND MAX X (continuous)
+# -------------------------------------------------------------------------
+T1_MIN = math.radians(T1_RANGE_DEG[0])
+T1_MAX = math.radians(T1_RANGE_DEG[-1])
+T2_MIN = math.radians(T2_RANGE_DEG[0])
+T2_MAX = math.radians(T2_RANGE_DEG[-1])
+_GOLDEN = (math.sqrt(5.0) - 1.0) / 2.0
+
+
+def _constrained_poses(phi, L1_m, L2_m, L3_m, masses,
+                       shoulder_limit, elbow_limit):
+    """
+    Solve yB = YB_TARGET for the shoulder angle at each link2 angle
+    phi = t1 + t2.
+
+    sin(t1) = (YB_TARGET - L2 sin phi) / L1 has a single solution in the
+    t1 range [-90°, 29°], where sin is monotonic, so the constraint curve is
+    one smooth branch in phi (parametrizing by t1 instead folds where both
+    elbow solutions meet). Return (t1, t2, x_end, objective) where
+    objective is x_end for feasible poses (angles within the grid's ranges,
+    both torques within limits, X > 0) and -inf otherwise.
+    """
+    s = (YB_TARGET - L2_m * np.sin(phi)) / L1_m
+    t1 = np.arcsin(np.clip(s, -1.0, 1.0))
+    t2 = phi - t1
+    shoulder_arms, elbow_arms, x_end = _lever_arms(
+        np.cos(t1), np.cos(phi), L1_m, L2_m, L3_m)
+    ok = ((np.abs(s) <= 1.0)
+          & (t1 <= T1_MAX)
+          & (t2 >= T2_MIN) & (t2 <= T2_MAX)
+          & (np.abs(_torque_sum(shoulder_arms, _weights(masses))) <= shoulder_limit)
+          & (np.abs(_torque_sum(elbow_arms, _weights(masses))) <= elbow_limit)
+          & (x_end > 0.0))
+    return t1, t2, x_end, np.where(ok, x_end, -np.inf)
+
+
+def find_max_x_continuous(L1_m, L2_m, L3_m,
+                          m1, m2, m3, m4, m5, rock_mass,
+                          shoulder_limit, elbow_limit,
+                          samples=781, iterations=40, stats=None):
+    """
+    Continuous version of the Scenario 2 search.
+
+    The yB constraint is solved exactly for the shoulder angle, which
+    leaves x_end as a 1-D function of the link2 angle phi = t1 + t2. phi is
+    sampled at ``samples`` points over the range the grid can reach; then
+    every sampled local maximum of the feasible x_end is refined with a
+    golden-section search, and every feasible/infeasible transition by
+    bisection, since the optimum is often pinned on a torque limit.
+    ``iterations`` steps shrink a one-sample bracket well below 1e-6 rad.
+    ``stats`` receives the number of evaluated poses (all on the band).
+    The best refined pose is returned as (max_x, t1, t2, t3), with the same
+    (0, 0, 0, 0) fallback as the grid when nothing is feasible.
+    """
+    masses = np.array((m1, m2, m3, m4, m5, rock_mass))
+    args = (L1_m, L2_m, L3_m, masses, shoulder_limit, elbow_limit)
+    phi = np.linspace(T1_MIN + T2_MIN, T1_MAX + T2_MAX, samples)
+    obj = _constrained_poses(phi, *args)[3]
+    feasible = np.isfinite(obj)
+    # Every evaluated pose lies on yB = YB_TARGET, so all of them count as
+    # band poses
+    if not feasible.any():
+        if stats is not None:
+            stats.count("band_poses", samples)
+            stats.count("torque_checked", samples)
+        return 0.0, 0.0, 0.0, 0.0
+
+    # Interior maxima get a golden-section search on x_end between their
+    # neighbours; feasibility boundaries get a bisection that keeps the
+    # feasible end. Both are advanced together, one evaluation per step.
+    padded = np.concatenate(([-np.inf], obj, [-np.inf]))
+    peaks = np.nonzero(feasible
+                       & (obj >= padded[:-2])
+                       & (obj >= padded[2:]))[0]
+    lo = phi[np.maximum(peaks - 1, 0)]
+    hi = phi[np.minimum(peaks + 1, samples - 1)]
+    edges = np.nonzero(feasible[:-1] != feasible[1:])[0]
+    inside = np.where(feasible[edges], phi[edges], phi[edges + 1])
+    outside = np.where(feasible[edges], phi[edges + 1], phi[edges])
+    n = lo.size
+    for _ in range(iterations):
+        a = hi - _GOLDEN * (hi - lo)
+        b = lo + _GOLDEN * (hi - lo)
+        mid = (inside + outside) / 2.0
+        obj = _constrained_poses(np.concatenate((a, b, mid)), *args)[3]
+        left = obj[:n] >= obj[n:2*n]
+        hi = np.where(left, b, hi)
+        lo = np.where(left, lo, a)
+        ok = np.isfinite(obj[2*n:])
+        inside = np.where(ok, mid, inside)
+        outside = np.where(ok, outside, mid)
+
+    phi = np.concatenate((phi[feasible], (lo + hi) / 2.0, inside))
+    t1, t2, x_end, obj = _constrained_poses(phi, *args)
+    if stats is not None:
+        evaluated = samples + iterations * (2 * n + inside.size) + phi.size
+        stats.count("band_poses", evaluated)
+        stats.count("torque_checked", evaluated)
+    i = int(np.argmax(obj))
+    if not np.isfinite(obj[i]):
+        return 0.0, 0.0, 0.0, 0.0
+    return float(x_end[i]), float(t1[i]), float(t2[i]), T3
+
+
+# -------------------------------------------------------------------------
+# SCENARIO 2: FIND MAX X (adaptive, fine grids)
+# -------------------------------------------------------------------------
+def _torque_slopes(L1_m, L2_m, L3_m, masses):
+    """
+    Return |dTs/dc1|, |dTs/dc12|, |dTe/dc1|, |dTe/dc12|: both torques are
+    affine in c1 = cos(t1) and c12 = cos(t1 + t2).
+    """
+    zero, one = np.zeros(1), np.ones(1)
+    base = _lever_arms(zero, zero, L1_m, L2_m, L3_m)
+    d_c1 = _lever_arms(one, zero, L1_m, L2_m, L3_m)
+    d_c12 = _lever_arms(zero, one, L1_m, L2_m, L3_m)
+    weights = _weights(masses)
+    return tuple(abs(float(((d[k] - base[k]) @ weights)[0]))
+                 for k in (0, 1) for d in (d_c1, d_c12))
+
+
+def find_max_x_adaptive(L1_m, L2_m, L3_m,
+                        m1, m2, m3, m4, m5, rock_mass,
+                        shoulder_limit, elbow_limit,
+                        resolution_deg=0.01, max_cells=4096, stats=None):
+    """
+    Same answer as find_max_x_grid(..., resolution_deg) without visiting
+    the whole grid (3e8 poses at 0.01°).
+
+    The (t1, t2) index grid is covered by at most ``max_cells`` square
+    cells, which are halved level by level down to single poses. At every
+    level the centre pose of each cell is checked exactly (band, torques,
+    X > 0) and the best feasible one so far is kept. A cell is dropped when
+    conservative bounds show it cannot hold a better pose: sin, cos and
+    therefore yB, x_end and both torques change by at most their slope
+    times the angle offset from the centre, so a cell survives only if yB
+    can reach the band, both torques can be within limits and x_end can
+    reach the incumbent. The grid optimum (ties broken in scan order, as in
+    the grid) is never pruned, and since the surviving cells hug the
+    optimum the cost grows with the number of levels, i.e. with
+    log(1 / resolution_deg). Cells near a torque limit that no pose attains
+    are refined further than necessary, so heavily constrained,
+    barely-infeasible inputs cost more.
+    """
+    masses = np.array((m1, m2, m3, m4, m5, rock_mass))
+    t1_grid, t2_grid = angle_grid(resolution_deg)
+    n1, n2 = t1_grid.size, t2_grid.size
+    ks1, ks12, ke1, ke12 = _torque_slopes(L1_m, L2_m, L3_m, masses)
+    # Grid spacing in radians, rounded up so the bounds stay conservative
+    step = math.radians(resolution_deg) * (1 + 1e-9)
+    eps = 1e-12
+
+    size = 1
+    while -(-n1 // size) * -(-n2 // size) > max_cells:
+        size *= 2
+    i0, j0 = (a.ravel() for a in np.meshgrid(
+        np.arange(0, n1, size), np.arange(0, n2, size), indexing="ij"))
+
+    best_x, best = -np.inf, -1
+    checked = in_band = 0
+    while i0.size:
+        i_end = np.minimum(i0 + size, n1)
+        j_end = np.minimum(j0 + size, n2)
+        ic = (i0 + i_end - 1) // 2
+        jc = (j0 + j_end - 1) // 2
+        t1 = t1_grid[ic]
+        t2 = t2_grid[jc]
+        yB = L1_m * np.sin(t1) + L2_m * np.sin(t1 + t2)
+        shoulder_arms, elbow_arms, x_end = _lever_arms(
+            np.cos(t1), np.cos(t1 + t2), L1_m, L2_m, L3_m)
+        Ts = _torque_sum(shoulder_arms, _weights(masses))
+        Te = _torque_sum(elbow_arms, _weights(masses))
+
+        # Exact check of the centre poses (same test as ReachGeometry)
+        band = np.abs(yB - YB_TARGET) < YB_TOLERANCE
+        ok = (band
+              & (np.abs(Ts) <= shoulder_limit)
+              & (np.abs(Te) <= elbow_limit)
+              & (x_end > 0.0))
+        checked += ic.size
+        in_band += int(band.sum())
+        if ok.any():
+            flat = ic[ok] * n2 + jc[ok]
+            x = x_end[ok]
+            i = np.lexsort((flat, -x))[0]
+            if x[i] > best_x or (x[i] == best_x and flat[i] < best):
+                best_x, best = float(x[i]), int(flat[i])
+        if size == 1:
+            break
+
+        # Bounds over the whole cell
+        d1 = np.maximum(ic - i0, i_end - 1 - ic) * step
+        d12 = d1 + np.maximum(jc - j0, j_end - 1 - jc) * step
+        slack = L1_m * d1 + L2_m * d12
+        keep = ((np.abs(yB - YB_TARGET) - slack < YB_TOLERANCE + eps)
+                & (np.abs(Ts) - (ks1 * d1 + ks12 * d12) <= shoulder_limit + eps)
+                & (np.abs(Te) - (ke1 * d1 + ke12 * d12) <= elbow_limit + eps)
+                & (x_end + slack + eps > 0.0)
+                & (x_end + slack + eps >= best_x))
+        i0, j0 = i0[keep], j0[keep]
+
+        size //= 2
+        i0 = np.concatenate((i0, i0, i0 + size, i0 + size))
+        j0 = np.concatenate((j0, j0 + size, j0, j0 + size))
+        inside = (i0 < n1) & (j0 < n2)
+        i0, j0 = i0[inside], j0[inside]
+
+    if stats is not None:
+        stats.count("band_poses", in_band)
+        stats.count("torque_checked", checked)
+    if best < 0:
+        return 0.0, 0.0, 0.0, 0.0
+    i, j = divmod(best, n2)
+    return best_x, float(t1_grid[i]), float(t2_grid[j]), T3
+
+
+# -------------------------------------------------------------------------
+# SCENARIO 2: SOLVER SELECTION
+# -------------------------------------------------------------------------
+REACH_MODES = {
+    "grid": find_max_x_grid,
+    "continuous": find_max_x_continuous,
+    "adaptive": find_max_x_adaptive,
+}
+# Angle step (deg) of each mode when none is given; continuous has none
+DEFAULT_RESOLUTION_DEG = {"grid": 1, "continuous": None, "adaptive": 0.01}
+
+
+def reach_resolution(mode, resolution_deg=None):
+    """The angle step ``mode`` searches at: ``resolution_deg`` or the mode's default."""
+    if DEFAULT_RESOLUTION_DEG[mode] is None:
+        return None
+    return DEFAULT_RESOLUTION_DEG[mode] if resolution_deg is None else resolution_deg
+
+
+def find_max_x(L1_m, L2_m, L3_m,
+               m1, m2, m3, m4, m5, rock_mass,
+               shoulder_limit, elbow_limit, mode="grid", stats=None,
+               resolution_deg=None):
+    """
+    Return (max_x, t1, t2, t3) for Scenario 2 using the solver named by
+    ``mode`` (a key of REACH_MODES). "grid" reproduces the original 1°
+    search; "continuous" solves the yB constraint exactly; "adaptive" gives
+    the 0.01° grid answer by coarse-to-fine refinement. ``resolution_deg``
+    changes the grid step of "grid" and "adaptive" (the continuous solver
+    ignores it). ``stats`` is passed on to the solver.
+    """
+    try:
+        solver = REACH_MODES[mode]
+    except KeyError:
+        raise ValueError(f"Unknown reach mode {mode!r}") from None
+    resolution = reach_resolution(mode, resolution_deg)
+    options = {} if resolution is None else {"resolution_deg": resolution}
+    return solver(
+        L1_m, L2_m, L3_m,
+        m1, m2, m3, m4, m5, rock_mass,
+        shoulder_limit, elbow_limit, stats=stats, **options
+    )
+
+
+# -------------------------------------------------------------------------
+# BOTH SCENARIOS
+# -------------------------------------------------------------------------
+def _no_timer(stage):
+    return contextlib.nullcontext()
+
+
+def default_inputs():
+    """Return the default masses, limits and reach mode as an inputs dict."""
+    inputs = {p["key"]: p["default"] for p in PARAMS + MOTOR_LIMITS}
+    inputs["mode"] = "grid"
+    return inputs
+
+
+def check_overrides(overrides, keys):
+    """
+    Validate a JSON object of input overrides: only ``keys`` are allowed,
+    "mode" must name a REACH_MODES solver and every other value must be a
+    finite number (link lengths and "resolution_deg" also positive, as in
+    the GUI). Returns the overrides with float values; raises ValueError.
+    """
+    if not isinstance(overrides, dict):
+        raise ValueError("expected a JSON object")
+    unknown = set(overrides) - set(keys)
+    if unknown:
+        raise ValueError(f"unknown keys {sorted(unknown)}")
+    checked = {}
+    for key, value in overrides.items():
+        if key == "mode":
+            if value not in REACH_MODES:
+                raise ValueError(f"unknown reach mode {value!r}")
+            checked[key] = value
+        elif isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"{key} must be a number, got {value!r}")
+        else:
+            try:
+                number = float(value)
+            except OverflowError:
+                number = math.inf
+            # NaN and infinities would also come back as invalid JSON
+            if not math.isfinite(number):
+                raise ValueError(f"{key} must be finite, got {value!r}")
+            if (key in LENGTH_KEYS or key == "resolution_deg") and number <= 0:
+                raise ValueError(f"{key} must be positive, got {value!r}")
+            checked[key] = number
+    return checked
+
+
+def solve_scenarios(inputs, lengths_mm=DEFAULT_LENGTHS_MM, stats=None):
+    """
+    Compute both scenarios for ``inputs`` (a dict with the PARAMS and
+    MOTOR_LIMITS keys, plus an optional reach "mode" and "resolution_deg")
+    and link lengths in mm.
+
+    Returns a dict with the signed Scenario 1 torques and the Scenario 2
+    (max_x, t1, t2, t3) in metres / radians. If ``stats`` is given, the
+    "calculate_scenario1_torques" and "find_max_X" stages are timed into it.
+    """
+    timer = stats.time if stats is not None else _no_timer
+    masses = [inputs[key] for key in MASS_KEYS]
+    with timer("calculate_scenario1_torques"):
+        Ts1, Te1 = calculate_scenario1_torques(*masses)
+    L1_m, L2_m, L3_m = (L / 1000.0 for L in lengths_mm)
+    with timer("find_max_X"):
+        max_x, best_t1, best_t2, best_t3 = find_max_x(
+            L1_m, L2_m, L3_m,
+            *masses,
+            inputs["shoulder_limit"], inputs["elbow_limit"],
+            mode=inputs.get("mode", "grid"), stats=stats,
+            resolution_deg=inputs.get("resolution_deg")
+        )
+    return {
+        "shoulder_torque": Ts1,
+        "elbow_torque": Te1,
+        "max_x": max_x,
+        "t1": best_t1,
+        "t2": best_t2,
+        "t3": best_t3,
+    }
+
+
+# -------------------------------------------------------------------------
+# RESULT CACHE
+# -------------------------------------------------------------------------
+# Decimals kept when keying results: the GUI shows masses, limits and
+# torques to 3 decimals, so inputs that agree to that precision share one
+# result.
+DISPLAY_DECIMALS = 3
+INPUT_KEYS = tuple(p["key"] for p in PARAMS + MOTOR_LIMITS)
+
+
+class ResultCache:
+    """
+    Bounded LRU memo in front of solve_scenarios().
+
+    Results are keyed on the masses, limits, reach mode and resolution and
+    link lengths rounded to ``decimals``, and the solve itself uses the rounded values, so
+    a hit returns exactly what a miss would have computed. Safe to share
+    between the UI thread and a scheduler worker.
+    """
+
+    def __init__(self, maxsize=1024, decimals=DISPLAY_DECIMALS):
+        self.maxsize = maxsize
+        self.decimals = decimals
+        self.hits = 0
+        self.misses = 0
+        self._results = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def quantize(self, inputs):
+        """Return a copy of ``inputs`` with the numeric values rounded."""
+        quantized = dict(inputs)
+        for key in INPUT_KEYS:
+            quantized[key] = round(float(inputs[key]), self.decimals)
+        return quantized
+
+    def key(self, inputs, lengths_mm):
+        return (tuple(round(float(inputs[key]), self.decimals) for key in INPUT_KEYS)
+                + (inputs.get("mode", "grid"), inputs.get("resolution_deg"))
+                + tuple(round(float(L), self.decimals) for L in lengths_mm))
+
+    def solve(self, inputs, lengths_mm=DEFAULT_LENGTHS_MM, stats=None):
+        """solve_scenarios() for the rounded inputs, served from the cache if possible."""
+        key = self.key(inputs, lengths_mm)
+        with self._lock:
+            result = self._results.get(key)
+            if result is not None:
+                self._results.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+        if stats is not None:
+            stats.count("cache_hits", int(result is not None))
+        if result is None:
+            lengths_mm = tuple(round(float(L), self.decimals) for L in lengths_mm)
+            result = solve_scenarios(self.quantize(inputs), lengths_mm, stats)
+            with self._lock:
+                self._results[key] = result
+                while len(self._results) > self.maxsize:
+                    self._results.popitem(last=False)
+        return dict(result)
+
+    def invalidate(self, lengths_mm=None):
+        """
+        Drop the results for ``lengths_mm`` (link lengths in mm), or all of
+        them. Call this when the geometry behind those lengths changes.
+        """
+        with self._lock:
+            if lengths_mm is None:
+                self._results.clear()
+                return
+            lengths = tuple(round(float(L), self.decimals) for L in lengths_mm)
+            for key in [k for k in self._results if k[-len(lengths):] == lengths]:
+                del self._results[key]
+
+    def info(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses,
+                    "size": len(self._results), "maxsize": self.maxsize}
+
+
+def result_report(inputs, lengths_mm, result):
+    """Return the JSON-ready report the command line prints."""
+    return {
+        "inputs": {
+            **{key: inputs[key] for key in MASS_KEYS},
+            "shoulder_limit": inputs["shoulder_limit"],
+            "elbow_limit": inputs["elbow_limit"],
+            **dict(zip(LENGTH_KEYS, lengths_mm)),
+        },
+        "scenario1": {
+            "shoulder_torque_nm": result["shoulder_torque"],
+            "elbow_torque_nm": result["elbow_torque"],
+            "within_limits": (abs(result["shoulder_torque"]) <= inputs["shoulder_limit"]
+                              and abs(result["elbow_torque"]) <= inputs["elbow_limit"]),
+        },
+        "scenario2": {
+            "mode": inputs.get("mode", "grid"),
+            "resolution_deg": reach_resolution(inputs.get("mode", "grid"),
+                                               inputs.get("resolution_deg")),
+            "max_x_mm": result["max_x"] * 1000,
+            "shoulder_deg": math.degrees(result["t1"]),
+            "elbow_deg": math.degrees(result["t2"]),
+            "link3_deg": math.degrees(result["t3"]),
+        },
+    }
+
+
+# -------------------------------------------------------------------------
+# COMMAND LINE
+# -------------------------------------------------------------------------
+def add_arm_arguments(parser, lengths=True):
+    """
+    Add one option per mass, limit and (unless ``lengths`` is false) link
+    length, with the GUI defaults.
+    """
+    for p in PARAMS + MOTOR_LIMITS:
+        parser.add_argument(f"--{p['key']}", type=float, default=p["default"],
+                            help=f"{p['name']} (default {p['default']})")
+    if not lengths:
+        return
+    for key, default in zip(LENGTH_KEYS, DEFAULT_LENGTHS_MM):
+        parser.add_argument(f"--{key}", type=float, default=float(default),
+                            help=f"{key[:2]} length [mm] (default {default})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Print Scenario 1 torques and Scenario 2 max reach as JSON.")
+    add_arm_arguments(parser)
+    parser.add_argument("--mode", choices=sorted(REACH_MODES), default="grid",
+                        help="Scenario 2 reach solver (default grid)")
+    parser.add_argument("--resolution", dest="resolution_deg", type=float, metavar="DEG",
+                        help="angle step of the grid and adaptive solvers "
+                             "(default 1 for grid, 0.01 for adaptive)")
+    parser.add_argument("--jsonl", action="store_true",
+                        help="read one JSON object of overrides per stdin line and "
+                             "print one compact report per line (one start-up for "
+                             "many cases); an invalid line gets an {\"line\", "
+                             "\"error\"} object instead and the exit status is 1")
+    parser.add_argument("--timing", action="store_true",
+                        help="include start-up and solve times in the output and "
+                             "print per-stage latencies and pose counts on stderr")
+    args = parser.parse_args(argv)
+    base = {key: getattr(args, key)
+            for key in [p["key"] for p in PARAMS + MOTOR_LIMITS] + list(LENGTH_KEYS)}
+    base["mode"] = args.mode
+    base["resolution_deg"] = args.resolution_deg
+    try:
+        check_overrides({k: v for k, v in base.items() if v is not None}, base)
+    except ValueError as exc:
+        parser.error(str(exc))
+    stats = LatencyStats() if args.timing else None
+
+    def run(options):
+        inputs = {key: options[key] for key in base if key not in LENGTH_KEYS}
+        lengths_mm = tuple(options[key] for key in LENGTH_KEYS)
+        solve_start = time.perf_counter()
+        result = solve_scenarios(inputs, lengths_mm, stats)
+        end = time.perf_counter()
+        report = result_report(inputs, lengths_mm, result)
+        if args.timing:
+            report["timing_ms"] = {
+                "startup": (solve_start - _START) * 1000,
+                "solve": (end - solve_start) * 1000,
+                "total": (end - _START) * 1000,
+            }
+        return report
+
+    if not args.jsonl:
+        json.dump(run(base), sys.stdout, indent=2)
+        sys.stdout.write("\n")
+        if stats is not None:
+            print(stats.format_status(), file=sys.stderr)
+        return 0
+    errors = 0
+    for number, line in enumerate(sys.stdin, 1):
+        if not line.strip():
+            continue
+        try:
+            # json.JSONDecodeError is a ValueError too
+            overrides = check_overrides(json.loads(line), base)
+        except ValueError as exc:
+            errors += 1
+            print(f"line {number}: {exc}", file=sys.stderr)
+            sys.stdout.write(json.dumps({"line": number, "error": str(exc)}) + "\n")
+            continue
+        sys.stdout.write(json.dumps(run({**base, **overrides})) + "\n")
+    if stats is not None:
+        print(stats.format_status(), file=sys.stderr)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
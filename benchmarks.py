@@ -0,0 +1,368 @@
+"""
+Benchmarks for the torque and reach hot paths.
+
+Covers the Scenario 1 / Scenario 2 torque models, find_max_x at several
+grid resolutions, the continuous solver, a full headless update cycle
+(solve_scenarios), the batch sweep kernel and the canvas redraws. Without
+a display the canvas cases run on an Xvfb server started for them when
+Xvfb is installed; --canvas require makes a missing display an error
+instead of a "skipped" entry, --canvas off leaves them out. Every case
+reports per-call latency percentiles and, where it makes sense,
+throughput: poses/s counts the poses actually evaluated per second, i.e.
+the whole grid for the scalar loop and the geometry build, but only the
+cached band poses for find_max_x_grid; the sweep reports rows/s (input
+sets solved). Problem sizes are options (--resolutions, --adaptive,
+--sweep-sizes, --cases). Results are written as JSON so runs from
+different commits can be compared:
+
+    python benchmarks.py --output before.json
+    python benchmarks.py --output after.json --compare before.json
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+import arm_solver
+import sweep
+
+L_M = tuple(L / 1000.0 for L in arm_solver.DEFAULT_LENGTHS_MM)
+
+
+def random_inputs(rng):
+    """Random masses and limits around the GUI defaults."""
+    inputs = arm_solver.default_inputs()
+    for p in arm_solver.PARAMS + arm_solver.MOTOR_LIMITS:
+        inputs[p["key"]] = p["default"] * rng.uniform(0.5, 1.5)
+    return inputs
+
+
+def measure(fn, args_list, min_time=0.5, warmup=True):
+    """
+    Call ``fn(*args)`` cycling through ``args_list`` until at least
+    ``min_time`` seconds and len(args_list) calls have elapsed. Returns the
+    per-call durations in seconds. With ``warmup`` one untimed call is made
+    first so cache rebuilds do not show up in the percentiles.
+    """
+    if warmup:
+        fn(*args_list[0])
+    durations = []
+    start = time.perf_counter()
+    i = 0
+    while i < len(args_list) or time.perf_counter() - start < min_time:
+        args = args_list[i % len(args_list)]
+        t0 = time.perf_counter()
+        fn(*args)
+        durations.append(time.perf_counter() - t0)
+        i += 1
+    return np.array(durations)
+
+
+def summarize(name, params, durations, poses_per_call=None, rows_per_call=None):
+    ms = durations * 1000
+    result = {
+        "name": name,
+        "params": params,
+        "calls": int(ms.size),
+        "mean_ms": float(ms.mean()),
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "p99_ms": float(np.percentile(ms, 99)),
+    }
+    if poses_per_call is not None:
+        result["poses_per_s"] = poses_per_call / float(durations.mean())
+    if rows_per_call is not None:
+        result["rows_per_s"] = rows_per_call / float(durations.mean())
+    return result
+
+
+# -------------------------------------------------------------------------
+# CASES
+# -------------------------------------------------------------------------
+def bench_scenario1(cases, min_time):
+    args = [[c[k] for k in arm_solver.MASS_KEYS] for c in cases]
+    yield summarize("calculate_scenario1_torques", {},
+                    measure(arm_solver.calculate_scenario1_torques, args, min_time), 1)
+
+
+def bench_calculate_torques(cases, min_time):
+    rng = random.Random(1)
+    args = [(math.radians(rng.uniform(-90, 29)), math.radians(rng.uniform(0, 270)),
+             arm_solver.T3, *L_M, *[c[k] for k in arm_solver.MASS_KEYS])
+            for c in cases]
+    yield summarize("calculate_torques", {},
+                    measure(arm_solver.calculate_torques, args, min_time), 1)
+
+
+def reach_args(cases):
+    return [(*L_M, *[c[k] for k in arm_solver.MASS_KEYS],
+             c["shoulder_limit"], c["elbow_limit"]) for c in cases]
+
+
+def bench_find_max_x(cases, min_time, resolutions, adaptive_resolutions):
+    args = reach_args(cases)
+    grid_poses = len(arm_solver.T1_RANGE_DEG) * len(arm_solver.T2_RANGE_DEG)
+    yield summarize("find_max_x_scalar", {"resolution_deg": 1},
+                    measure(arm_solver.find_max_x_scalar, args[:5], 0), grid_poses)
+    for resolution in resolutions:
+        t1, t2 = arm_solver.angle_grid(resolution)
+        # First call builds the geometry; it is reported separately
+        arm_solver.GEOMETRY_CACHE.clear()
+        build = measure(arm_solver.find_max_x_grid, [args[0] + (resolution,)], 0,
+                        warmup=False)
+        yield summarize("reach_geometry_build", {"resolution_deg": resolution},
+                        build, t1.size * t2.size)
+        # The geometry is cached, so a solve only checks the band poses
+        checked = len(arm_solver.GEOMETRY_CACHE.get(*L_M, resolution))
+        yield summarize("find_max_x_grid", {"resolution_deg": resolution},
+                        measure(arm_solver.find_max_x_grid,
+                                [a + (resolution,) for a in args], min_time),
+                        checked)
+    yield summarize("find_max_x_continuous", {},
+                    measure(arm_solver.find_max_x_continuous, args, min_time))
+    for resolution in adaptive_resolutions:
+        yield summarize("find_max_x_adaptive", {"resolution_deg": resolution},
+                        measure(arm_solver.find_max_x_adaptive,
+                                [a + (resolution,) for a in args], min_time))
+
+
+def bench_update_cycle(cases, min_time):
+    yield summarize("solve_scenarios", {"mode": "grid"},
+                    measure(arm_solver.solve_scenarios, [(c,) for c in cases], min_time))
+    cache = arm_solver.ResultCache()
+    # Every call after the warm-up pass is a hit
+    for c in cases:
+        cache.solve(c)
+    yield summarize("ResultCache.solve", {"hit": True},
+                    measure(cache.solve, [(c,) for c in cases], min_time))
+
+
+def bench_sweep(min_time, sizes):
+    axes = sweep.default_axes()
+    for size in sizes:
+        axes["rock_mass"] = np.linspace(0, 10, size)
+        yield summarize("sweep.solve_chunk", {"rows": size},
+                        measure(sweep.solve_chunk, [(axes, 0, size)], min_time),
+                        rows_per_call=size)
+
+
+def start_virtual_display():
+    """
+    Start an Xvfb server and point $DISPLAY at it, if there is no display
+    (X11 platforms only). Returns the process, or None if a display exists;
+    raises OSError if Xvfb is not installed or does not start.
+    """
+    if os.environ.get("DISPLAY") or sys.platform in ("win32", "darwin"):
+        return None
+    xvfb = shutil.which("Xvfb")
+    if xvfb is None:
+        raise OSError("no display and Xvfb is not installed")
+    read_fd, write_fd = os.pipe()
+    # -displayfd: Xvfb picks a free display number and writes it to the pipe
+    process = subprocess.Popen(
+        [xvfb, "-displayfd", str(write_fd), "-screen", "0", "1280x1024x24",
+         "-nolisten", "tcp"],
+        pass_fds=(write_fd,), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    os.close(write_fd)
+    with os.fdopen(read_fd) as f:
+        number = f.readline().strip()
+    if not number:
+        process.kill()
+        process.wait()
+        raise OSError("Xvfb did not start")
+    os.environ["DISPLAY"] = f":{number}"
+    return process
+
+
+def stop_virtual_display(process):
+    """Stop a start_virtual_display() server and unset $DISPLAY again."""
+    if process is not None:
+        process.terminate()
+        process.wait()
+        os.environ.pop("DISPLAY", None)
+
+
+def bench_canvas(cases, min_time, required=False):
+    """
+    Canvas redraw cost, on an Xvfb display if needed. Without a display the
+    result is a "skipped" entry, or a RuntimeError if ``required``.
+    """
+    display = None
+    try:
+        display = start_virtual_display()
+        import arm_moment
+        app = arm_moment.DualScenarioApp()
+    except Exception as exc:
+        stop_virtual_display(display)
+        reason = f"no display ({exc.__class__.__name__}: {exc})"
+        if required:
+            raise RuntimeError(f"canvas benchmarks: {reason}") from exc
+        yield {"name": "canvas", "skipped": reason}
+        return
+    try:
+        app.withdraw()
+        results = [app.solve(c) for c in cases]
+
+        def redraw(inputs, result):
+            app.show_results(inputs, result)
+            app.update_idletasks()
+
+        yield summarize("show_results", {},
+                        measure(redraw, list(zip(cases, results)), min_time))
+        yield summarize("draw_scenario", {},
+                        measure(lambda r: (app.draw_scenario(
+                            app.canvas2, r["t1"], r["t2"], r["t3"],
+                            app.L1_mm, app.L2_mm, app.L3_mm, label="Scenario 2",
+                            highlight_distance=r["max_x"] * 1000),
+                            app.update_idletasks()),
+                            [(r,) for r in results], min_time))
+    finally:
+        app.destroy()
+        stop_virtual_display(display)
+
+
+# -------------------------------------------------------------------------
+# DRIVER
+# -------------------------------------------------------------------------
+def problem_sizes(quick=False):
+    """Default sizes: grid resolutions, adaptive resolutions, sweep rows."""
+    if quick:
+        return {"resolutions": [1, 0.5], "adaptive": [0.1],
+                "sweep_sizes": [1000, 10000], "cases": 50, "min_time": 0.1}
+    return {"resolutions": [1, 0.5, 0.25, 0.1], "adaptive": [0.1, 0.01],
+            "sweep_sizes": [1000, 10000, 100000], "cases": 200, "min_time": 0.5}
+
+
+def run(quick=False, seed=0, canvas="auto", **sizes):
+    """
+    Run every benchmark. ``canvas`` is "auto" (skip the canvas cases
+    without a display), "require" (fail instead) or "off". ``sizes``
+    overrides problem_sizes(quick): lists of resolutions / adaptive
+    resolutions / sweep_sizes, the number of random cases and min_time
+    (seconds per case).
+    """
+    sizes = {**problem_sizes(quick),
+             **{k: v for k, v in sizes.items() if v is not None}}
+    rng = random.Random(seed)
+    cases = [arm_solver.default_inputs()] + [random_inputs(rng)
+                                             for _ in range(sizes["cases"] - 1)]
+    min_time = sizes["min_time"]
+    results = []
+    groups = [bench_scenario1(cases, min_time),
+              bench_calculate_torques(cases, min_time),
+              bench_find_max_x(cases, min_time, sizes["resolutions"],
+                               sizes["adaptive"]),
+              bench_update_cycle(cases, min_time),
+              bench_sweep(min_time, sizes["sweep_sizes"])]
+    if canvas != "off":
+        groups.append(bench_canvas(cases[:50], min_time, canvas == "require"))
+    for group in groups:
+        for result in group:
+            print(format_result(result), file=sys.stderr)
+            results.append(result)
+    return {"meta": metadata(quick, seed, sizes), "results": results}
+
+
+def metadata(quick, seed, sizes):
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "quick": quick,
+        "seed": seed,
+        "sizes": sizes,
+    }
+
+
+def result_id(result):
+    params = ",".join(f"{k}={v}" for k, v in sorted(result.get("params", {}).items()))
+    return f"{result['name']}[{params}]" if params else result["name"]
+
+
+def format_result(result):
+    if "skipped" in result:
+        return f"{result_id(result):45s} skipped: {result['skipped']}"
+    line = (f"{result_id(result):45s} p50 {result['p50_ms']:9.4f} ms  "
+            f"p95 {result['p95_ms']:9.4f} ms  p99 {result['p99_ms']:9.4f} ms")
+    if "poses_per_s" in result:
+        line += f"  {result['poses_per_s']:14,.0f} poses/s"
+    if "rows_per_s" in result:
+        line += f"  {result['rows_per_s']:14,.0f} rows/s"
+    return line
+
+
+def compare(old, new):
+    """Print the p50 ratio new/old for every case present in both runs."""
+    previous = {result_id(r): r for r in old["results"] if "skipped" not in r}
+    print(f"compared with {old['meta'].get('commit')} ({old['meta'].get('timestamp')}):")
+    for result in new["results"]:
+        before = previous.get(result_id(result))
+        if before is None or "skipped" in result:
+            continue
+        ratio = result["p50_ms"] / before["p50_ms"]
+        flag = "  SLOWER" if ratio > 1.1 else ""
+        print(f"  {result_id(result):45s} p50 x{ratio:6.2f}{flag}")
+
+
+def number_list(text):
+    return [float(v) if "." in v else int(v) for v in text.split(",")]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", metavar="OLD_JSON",
+                        help="report p50 ratios against a previous run")
+    parser.add_argument("--quick", action="store_true",
+                        help="smaller problem sizes and shorter timings")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--resolutions", type=number_list, metavar="DEG,...",
+                        help="find_max_x_grid resolutions (default 1,0.5,0.25,0.1)")
+    parser.add_argument("--adaptive", type=number_list, metavar="DEG,...",
+                        help="find_max_x_adaptive resolutions (default 0.1,0.01)")
+    parser.add_argument("--sweep-sizes", type=number_list, metavar="N,...",
+                        help="sweep.solve_chunk rows (default 1000,10000,100000)")
+    parser.add_argument("--cases", type=int,
+                        help="random input sets cycled through (default 200)")
+    parser.add_argument("--min-time", type=float,
+                        help="minimum seconds per benchmark (default 0.5)")
+    parser.add_argument("--canvas", choices=("auto", "require", "off"), default="auto",
+                        help="canvas redraw cases: skip without a display (auto, the "
+                             "default), fail without one (require) or leave out (off)")
+    args = parser.parse_args(argv)
+
+    try:
+        report = run(quick=args.quick, seed=args.seed, canvas=args.canvas,
+                     resolutions=args.resolutions, adaptive=args.adaptive,
+                     sweep_sizes=args.sweep_sizes, cases=args.cases,
+                     min_time=args.min_time)
+    except RuntimeError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"wrote {args.output}", file=sys.stderr)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
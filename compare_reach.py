@@ -0,0 +1,129 @@
+"""
+Compare the vectorized Scenario 2 reach search against the scalar loop.
+
+Runs both solvers over the default parameters plus a set of random mass /
+limit combinations, checks that every result is identical and prints the
+timing of each path. Boundary cases, where one limit equals the torque of a
+candidate pose exactly (so the <= check is decided by the last bit), are
+checked too. The continuous solver is run on the same cases and
+its reach is reported relative to the 1° grid, and the adaptive solver is
+checked against the full grid at ``--fine`` resolution:
+
+    python compare_reach.py [--cases N] [--repeat N] [--seed N] [--fine DEG]
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+import arm_solver
+
+DEFAULT_CASE = (0.367, 0.44, 0.15, 1.09, 0.82, 4.0, 33.0, 21.0)
+L1_M, L2_M, L3_M = 0.400, 0.450, 0.180
+
+
+def random_case(rng):
+    masses = [round(rng.uniform(0, 3), 3) for _ in range(5)]
+    rock_mass = round(rng.uniform(0, 10), 3)
+    return (*masses, rock_mass,
+            round(rng.uniform(0, 200), 2), round(rng.uniform(0, 100), 2))
+
+
+def boundary_cases(case):
+    """
+    ``case`` with the shoulder, then the elbow limit set to |torque| of
+    each pose the 1° grid checks.
+    """
+    geometry = arm_solver.ReachGeometry(L1_M, L2_M, L3_M)
+    masses, (shoulder_limit, elbow_limit) = case[:6], case[6:]
+    cases = []
+    for t1, t2 in zip(geometry.t1, geometry.t2):
+        Ts, Te = arm_solver.calculate_torques(
+            t1, t2, arm_solver.T3, L1_M, L2_M, L3_M, *masses)
+        cases.append((*masses, abs(Ts), elbow_limit))
+        cases.append((*masses, shoulder_limit, abs(Te)))
+    return cases
+
+
+def best_time(fn, args, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(L1_M, L2_M, L3_M, *args)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cases", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--fine", type=float, default=0.1,
+                        help="resolution (deg) for the adaptive vs grid check")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    cases = [DEFAULT_CASE] + [random_case(rng) for _ in range(args.cases)]
+    scalar_total = 0.0
+    vector_total = 0.0
+    continuous_total = 0.0
+    fine_total = 0.0
+    adaptive_total = 0.0
+    gains_mm = []
+    mismatches = 0
+    # Built once and kept outside GEOMETRY_CACHE, which holds a single grid
+    fine_geometry = arm_solver.ReachGeometry(L1_M, L2_M, L3_M, args.fine)
+
+    def fine_grid(L1_m, L2_m, L3_m, m1, m2, m3, m4, m5, rock_mass,
+                  shoulder_limit, elbow_limit, resolution_deg):
+        return fine_geometry.solve(np.array((m1, m2, m3, m4, m5, rock_mass)),
+                                   shoulder_limit, elbow_limit)
+    for case in cases:
+        expected, t_scalar = best_time(arm_solver.find_max_x_scalar, case, args.repeat)
+        actual, t_vector = best_time(arm_solver.find_max_x, case, args.repeat)
+        continuous, t_continuous = best_time(
+            arm_solver.find_max_x_continuous, case, args.repeat)
+        scalar_total += t_scalar
+        vector_total += t_vector
+        continuous_total += t_continuous
+        gains_mm.append((continuous[0] - actual[0]) * 1000)
+        if actual != expected:
+            mismatches += 1
+            print(f"MISMATCH for {case}: scalar={expected} vectorized={actual}")
+
+        fine_case = case + (args.fine,)
+        fine, t_fine = best_time(fine_grid, fine_case, args.repeat)
+        adaptive, t_adaptive = best_time(
+            arm_solver.find_max_x_adaptive, fine_case, args.repeat)
+        fine_total += t_fine
+        adaptive_total += t_adaptive
+        if adaptive != fine:
+            mismatches += 1
+            print(f"MISMATCH for {case} at {args.fine}°: grid={fine} adaptive={adaptive}")
+
+    boundary = boundary_cases(DEFAULT_CASE)
+    for case in boundary:
+        expected = arm_solver.find_max_x_scalar(L1_M, L2_M, L3_M, *case)
+        actual = arm_solver.find_max_x(L1_M, L2_M, L3_M, *case)
+        if actual != expected:
+            mismatches += 1
+            print(f"MISMATCH for boundary {case}: scalar={expected} vectorized={actual}")
+
+    n = len(cases)
+    print(f"cases:       {n} (+ {len(boundary)} boundary)")
+    print(f"scalar:      {scalar_total / n * 1000:8.3f} ms / solve")
+    print(f"vectorized:  {vector_total / n * 1000:8.3f} ms / solve")
+    print(f"speedup:     {scalar_total / vector_total:8.1f}x")
+    print(f"mismatches:  {mismatches}")
+    print(f"continuous:  {continuous_total / n * 1000:8.3f} ms / solve")
+    print(f"  reach vs grid: mean {sum(gains_mm) / n:+.2f} mm, "
+          f"min {min(gains_mm):+.2f} mm, max {max(gains_mm):+.2f} mm")
+    print(f"grid {args.fine}°:   {fine_total / n * 1000:8.3f} ms / solve")
+    print(f"adaptive:    {adaptive_total / n * 1000:8.3f} ms / solve")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
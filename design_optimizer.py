@@ -0,0 +1,253 @@
+"""
+Link-length design optimizer for Scenario 2 reach.
+
+Searches a grid of (L1, L2, L3) link lengths for the given payload and motor
+limits. Link masses scale with length (constant mass per metre, taken from
+the nominal 400/450/180 mm arm) unless --fixed-masses is given; the joint
+masses and the rock stay as set. Each candidate is solved at several torque
+headroom levels h, i.e. with both limits derated to (1 - h) x limit, in one
+ReachGeometry.solve_batch call, which yields the Pareto front of reach vs.
+headroom:
+
+    python design_optimizer.py run.jsonl --L1_mm 300:500:21 --L2_mm 350:550:21 \\
+        --L3_mm 120:240:7 --rock_mass 5
+
+Candidates are evaluated in a process pool; the sin/cos tables of the angle
+grid do not depend on the lengths and are built once per worker
+(arm_solver.angle_trig). Every finished candidate is appended to the
+checkpoint file, so an interrupted run started again with the same
+arguments only evaluates what is missing.
+"""
+import argparse
+import concurrent.futures
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+import arm_solver
+from sweep import parse_values
+
+CHECKPOINT_VERSION = 1
+DEFAULT_HEADROOM = tuple(np.round(np.arange(0.0, 0.51, 0.05), 2))
+LINK_MASS_KEYS = ("m1", "m2", "m3")
+
+
+def link_masses(inputs, lengths_mm, scale=True):
+    """Return (m1, m2, m3) for ``lengths_mm``, scaled by length if ``scale``."""
+    masses = [inputs[key] for key in LINK_MASS_KEYS]
+    if not scale:
+        return tuple(masses)
+    return tuple(m * L / L0 for m, L, L0
+                 in zip(masses, lengths_mm, arm_solver.DEFAULT_LENGTHS_MM))
+
+
+# -------------------------------------------------------------------------
+# WORKER
+# -------------------------------------------------------------------------
+def evaluate_candidates(candidates, inputs, headroom, scale_masses=True,
+                        resolution_deg=1):
+    """
+    Solve each (L1_mm, L2_mm, L3_mm) candidate at every headroom level.
+    Returns one JSON-ready record per candidate.
+    """
+    headroom = np.asarray(headroom, dtype=float)
+    shoulder_limits = inputs["shoulder_limit"] * (1 - headroom)
+    elbow_limits = inputs["elbow_limit"] * (1 - headroom)
+    records = []
+    for lengths_mm in candidates:
+        m1, m2, m3 = link_masses(inputs, lengths_mm, scale_masses)
+        masses = np.array((m1, m2, m3, inputs["m4"], inputs["m5"], inputs["rock_mass"]))
+        geometry = arm_solver.ReachGeometry(
+            *(L / 1000.0 for L in lengths_mm), resolution_deg)
+        max_x, t1, t2 = geometry.solve_batch(
+            np.tile(masses, (headroom.size, 1)), shoulder_limits, elbow_limits)
+        # Actual headroom of the chosen pose (>= the level it was solved at)
+        Ts, Te = arm_solver.calculate_torques_array(
+            t1, t2, arm_solver.T3, *(L / 1000.0 for L in lengths_mm), *masses)
+        actual = np.minimum(1 - np.abs(Ts) / inputs["shoulder_limit"],
+                            1 - np.abs(Te) / inputs["elbow_limit"])
+        found = max_x > 0
+        records.append({
+            "lengths_mm": [float(L) for L in lengths_mm],
+            "link_masses": [m1, m2, m3],
+            "max_x_mm": (max_x * 1000).tolist(),
+            "t1_deg": np.degrees(t1).tolist(),
+            "t2_deg": np.degrees(t2).tolist(),
+            "headroom": [float(h) if ok else None for h, ok in zip(actual, found)],
+        })
+    return records
+
+
+# -------------------------------------------------------------------------
+# PARETO FRONT
+# -------------------------------------------------------------------------
+def pareto_front(records):
+    """
+    Return the (candidate, level) points not dominated in (reach, headroom),
+    sorted by decreasing reach.
+    """
+    points = []
+    for record in records:
+        for level, (x, h) in enumerate(zip(record["max_x_mm"], record["headroom"])):
+            if h is not None:
+                points.append((x, h, record, level))
+    points.sort(key=lambda p: (-p[0], -p[1]))
+    front = []
+    best_h = -np.inf
+    for x, h, record, level in points:
+        if h > best_h:
+            best_h = h
+            front.append({
+                "max_x_mm": x,
+                "headroom": h,
+                "lengths_mm": record["lengths_mm"],
+                "link_masses": record["link_masses"],
+                "t1_deg": record["t1_deg"][level],
+                "t2_deg": record["t2_deg"][level],
+            })
+    return front
+
+
+# -------------------------------------------------------------------------
+# DRIVER
+# -------------------------------------------------------------------------
+def load_checkpoint(path, config):
+    """Return the records already in ``path``; it must have been run with ``config``."""
+    if not os.path.exists(path):
+        return []
+    records = []
+    with open(path) as f:
+        header = json.loads(f.readline() or "{}")
+        if header.get("config") != config:
+            raise ValueError(f"{path} was written with different settings; "
+                             "use a new checkpoint file")
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                # A line cut off by an interrupted run; it is re-evaluated
+                break
+    return records
+
+
+def optimize(axes, checkpoint, inputs=None, headroom=DEFAULT_HEADROOM,
+             scale_masses=True, resolution_deg=1, workers=None, chunk_size=32,
+             progress=None):
+    """
+    Evaluate every combination of ``axes`` ({"L1_mm": values, ...}) and
+    return {"best": ..., "front": [...], "candidates": n}.
+
+    ``checkpoint`` is a JSON-lines file of finished candidates; existing
+    ones are reused. ``progress(done, total)`` is called after each chunk.
+    """
+    inputs = {**arm_solver.default_inputs(), **(inputs or {})}
+    inputs.pop("mode", None)
+    headroom = [float(h) for h in headroom]
+    config = {
+        "version": CHECKPOINT_VERSION,
+        "inputs": inputs,
+        "headroom": headroom,
+        "scale_masses": scale_masses,
+        "resolution_deg": resolution_deg,
+    }
+    grid = np.meshgrid(*(np.asarray(axes[key], dtype=float)
+                         for key in arm_solver.LENGTH_KEYS), indexing="ij")
+    candidates = [tuple(float(v) for v in c)
+                  for c in np.column_stack([g.ravel() for g in grid])]
+
+    records = load_checkpoint(checkpoint, config)
+    done = {tuple(r["lengths_mm"]) for r in records}
+    todo = [c for c in candidates if c not in done]
+    chunks = [todo[i:i + chunk_size] for i in range(0, len(todo), chunk_size)]
+    workers = workers or os.cpu_count() or 1
+
+    # Rewrite the file (atomically) so a partial last line from an
+    # interrupted run is dropped, then append to it
+    with open(checkpoint + ".tmp", "w") as f:
+        f.write(json.dumps({"config": config}) + "\n")
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+    os.replace(checkpoint + ".tmp", checkpoint)
+
+    finished = len(candidates) - len(todo)
+    with open(checkpoint, "a") as f:
+
+        def store(new):
+            nonlocal finished
+            for record in new:
+                f.write(json.dumps(record) + "\n")
+            f.flush()
+            records.extend(new)
+            finished += len(new)
+            if progress:
+                progress(finished, len(candidates))
+
+        args = (inputs, headroom, scale_masses, resolution_deg)
+        if workers == 1:
+            for chunk in chunks:
+                store(evaluate_candidates(chunk, *args))
+        else:
+            with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+                futures = [pool.submit(evaluate_candidates, chunk, *args)
+                           for chunk in chunks]
+                for future in concurrent.futures.as_completed(futures):
+                    store(future.result())
+
+    wanted = set(candidates)
+    records = [r for r in records if tuple(r["lengths_mm"]) in wanted]
+    front = pareto_front(records)
+    return {
+        "candidates": len(records),
+        "best": front[0] if front else None,
+        "front": front,
+    }
+
+
+# -------------------------------------------------------------------------
+# COMMAND LINE
+# -------------------------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().splitlines()[0],
+        epilog="Lengths: start:stop:num, a,b,c or a single number (mm).")
+    parser.add_argument("checkpoint", help="JSON-lines file of evaluated candidates")
+    for key, default in zip(arm_solver.LENGTH_KEYS, arm_solver.DEFAULT_LENGTHS_MM):
+        parser.add_argument(f"--{key}", type=parse_values, metavar="VALUES",
+                            default=np.linspace(0.75 * default, 1.25 * default, 11))
+    arm_solver.add_arm_arguments(parser, lengths=False)
+    parser.add_argument("--headroom", type=parse_values, default=DEFAULT_HEADROOM,
+                        help="torque headroom levels (fractions of the limits)")
+    parser.add_argument("--fixed-masses", action="store_true",
+                        help="keep the link masses instead of scaling them with length")
+    parser.add_argument("--resolution", type=float, default=1,
+                        help="angle grid resolution in degrees")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    axes = {key: getattr(args, key) for key in arm_solver.LENGTH_KEYS}
+    inputs = {key: getattr(args, key) for key in arm_solver.INPUT_KEYS}
+    start = time.perf_counter()
+
+    def progress(done, total):
+        print(f"\r{done}/{total} candidates", end="", file=sys.stderr, flush=True)
+
+    try:
+        result = optimize(axes, args.checkpoint, inputs, headroom=args.headroom,
+                          scale_masses=not args.fixed_masses,
+                          resolution_deg=args.resolution, workers=args.workers,
+                          progress=progress)
+    except ValueError as exc:
+        parser.error(str(exc))
+    print(f"\n{result['candidates']} candidates in "
+          f"{time.perf_counter() - start:.2f} s", file=sys.stderr)
+    json.dump(result, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,106 @@
+"""
+Lightweight latency instrumentation for the update pipeline.
+
+LatencyStats keeps a rolling window of durations per stage plus counters
+(last value and running total), and can report p50/p95/p99, format a
+one-line status and dump everything to JSON. It is thread-safe: the solver
+stages are recorded on the scheduler's worker thread and the drawing stages
+on the Tk thread.
+
+    stats = LatencyStats()
+    with stats.time("find_max_X"):
+        ...
+    stats.count("band_poses", 74)
+"""
+import collections
+import contextlib
+import json
+import threading
+import time
+
+import numpy as np
+
+
+class LatencyStats:
+    def __init__(self, window=1000):
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples = collections.OrderedDict()
+        self._counters = collections.OrderedDict()
+        self.started = time.time()
+
+    def record(self, stage, seconds):
+        with self._lock:
+            samples = self._samples.get(stage)
+            if samples is None:
+                samples = self._samples[stage] = collections.deque(maxlen=self.window)
+            samples.append(seconds)
+
+    @contextlib.contextmanager
+    def time(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def count(self, name, n=1):
+        """Record ``n`` for counter ``name`` (kept as last value and total)."""
+        with self._lock:
+            last, total = self._counters.get(name, (0, 0))
+            self._counters[name] = (n, total + n)
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._counters.clear()
+            self.started = time.time()
+
+    def summary(self):
+        """Return {"stages": {stage: stats in ms}, "counters": {...}}."""
+        with self._lock:
+            samples = {stage: np.array(s) * 1000 for stage, s in self._samples.items()}
+            counters = {name: {"last": last, "total": total}
+                        for name, (last, total) in self._counters.items()}
+        stages = {}
+        for stage, ms in samples.items():
+            if ms.size == 0:
+                continue
+            p50, p95, p99 = np.percentile(ms, (50, 95, 99))
+            stages[stage] = {
+                "n": int(ms.size),
+                "mean_ms": float(ms.mean()),
+                "p50_ms": float(p50),
+                "p95_ms": float(p95),
+                "p99_ms": float(p99),
+                "max_ms": float(ms.max()),
+            }
+        return {"stages": stages, "counters": counters}
+
+    def format_status(self):
+        """One line: p50/p95/p99 per stage (ms) and the last counter values."""
+        summary = self.summary()
+        parts = [f"{stage} {s['p50_ms']:.2f}/{s['p95_ms']:.2f}/{s['p99_ms']:.2f}"
+                 for stage, s in summary["stages"].items()]
+        counters = [f"{name} {value['last']}"
+                    for name, value in summary["counters"].items()]
+        line = "p50/p95/p99 ms: " + ("  ·  ".join(parts) or "no samples")
+        if counters:
+            line += "   |   " + ", ".join(counters)
+        return line
+
+    def dump(self, path):
+        """Write the summary plus the raw windows to ``path`` as JSON."""
+        with self._lock:
+            raw = {stage: [s * 1000 for s in samples]
+                   for stage, samples in self._samples.items()}
+        report = {
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+            "dumped": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "window": self.window,
+            **self.summary(),
+            "samples_ms": raw,
+        }
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+        return path
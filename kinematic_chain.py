@@ -0,0 +1,162 @@
+"""
+Generic planar serial chain for gravity torque calculations.
+
+A chain of n links is stored as contiguous float arrays: link lengths,
+link masses and the position of each link's centre of mass along it,
+joint masses (joint_masses[i] sits on the pivot at the start of link i;
+joint_masses[0] is on the base) and a payload at the tip. For a pose the
+cumulative link angles, the cosines and the joint positions are computed
+once, and the torques about every joint follow from suffix sums of mass and
+first moment along the chain, so the cost is O(n) per pose with no repeated
+trigonometry. All pose arguments accept a batch: an (..., n) array of joint
+angles.
+
+    chain = KinematicChain([0.40, 0.45, 0.18], link_masses=[0.367, 0.44, 0.15],
+                           joint_masses=[0, 1.09, 0.82], payload=4.0,
+                           absolute=[False, False, True])
+    torques = chain.torques(poses)      # (..., 3): shoulder, elbow, wrist
+"""
+import math
+
+import numpy as np
+
+G = 9.87
+
+
+class KinematicChain:
+    """
+    Planar chain of ``len(lengths)`` links hanging off a pivot at ``base``.
+
+    Joint angles are relative to the previous link, except where
+    ``absolute`` is set: that link's angle is measured from the x axis (the
+    three-link arm holds link3 at a fixed absolute angle). ``com`` is the
+    fraction of each link's length at which its mass sits.
+    """
+
+    def __init__(self, lengths, link_masses=None, joint_masses=None, payload=0.0,
+                 com=0.5, absolute=False, base=(0.0, 0.0), g=G):
+        self.lengths = np.ascontiguousarray(lengths, dtype=float)
+        n = self.lengths.size
+        self.link_masses = self._per_link(link_masses, n)
+        self.joint_masses = self._per_link(joint_masses, n)
+        self.com = self._per_link(com, n)
+        self.absolute = np.broadcast_to(np.asarray(absolute, dtype=bool), (n,)).copy()
+        self.payload = float(payload)
+        self.base = tuple(float(v) for v in base)
+        self.g = g
+
+    @staticmethod
+    def _per_link(values, n):
+        if values is None:
+            values = 0.0
+        return np.ascontiguousarray(np.broadcast_to(np.asarray(values, dtype=float), (n,)))
+
+    def __len__(self):
+        return self.lengths.size
+
+    # ---------------------------------------------------------------------
+    # Kinematics
+    # ---------------------------------------------------------------------
+    def cumulative_angles(self, angles):
+        """Absolute angle of every link, shape (..., n)."""
+        angles = np.asarray(angles, dtype=float)
+        if not self.absolute.any():
+            return np.cumsum(angles, axis=-1)
+        phi = np.empty(np.broadcast_shapes(angles.shape, self.lengths.shape))
+        previous = 0.0
+        for i in range(len(self)):
+            phi[..., i] = angles[..., i] if self.absolute[i] else previous + angles[..., i]
+            previous = phi[..., i]
+        return phi
+
+    def positions(self, angles):
+        """
+        Return (x, y) of the base, every joint and the tip, each (..., n+1),
+        in the units of the link lengths.
+        """
+        phi = self.cumulative_angles(angles)
+        x = self._accumulate(self.lengths * np.cos(phi), self.base[0])
+        y = self._accumulate(self.lengths * np.sin(phi), self.base[1])
+        return x, y
+
+    @staticmethod
+    def _accumulate(segments, origin):
+        out = np.empty(segments.shape[:-1] + (segments.shape[-1] + 1,))
+        out[..., 0] = origin
+        np.cumsum(segments, axis=-1, out=out[..., 1:])
+        out[..., 1:] += origin
+        return out
+
+    # ---------------------------------------------------------------------
+    # Statics
+    # ---------------------------------------------------------------------
+    def torques(self, angles):
+        """
+        Gravity torque about every joint, shape (..., n); index 0 is the base
+        joint. Each joint carries every mass beyond it:
+        T_k = -g * sum(m_p * (x_p - x_k)).
+        """
+        phi = self.cumulative_angles(angles)
+        segments = self.lengths * np.cos(phi)
+        x_joint = self._accumulate(segments, self.base[0])
+        x_com = x_joint[..., :-1] + self.com * segments
+
+        # Mass and first moment carried by each link slot (joint mass at
+        # its start plus the link itself), then summed from the tip inwards
+        mass = self.joint_masses + self.link_masses
+        moment = self.joint_masses * x_joint[..., :-1] + self.link_masses * x_com
+        moment[..., -1] += self.payload * x_joint[..., -1]
+        carried_mass = np.cumsum(mass[::-1])[::-1] + self.payload
+        carried_moment = np.cumsum(moment[..., ::-1], axis=-1)[..., ::-1]
+        return -self.g * (carried_moment - carried_mass * x_joint[..., :-1])
+
+    def mass_vector(self):
+        """The masses in lever_arms() column order: links, joints, payload."""
+        return np.concatenate((self.link_masses, self.joint_masses, [self.payload]))
+
+    def lever_arms(self, angles):
+        """
+        Return (..., n, 2n+1) coefficients (already times -g) mapping
+        mass_vector() to the joint torques: ``torques = arms @ masses``.
+        Useful when the pose is fixed and the masses vary.
+        """
+        n = len(self)
+        phi = self.cumulative_angles(angles)
+        segments = self.lengths * np.cos(phi)
+        x_joint = self._accumulate(segments, self.base[0])
+        x_mass = np.concatenate((x_joint[..., :-1] + self.com * segments,
+                                 x_joint[..., :-1], x_joint[..., -1:]), axis=-1)
+        index = np.arange(n)
+        beyond = np.concatenate((index[None, :] >= index[:, None],
+                                 index[None, :] > index[:, None],
+                                 np.ones((n, 1), dtype=bool)), axis=1)
+        arms = x_mass[..., None, :] - x_joint[..., :-1, None]
+        return -self.g * np.where(beyond, arms, 0.0)
+
+
+# -------------------------------------------------------------------------
+# INVERSE KINEMATICS HELPERS
+# -------------------------------------------------------------------------
+def two_link_elbow(base, wrist, L1, L2, elbow_up=True):
+    """
+    Return the elbow point of a two-link chain from ``base`` to ``wrist``
+    with link lengths L1 and L2 (the higher of the two solutions if
+    ``elbow_up``). Raises ValueError if the wrist is out of reach.
+    """
+    dx, dy = wrist[0] - base[0], wrist[1] - base[1]
+    d = math.hypot(dx, dy)
+    if d > L1 + L2 or d < abs(L1 - L2) or d == 0:
+        raise ValueError(f"Wrist {wrist} is out of reach from {base}")
+    along = (L1 * L1 - L2 * L2 + d * d) / (2 * d)
+    across = math.sqrt(max(L1 * L1 - along * along, 0.0))
+    mx, my = base[0] + along * dx / d, base[1] + along * dy / d
+    candidates = [(mx - across * dy / d, my + across * dx / d),
+                  (mx + across * dy / d, my - across * dx / d)]
+    return max(candidates, key=lambda p: p[1]) if elbow_up else min(
+        candidates, key=lambda p: p[1])
+
+
+def link_angles(points):
+    """Absolute angle of each segment of a polyline of (x, y) points."""
+    return np.array([math.atan2(b[1] - a[1], b[0] - a[0])
+                     for a, b in zip(points[:-1], points[1:])])
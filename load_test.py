@@ -0,0 +1,177 @@
+"""
+Load generator for solver_service.py.
+
+Keeps ``--connections`` keep-alive connections busy for ``--duration``
+seconds, each sending POST /solve requests of ``--cases`` random cases, and
+prints request / case throughput and latency percentiles as JSON:
+
+    python solver_service.py &
+    python load_test.py --connections 32 --cases 8 --duration 10
+
+With --spawn a service is started on a free port for the run and stopped
+afterwards.
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.parse
+
+import numpy as np
+
+import arm_solver
+
+
+def random_cases(rng, n, rel_sd=0.1, mode="grid"):
+    """``n`` cases with masses scattered around the GUI defaults."""
+    cases = []
+    for _ in range(n):
+        case = {p["key"]: float(abs(rng.normal(p["default"], rel_sd * p["default"])))
+                for p in arm_solver.PARAMS}
+        case["mode"] = mode
+        cases.append(case)
+    return cases
+
+
+async def post(reader, writer, host, path, payload):
+    body = json.dumps(payload).encode()
+    writer.write(
+        f"POST {path} HTTP/1.1\r\nHost: {host}\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+        .encode() + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    data = await reader.readexactly(length)
+    return status, data
+
+
+async def client(host, port, cases, mode, deadline, seed, latencies, errors):
+    rng = np.random.default_rng(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            payload = {"cases": random_cases(rng, cases, mode=mode)}
+            start = time.perf_counter()
+            status, _ = await post(reader, writer, host, "/solve", payload)
+            if status == 200:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+async def run_load(host, port, connections=16, cases=1, duration=10.0, mode="grid",
+                   seed=0):
+    """Return throughput and latency figures for one load run."""
+    latencies, errors = [], []
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*(
+        client(host, port, cases, mode, deadline, seed + i, latencies, errors)
+        for i in range(connections)))
+    elapsed = time.perf_counter() - start
+    ms = np.array(latencies) * 1000
+    summary = {
+        "connections": connections,
+        "cases_per_request": cases,
+        "mode": mode,
+        "elapsed_s": elapsed,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "requests_per_s": len(latencies) / elapsed,
+        "cases_per_s": len(latencies) * cases / elapsed,
+    }
+    if ms.size:
+        summary["latency_ms"] = {
+            "mean": float(ms.mean()),
+            "p50": float(np.percentile(ms, 50)),
+            "p95": float(np.percentile(ms, 95)),
+            "p99": float(np.percentile(ms, 99)),
+            "max": float(ms.max()),
+        }
+    return summary
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def spawn_service(port, extra):
+    """Start solver_service.py on ``port``; returns the process once it listens."""
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "solver_service.py")
+    process = subprocess.Popen(
+        [sys.executable, script, "--port", str(port), *extra],
+        stderr=subprocess.PIPE, text=True)
+    line = process.stderr.readline()
+    if not line.startswith("listening"):
+        process.kill()
+        raise RuntimeError(f"service did not start: {line.strip()}")
+    return process
+
+
+def stop_service(process, timeout=10.0):
+    """SIGTERM the service (it shuts its pool down), killing it if it hangs."""
+    process.terminate()
+    try:
+        # communicate() drains stderr so the service cannot block on a full pipe
+        process.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.communicate()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8765",
+                        help="service address (ignored with --spawn)")
+    parser.add_argument("--connections", type=int, default=16)
+    parser.add_argument("--cases", type=int, default=1,
+                        help="cases per request")
+    parser.add_argument("--duration", type=float, default=10.0,
+                        help="seconds of load")
+    parser.add_argument("--mode", choices=sorted(arm_solver.REACH_MODES), default="grid")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--spawn", action="store_true",
+                        help="start a solver_service.py for the run")
+    parser.add_argument("--service-args", default="",
+                        help="extra solver_service.py options with --spawn, e.g. "
+                             "'--workers 4 --batch-ms 1'")
+    args = parser.parse_args(argv)
+
+    process = None
+    if args.spawn:
+        host, port = "127.0.0.1", free_port()
+        process = spawn_service(port, args.service_args.split())
+    else:
+        url = urllib.parse.urlsplit(args.url)
+        host, port = url.hostname, url.port or 80
+    try:
+        print(f"{args.connections} connections x {args.cases} cases for "
+              f"{args.duration:g} s against {host}:{port}", file=sys.stderr)
+        summary = asyncio.run(run_load(host, port, args.connections, args.cases,
+                                       args.duration, args.mode, args.seed))
+    finally:
+        if process is not None:
+            stop_service(process)
+    json.dump(summary, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,318 @@
+"""
+Monte Carlo tolerance analysis of the masses and motor limits.
+
+Every mass and limit is drawn from a distribution around its nominal value
+(default: normal with a 5 % standard deviation); for each sample the
+Scenario 2 max reach and whether the Scenario 1 pose exceeds the limits are
+evaluated. Samples are solved in vectorized batches (ReachGeometry.
+solve_batch) across a process pool and only summary statistics and a reach
+histogram are kept, so memory does not grow with the sample count:
+
+    python montecarlo.py --samples 1000000 --dist rock_mass=uniform:3:6 \\
+        --dist shoulder_limit=normal:33:2
+
+Batch i always uses the random stream spawned from (seed, i) and batches
+are merged in order, so results depend on the seed but not on the number of
+workers. The run stops early once the 95 % confidence intervals of the mean
+reach and of the exceedance probabilities are narrower than the requested
+tolerances.
+"""
+import argparse
+import concurrent.futures
+import json
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+import arm_solver
+import workspace_cache
+
+SAMPLE_KEYS = arm_solver.INPUT_KEYS
+DEFAULT_REL_SD = 0.05
+HIST_BIN_MM = 0.5
+Z95 = 1.959963984540054
+
+
+# -------------------------------------------------------------------------
+# DISTRIBUTIONS
+# -------------------------------------------------------------------------
+def parse_distribution(text):
+    """
+    Parse ``normal:MEAN:SD``, ``uniform:LO:HI`` or a single number (fixed)
+    into a (kind, a, b) tuple.
+    """
+    parts = text.split(":")
+    if len(parts) == 1:
+        value = float(parts[0])
+        return ("fixed", value, value)
+    if len(parts) != 3 or parts[0] not in ("normal", "uniform"):
+        raise ValueError(f"Bad distribution {text!r} "
+                         "(use normal:MEAN:SD, uniform:LO:HI or a number)")
+    return (parts[0], float(parts[1]), float(parts[2]))
+
+
+def default_distributions(rel_sd=DEFAULT_REL_SD):
+    """Normal around every nominal (GUI default) value with ``rel_sd`` spread."""
+    return {p["key"]: ("normal", p["default"], abs(p["default"]) * rel_sd)
+            for p in arm_solver.PARAMS + arm_solver.MOTOR_LIMITS}
+
+
+def sample_inputs(distributions, rng, n):
+    """Draw ``n`` samples; returns {key: array}, clipped at zero."""
+    samples = {}
+    for key in SAMPLE_KEYS:
+        kind, a, b = distributions[key]
+        if kind == "normal":
+            values = rng.normal(a, b, n)
+        elif kind == "uniform":
+            values = rng.uniform(a, b, n)
+        else:
+            values = np.full(n, a)
+        samples[key] = np.maximum(values, 0.0)
+    return samples
+
+
+# -------------------------------------------------------------------------
+# WORKER
+# -------------------------------------------------------------------------
+def evaluate_batch(distributions, lengths_mm, seed, batch, n, resolution_deg=1):
+    """
+    Draw and solve batch number ``batch`` of ``n`` samples. Returns partial
+    sums: sample count, exceedance counts, reach sum / sum of squares / min
+    / max (metres) and the reach histogram.
+    """
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(batch,)))
+    samples = sample_inputs(distributions, rng, n)
+    masses = np.column_stack([samples[key] for key in arm_solver.MASS_KEYS])
+    shoulder_limit = samples["shoulder_limit"]
+    elbow_limit = samples["elbow_limit"]
+
+    Ts, Te = arm_solver.scenario1_torque_batch(masses)
+    shoulder_over = np.abs(Ts) > shoulder_limit
+    elbow_over = np.abs(Te) > elbow_limit
+
+    L_m = [L / 1000.0 for L in lengths_mm]
+    geometry = arm_solver.GEOMETRY_CACHE.get(*L_m, resolution_deg)
+    max_x = geometry.solve_batch(masses, shoulder_limit, elbow_limit)[0]
+    return {
+        "n": n,
+        "shoulder_over": int(shoulder_over.sum()),
+        "elbow_over": int(elbow_over.sum()),
+        "either_over": int((shoulder_over | elbow_over).sum()),
+        "no_reach": int((max_x <= 0.0).sum()),
+        "reach_sum": float(max_x.sum()),
+        "reach_sumsq": float((max_x ** 2).sum()),
+        "reach_min": float(max_x.min()),
+        "reach_max": float(max_x.max()),
+        "hist": np.bincount((max_x * 1000 / HIST_BIN_MM).astype(int),
+                            minlength=histogram_bins(lengths_mm)),
+    }
+
+
+def histogram_bins(lengths_mm):
+    return int(math.ceil(sum(lengths_mm) / HIST_BIN_MM)) + 1
+
+
+# -------------------------------------------------------------------------
+# STATISTICS
+# -------------------------------------------------------------------------
+class Accumulator:
+    """Running totals of evaluate_batch() results, merged in batch order."""
+
+    PROBABILITIES = ("shoulder_over", "elbow_over", "either_over", "no_reach")
+
+    def __init__(self, lengths_mm):
+        self.n = 0
+        self.counts = dict.fromkeys(self.PROBABILITIES, 0)
+        self.reach_sum = 0.0
+        self.reach_sumsq = 0.0
+        self.reach_min = math.inf
+        self.reach_max = -math.inf
+        self.hist = np.zeros(histogram_bins(lengths_mm), dtype=np.int64)
+
+    def add(self, part):
+        self.n += part["n"]
+        for key in self.PROBABILITIES:
+            self.counts[key] += part[key]
+        self.reach_sum += part["reach_sum"]
+        self.reach_sumsq += part["reach_sumsq"]
+        self.reach_min = min(self.reach_min, part["reach_min"])
+        self.reach_max = max(self.reach_max, part["reach_max"])
+        self.hist[:part["hist"].size] += part["hist"]
+
+    def reach_mean_sd(self):
+        mean = self.reach_sum / self.n
+        var = max(self.reach_sumsq / self.n - mean * mean, 0.0)
+        return mean, math.sqrt(var * self.n / max(self.n - 1, 1))
+
+    def probability(self, key):
+        """Return (p, half-width of the 95 % Wilson interval, lo, hi)."""
+        n, p = self.n, self.counts[key] / self.n
+        denom = 1 + Z95 ** 2 / n
+        centre = (p + Z95 ** 2 / (2 * n)) / denom
+        half = Z95 * math.sqrt(p * (1 - p) / n + Z95 ** 2 / (4 * n * n)) / denom
+        return p, half, max(centre - half, 0.0), min(centre + half, 1.0)
+
+    def converged(self, reach_tol_mm, prob_tol):
+        mean, sd = self.reach_mean_sd()
+        if Z95 * sd / math.sqrt(self.n) * 1000 > reach_tol_mm:
+            return False
+        return all(self.probability(key)[1] <= prob_tol for key in self.PROBABILITIES)
+
+    def quantile_mm(self, q):
+        """Reach quantile from the histogram (bin centre, HIST_BIN_MM wide)."""
+        cumulative = np.cumsum(self.hist)
+        i = int(np.searchsorted(cumulative, q * self.n))
+        return (i + 0.5) * HIST_BIN_MM
+
+    def report(self):
+        mean, sd = self.reach_mean_sd()
+        half = Z95 * sd / math.sqrt(self.n)
+        return {
+            "samples": self.n,
+            "max_reach_mm": {
+                "mean": mean * 1000,
+                "mean_ci95": [(mean - half) * 1000, (mean + half) * 1000],
+                "sd": sd * 1000,
+                "min": self.reach_min * 1000,
+                "max": self.reach_max * 1000,
+                **{f"p{int(q * 100):02d}": self.quantile_mm(q)
+                   for q in (0.01, 0.05, 0.5, 0.95, 0.99)},
+            },
+            "probabilities": {
+                key: {"p": p, "ci95": [lo, hi]}
+                for key in self.PROBABILITIES
+                for p, _, lo, hi in [self.probability(key)]
+            },
+        }
+
+
+# -------------------------------------------------------------------------
+# DRIVER
+# -------------------------------------------------------------------------
+def run_monte_carlo(distributions=None, lengths_mm=arm_solver.DEFAULT_LENGTHS_MM,
+                    samples=1_000_000, batch_size=4096, workers=None, seed=0,
+                    reach_tol_mm=0.5, prob_tol=0.001, min_samples=20_000,
+                    resolution_deg=1, progress=None):
+    """
+    Run up to ``samples`` samples and return the report dict.
+
+    ``distributions`` maps keys of SAMPLE_KEYS to (kind, a, b) tuples (see
+    parse_distribution); missing keys use default_distributions(). After
+    ``min_samples`` the run stops as soon as the 95 % interval of the mean
+    reach is within +-``reach_tol_mm`` and those of the probabilities within
+    +-``prob_tol`` (set either to 0 to always run every sample).
+    ``progress(done, total)`` is called after each merged batch.
+    """
+    specs = default_distributions()
+    for key, spec in (distributions or {}).items():
+        if key not in specs:
+            raise ValueError(f"Unknown parameter {key!r}")
+        specs[key] = spec
+    workers = workers or os.cpu_count() or 1
+    sizes = [min(batch_size, samples - start) for start in range(0, samples, batch_size)]
+    total = Accumulator(lengths_mm)
+    start = time.perf_counter()
+
+    def merge(part):
+        total.add(part)
+        if progress:
+            progress(total.n, samples)
+        return total.n >= min_samples and total.converged(reach_tol_mm, prob_tol)
+
+    args = (specs, tuple(lengths_mm), seed)
+    if workers == 1:
+        for batch, n in enumerate(sizes):
+            if merge(evaluate_batch(*args, batch, n, resolution_deg)):
+                break
+    else:
+        pool = concurrent.futures.ProcessPoolExecutor(
+            workers, initializer=workspace_cache.enable)
+        try:
+            pending = {}
+            finished = {}
+            submitted = merged = 0
+            stop = False
+            while merged < len(sizes) and not stop:
+                while submitted < len(sizes) and len(pending) < 2 * workers:
+                    future = pool.submit(evaluate_batch, *args, submitted,
+                                         sizes[submitted], resolution_deg)
+                    pending[future] = submitted
+                    submitted += 1
+                done, _ = concurrent.futures.wait(
+                    pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    finished[pending.pop(future)] = future.result()
+                # Merge strictly in batch order so the stopping point is
+                # reproducible
+                while merged in finished and not stop:
+                    stop = merge(finished.pop(merged))
+                    merged += 1
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    report = total.report()
+    report.update(
+        seed=seed,
+        converged=total.n < samples or total.converged(reach_tol_mm, prob_tol),
+        elapsed_s=time.perf_counter() - start,
+        lengths_mm=list(lengths_mm),
+        distributions={key: list(spec) for key, spec in specs.items()},
+    )
+    return report
+
+
+# -------------------------------------------------------------------------
+# COMMAND LINE
+# -------------------------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().splitlines()[0],
+        epilog="Distributions: normal:MEAN:SD, uniform:LO:HI or a fixed number.")
+    parser.add_argument("--samples", type=int, default=1_000_000)
+    parser.add_argument("--dist", action="append", default=[], metavar="KEY=DIST",
+                        help="distribution of one mass or limit (repeatable)")
+    parser.add_argument("--rel-sd", type=float, default=DEFAULT_REL_SD,
+                        help="relative sd of the default normal distributions")
+    for key, default in zip(arm_solver.LENGTH_KEYS, arm_solver.DEFAULT_LENGTHS_MM):
+        parser.add_argument(f"--{key}", type=float, default=float(default))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batch-size", type=int, default=4096)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: CPU count)")
+    parser.add_argument("--reach-tol-mm", type=float, default=0.5,
+                        help="stop when the mean reach 95%% CI is within +-this")
+    parser.add_argument("--prob-tol", type=float, default=0.001,
+                        help="stop when every probability 95%% CI is within +-this")
+    parser.add_argument("--min-samples", type=int, default=20_000)
+    args = parser.parse_args(argv)
+
+    distributions = default_distributions(args.rel_sd)
+    for item in args.dist:
+        key, _, spec = item.partition("=")
+        if key not in distributions:
+            parser.error(f"unknown parameter {key!r}")
+        try:
+            distributions[key] = parse_distribution(spec)
+        except ValueError as exc:
+            parser.error(str(exc))
+
+    def progress(done, total):
+        print(f"\r{done}/{total} samples", end="", file=sys.stderr, flush=True)
+
+    report = run_monte_carlo(
+        distributions, tuple(getattr(args, key) for key in arm_solver.LENGTH_KEYS),
+        samples=args.samples, batch_size=args.batch_size, workers=args.workers,
+        seed=args.seed, reach_tol_mm=args.reach_tol_mm, prob_tol=args.prob_tol,
+        min_samples=args.min_samples, progress=progress)
+    print(file=sys.stderr)
+    json.dump(report, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,71 @@
+"""
+Max-payload-vs-reach envelope for Scenario 2.
+
+find_max_x answers "how far can we reach with this rock?". The envelope is
+the inverse curve: for every horizontal reach X, the heaviest rock that can
+be held at a pose reaching at least X without exceeding the motor limits.
+
+At each candidate pose both torques are affine in the rock mass,
+T = a + b * rock_mass, so |T| <= limit gives the feasible rock interval in
+closed form. ReachGeometry keeps its poses sorted by decreasing X, so a
+running maximum of the per-pose limit over that order is the envelope, all
+in one vectorized pass.
+"""
+import functools
+
+import numpy as np
+
+import arm_solver
+
+
+def _rock_interval(a, b, limit):
+    """Rock masses r with |a + b * r| <= limit, as (lo, hi) arrays."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r1 = (-limit - a) / b
+        r2 = (limit - a) / b
+    inside = np.abs(a) <= limit
+    lo = np.where(b == 0, np.where(inside, -np.inf, np.inf), np.minimum(r1, r2))
+    hi = np.where(b == 0, np.where(inside, np.inf, -np.inf), np.maximum(r1, r2))
+    return lo, hi
+
+
+def pose_max_rock(geometry, m1, m2, m3, m4, m5, shoulder_limit, elbow_limit):
+    """
+    Return the heaviest rock each pose of ``geometry`` can hold, or -inf
+    where even no rock (or no pose with X > 0) is feasible.
+    """
+    weights = -(np.array((m1, m2, m3, m4, m5)) * arm_solver.G)
+    rock_weight = -arm_solver.G
+    lo_s, hi_s = _rock_interval(geometry.shoulder_arms[:, :5] @ weights,
+                                geometry.shoulder_arms[:, 5] * rock_weight, shoulder_limit)
+    lo_e, hi_e = _rock_interval(geometry.elbow_arms[:, :5] @ weights,
+                                geometry.elbow_arms[:, 5] * rock_weight, elbow_limit)
+    lo = np.maximum(np.maximum(lo_s, lo_e), 0.0)
+    hi = np.minimum(hi_s, hi_e)
+    return np.where((hi >= lo) & (geometry.x_end > 0.0), hi, -np.inf)
+
+
+@functools.lru_cache(maxsize=64)
+def payload_envelope(L1_m, L2_m, L3_m, m1, m2, m3, m4, m5,
+                     shoulder_limit, elbow_limit, step_mm=5.0, resolution_deg=1):
+    """
+    Return (reach_m, max_rock_kg) arrays: reach from 0 to L1+L2+L3 in
+    ``step_mm`` steps and the heaviest rock that still reaches it (NaN where
+    no rock mass does). Results are cached per geometry and mass set; the
+    returned arrays are read-only.
+    """
+    geometry = arm_solver.GEOMETRY_CACHE.get(L1_m, L2_m, L3_m, resolution_deg)
+    best = np.maximum.accumulate(pose_max_rock(
+        geometry, m1, m2, m3, m4, m5, shoulder_limit, elbow_limit))
+
+    reach_m = np.arange(0.0, (L1_m + L2_m + L3_m) * 1000 + step_mm, step_mm) / 1000
+    # Poses with x_end >= reach are a prefix of the X-descending order
+    count = np.searchsorted(-geometry.x_end, -reach_m, side="right")
+    max_rock = np.full(reach_m.shape, np.nan)
+    reachable = count > 0
+    if best.size:
+        max_rock[reachable] = best[count[reachable] - 1]
+    max_rock[~np.isfinite(max_rock)] = np.nan
+    reach_m.setflags(write=False)
+    max_rock.setflags(write=False)
+    return reach_m, max_rock
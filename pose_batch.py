@@ -0,0 +1,235 @@
+"""
+Scenario 1 holding torques for a table of poses under a table of mass sets.
+
+The pose table is a CSV file with a header and one pose per row, given
+either as absolute link angles (phi1_deg, phi2_deg, phi3_deg) or as the
+wrist position (wrist_x_cm, wrist_y_cm and optionally link3_deg, default -90
+= straight down), with the elbow solved as in Scenario 1. The mass-set table
+has any of the mass and limit columns (m1 ... rock_mass, shoulder_limit,
+elbow_limit); missing ones take the GUI defaults. Both may have a "name"
+column. The full pose x mass-set torque matrices are one
+arm_solver.scenario1_torque_matrix() product:
+
+    python pose_batch.py poses.csv masses.csv --out torques.csv
+
+The output gets one row per (pose, mass set) with both torques and the
+limit flags; a JSON summary goes to stdout and the command exits with
+status 1 if any limit is exceeded. A wrist out of reach does not stop the
+batch: its rows get NaN torques and no flags, and the summary lists it
+under "unreachable_poses" (also a status 1). In the GUI, **Pose batch...** loads the
+same tables and draws the selected row in the Scenario 1 canvas.
+"""
+import argparse
+import csv
+import json
+import sys
+import time
+
+import numpy as np
+
+import arm_solver
+
+ANGLE_COLUMNS = ("phi1_deg", "phi2_deg", "phi3_deg")
+WRIST_COLUMNS = ("wrist_x_cm", "wrist_y_cm")
+ROW_HEADER = ("pose", "mass_set", "shoulder_torque_nm", "elbow_torque_nm",
+              "shoulder_over", "elbow_over")
+
+
+# -------------------------------------------------------------------------
+# READING
+# -------------------------------------------------------------------------
+def read_table(path):
+    """Return (names, {column: float array}) of a CSV file with a header."""
+    with open(path, newline="") as f:
+        rows = list(csv.DictReader(f, skipinitialspace=True))
+    if not rows:
+        raise ValueError(f"{path} has no rows")
+    names = [row.pop("name", None) or str(i) for i, row in enumerate(rows)]
+    try:
+        columns = {key.strip(): np.array([float(row[key]) for row in rows])
+                   for key in rows[0]}
+    except (TypeError, ValueError) as exc:
+        raise ValueError(f"{path}: {exc}") from None
+    return names, columns
+
+
+def read_poses(path, errors=None):
+    """
+    Return (names, (P, 3) absolute link angles in radians). A wrist out of
+    reach gets NaN angles and, if ``errors`` is a list, a message in it.
+    """
+    names, columns = read_table(path)
+    if all(key in columns for key in ANGLE_COLUMNS):
+        return names, np.radians(np.column_stack([columns[key] for key in ANGLE_COLUMNS]))
+    if all(key in columns for key in WRIST_COLUMNS):
+        link3 = columns.get("link3_deg", np.full(len(names), -90.0))
+        poses = []
+        for name, x, y, t3 in zip(names, columns["wrist_x_cm"], columns["wrist_y_cm"], link3):
+            x, y, t3 = float(x), float(y), float(t3)
+            try:
+                poses.append(arm_solver.scenario1_pose((x, y), t3))
+            except ValueError:
+                poses.append(np.full(3, np.nan))
+                if errors is not None:
+                    errors.append(f"{path}, pose {name}: wrist ({x:g}, {y:g}) cm "
+                                  f"is out of reach")
+        return names, np.array(poses)
+    raise ValueError(f"{path} needs columns {', '.join(ANGLE_COLUMNS)} "
+                     f"or {', '.join(WRIST_COLUMNS)}")
+
+
+def read_mass_sets(path, defaults=None):
+    """
+    Return (names, (M, 6) masses in MASS_KEYS order, shoulder limits,
+    elbow limits); columns missing from ``path`` come from ``defaults``.
+    """
+    defaults = {**arm_solver.default_inputs(), **(defaults or {})}
+    names, columns = read_table(path)
+    unknown = set(columns) - set(arm_solver.INPUT_KEYS)
+    if unknown:
+        raise ValueError(f"{path}: unknown columns {sorted(unknown)}")
+    values = {key: columns.get(key, np.full(len(names), float(defaults[key])))
+              for key in arm_solver.INPUT_KEYS}
+    masses = np.column_stack([values[key] for key in arm_solver.MASS_KEYS])
+    return names, masses, values["shoulder_limit"], values["elbow_limit"]
+
+
+# -------------------------------------------------------------------------
+# BATCH
+# -------------------------------------------------------------------------
+class PoseBatch:
+    """
+    Scenario 1 torques of every pose (rows) under every mass set (columns).
+    Row ``i`` of the flattened table is pose ``i // M``, mass set ``i % M``.
+    Poses with NaN angles (out of reach) get NaN torques and no flags.
+    """
+
+    def __init__(self, poses, masses, shoulder_limits, elbow_limits,
+                 pose_names=None, set_names=None):
+        self.poses = np.atleast_2d(np.asarray(poses, dtype=float))
+        self.masses = np.atleast_2d(np.asarray(masses, dtype=float))
+        n_sets = len(self.masses)
+        self.shoulder_limits = np.broadcast_to(np.asarray(shoulder_limits, dtype=float), (n_sets,))
+        self.elbow_limits = np.broadcast_to(np.asarray(elbow_limits, dtype=float), (n_sets,))
+        self.pose_names = list(pose_names or map(str, range(len(self.poses))))
+        self.set_names = list(set_names or map(str, range(n_sets)))
+        self.shoulder_torque, self.elbow_torque = arm_solver.scenario1_torque_matrix(
+            self.poses, self.masses)
+        self.reachable = ~np.isnan(self.poses).any(axis=1)
+        # NaN compares False: unreachable poses are never over a limit
+        self.shoulder_over = np.abs(self.shoulder_torque) > self.shoulder_limits
+        self.elbow_over = np.abs(self.elbow_torque) > self.elbow_limits
+
+    def __len__(self):
+        return self.shoulder_torque.size
+
+    @property
+    def violations(self):
+        return self.shoulder_over | self.elbow_over
+
+    def row(self, i):
+        """Everything known about flattened row ``i`` (no recomputation)."""
+        pose, mass_set = divmod(int(i), len(self.masses))
+        return {
+            "index": int(i),
+            "pose": pose,
+            "mass_set": mass_set,
+            "pose_name": self.pose_names[pose],
+            "set_name": self.set_names[mass_set],
+            "reachable": bool(self.reachable[pose]),
+            "shoulder_torque": float(self.shoulder_torque[pose, mass_set]),
+            "elbow_torque": float(self.elbow_torque[pose, mass_set]),
+            "shoulder_over": bool(self.shoulder_over[pose, mass_set]),
+            "elbow_over": bool(self.elbow_over[pose, mass_set]),
+        }
+
+    def points(self, pose):
+        """The O, A, B, E points (cm) of pose ``pose``, for drawing."""
+        return arm_solver.scenario1_points(self.poses[pose])
+
+    def write_csv(self, path):
+        pose, mass_set = np.divmod(np.arange(len(self)), len(self.masses))
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(ROW_HEADER)
+            writer.writerows(zip(
+                (self.pose_names[p] for p in pose),
+                (self.set_names[m] for m in mass_set),
+                self.shoulder_torque.ravel().tolist(),
+                self.elbow_torque.ravel().tolist(),
+                self.shoulder_over.ravel().astype(int).tolist(),
+                self.elbow_over.ravel().astype(int).tolist()))
+
+    def summary(self):
+        violations = self.violations
+        reachable = self.reachable
+        # None rather than NaN when no pose is reachable (NaN is not JSON)
+        max_abs = {joint: float(np.abs(torque[reachable]).max()) if reachable.any() else None
+                   for joint, torque in (("shoulder", self.shoulder_torque),
+                                         ("elbow", self.elbow_torque))}
+        return {
+            "poses": len(self.poses),
+            "mass_sets": len(self.masses),
+            "violations": int(violations.sum()),
+            "shoulder_violations": int(self.shoulder_over.sum()),
+            "elbow_violations": int(self.elbow_over.sum()),
+            "max_abs_shoulder_torque_nm": max_abs["shoulder"],
+            "max_abs_elbow_torque_nm": max_abs["elbow"],
+            # Poses that hold every mass set within both limits
+            "safe_poses": int((reachable & ~violations.any(axis=1)).sum()),
+            "unreachable_poses": [name for name, ok in zip(self.pose_names, reachable)
+                                  if not ok],
+        }
+
+
+def load_batch(poses_path, masses_path=None, defaults=None, errors=None):
+    """
+    PoseBatch for the two tables; without ``masses_path`` one mass set,
+    ``defaults``. Unreachable poses are reported in ``errors`` (read_poses).
+    """
+    pose_names, poses = read_poses(poses_path, errors)
+    if masses_path is None:
+        inputs = {**arm_solver.default_inputs(), **(defaults or {})}
+        return PoseBatch(poses, [[inputs[key] for key in arm_solver.MASS_KEYS]],
+                         inputs["shoulder_limit"], inputs["elbow_limit"],
+                         pose_names, ["inputs"])
+    set_names, masses, shoulder_limits, elbow_limits = read_mass_sets(masses_path, defaults)
+    return PoseBatch(poses, masses, shoulder_limits, elbow_limits, pose_names, set_names)
+
+
+# -------------------------------------------------------------------------
+# COMMAND LINE
+# -------------------------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().splitlines()[0],
+        epilog="The mass and limit options apply to the columns missing from the tables.")
+    parser.add_argument("poses", help="pose table (CSV)")
+    parser.add_argument("masses", nargs="?",
+                        help="mass-set table (CSV); default: one set from the options")
+    parser.add_argument("--out", metavar="CSV", help="per (pose, mass set) output")
+    arm_solver.add_arm_arguments(parser, lengths=False)
+    args = parser.parse_args(argv)
+
+    defaults = {key: getattr(args, key) for key in arm_solver.INPUT_KEYS}
+    start = time.perf_counter()
+    errors = []
+    try:
+        batch = load_batch(args.poses, args.masses, defaults, errors)
+    except (OSError, ValueError) as exc:
+        parser.error(str(exc))
+    for message in errors:
+        print(message, file=sys.stderr)
+    elapsed = time.perf_counter() - start
+    if args.out:
+        batch.write_csv(args.out)
+    print(f"{len(batch.poses)} poses x {len(batch.masses)} mass sets in "
+          f"{elapsed:.3f} s", file=sys.stderr)
+    summary = batch.summary()
+    json.dump(summary, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return 1 if summary["violations"] or summary["unreachable_poses"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
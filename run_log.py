@@ -0,0 +1,284 @@
+"""
+Run log of solved states: inputs and both scenario results.
+
+Two on-disk formats share one record layout (FIELDS):
+
+- CsvRunLog appends to a CSV file that stays open with buffered writes.
+- ColumnarRunLog appends float64 values to one raw binary file per field
+  in a directory (plus schema.json); load_columnar() memory-maps them.
+  Meant for high-volume auto-logging.
+
+A log never appends to a file written with a different set of columns: it
+moves on to the first numbered sibling (robotic_arm_data_2.csv, ...) that is
+new or has the same header, so old files stay readable. A candidate that
+cannot be read (a corrupt header or schema.json, a directory where a file
+is expected or the reverse) counts as different.
+
+BackgroundRunLog wraps either one with a queue and a writer thread, so the
+UI only enqueues records; they are written and flushed in batches.
+"""
+import csv
+import json
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+
+import arm_solver
+
+SCHEMA_VERSION = 1
+# Reach modes are stored as their index in this tuple in columnar logs
+MODES = tuple(arm_solver.REACH_MODES)
+OUTPUT_FIELDS = ("shoulder_torque_nm", "elbow_torque_nm",
+                 "max_x_mm", "t1_deg", "t2_deg", "t3_deg")
+FIELDS = (("timestamp",) + arm_solver.INPUT_KEYS + ("mode", "resolution_deg")
+          + arm_solver.LENGTH_KEYS + OUTPUT_FIELDS)
+
+
+def make_record(inputs, lengths_mm, result, timestamp=None):
+    """Build a FIELDS record from solve_scenarios() inputs and result."""
+    record = {"timestamp": time.time() if timestamp is None else timestamp}
+    record.update((key, float(inputs[key])) for key in arm_solver.INPUT_KEYS)
+    record["mode"] = inputs.get("mode", "grid")
+    # Empty (NaN in columnar logs) for the continuous solver
+    record["resolution_deg"] = arm_solver.reach_resolution(
+        record["mode"], inputs.get("resolution_deg"))
+    record.update(zip(arm_solver.LENGTH_KEYS, (float(L) for L in lengths_mm)))
+    record.update(
+        shoulder_torque_nm=result["shoulder_torque"],
+        elbow_torque_nm=result["elbow_torque"],
+        max_x_mm=result["max_x"] * 1000,
+        t1_deg=float(np.degrees(result["t1"])),
+        t2_deg=float(np.degrees(result["t2"])),
+        t3_deg=float(np.degrees(result["t3"])),
+    )
+    return record
+
+
+def _numbered(path, n):
+    root, ext = os.path.splitext(path)
+    return path if n == 1 else f"{root}_{n}{ext}"
+
+
+# -------------------------------------------------------------------------
+# CSV
+# -------------------------------------------------------------------------
+class CsvRunLog:
+    """Append records to a CSV file kept open between writes."""
+
+    def __init__(self, path="robotic_arm_data.csv", fields=FIELDS, buffering=1 << 16):
+        self.fields = tuple(fields)
+        self.path = self._compatible_path(path)
+        new = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        self._file = open(self.path, "a", newline="", buffering=buffering)
+        self._writer = csv.DictWriter(self._file, self.fields)
+        if new:
+            self._writer.writeheader()
+        self.rows = 0
+
+    def _compatible_path(self, path):
+        n = 1
+        while True:
+            candidate = _numbered(path, n)
+            if not os.path.exists(candidate) or os.path.getsize(candidate) == 0:
+                return candidate
+            try:
+                with open(candidate, newline="") as f:
+                    header = next(csv.reader(f), None)
+            except (OSError, ValueError, csv.Error):
+                header = None
+            if header is not None and tuple(header) == self.fields:
+                return candidate
+            n += 1
+
+    @property
+    def location(self):
+        return self.path
+
+    def write(self, records):
+        self._writer.writerows(records)
+        self.rows += len(records)
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+
+# -------------------------------------------------------------------------
+# COLUMNAR
+# -------------------------------------------------------------------------
+class ColumnarRunLog:
+    """
+    Append records to ``<directory>/<field>.f64`` raw float64 columns. The
+    mode is stored as its index in ``schema.json``'s "modes" list.
+    """
+
+    def __init__(self, directory="robotic_arm_data_columns", fields=FIELDS,
+                 buffer_rows=4096):
+        self.fields = tuple(fields)
+        self.schema = {"version": SCHEMA_VERSION, "fields": list(self.fields),
+                       "dtype": "float64", "modes": list(MODES)}
+        self.directory = self._compatible_directory(directory)
+        os.makedirs(self.directory, exist_ok=True)
+        schema_path = os.path.join(self.directory, "schema.json")
+        if not os.path.exists(schema_path):
+            with open(schema_path, "w") as f:
+                json.dump(self.schema, f, indent=2)
+        paths = [os.path.join(self.directory, f"{field}.f64") for field in self.fields]
+        # Cut the columns of a session killed mid-write back to full rows
+        # before appending, so rows stay aligned
+        rows = min(os.path.getsize(p) if os.path.exists(p) else 0 for p in paths) // 8
+        for p in paths:
+            if os.path.exists(p) and os.path.getsize(p) != rows * 8:
+                os.truncate(p, rows * 8)
+        self._files = {field: open(p, "ab") for field, p in zip(self.fields, paths)}
+        self.buffer_rows = buffer_rows
+        self._pending = []
+        self.rows = 0
+
+    def _compatible_directory(self, directory):
+        n = 1
+        while True:
+            candidate = _numbered(directory, n)
+            try:
+                with open(os.path.join(candidate, "schema.json")) as f:
+                    if json.load(f) == self.schema:
+                        return candidate
+            except FileNotFoundError:
+                if not os.path.exists(candidate) or not os.listdir(candidate):
+                    return candidate
+            except (OSError, ValueError):
+                # A plain file, or a corrupt schema.json
+                pass
+            n += 1
+
+    @property
+    def location(self):
+        return self.directory
+
+    def write(self, records):
+        self._pending.extend(records)
+        self.rows += len(records)
+        if len(self._pending) >= self.buffer_rows:
+            self._write_pending()
+
+    def _write_pending(self):
+        if not self._pending:
+            return
+        for field, f in self._files.items():
+            if field == "mode":
+                values = [MODES.index(r["mode"]) if r["mode"] in MODES else -1
+                          for r in self._pending]
+            else:
+                values = [r[field] for r in self._pending]
+            np.asarray(values, dtype=np.float64).tofile(f)
+        self._pending = []
+
+    def flush(self):
+        self._write_pending()
+        for f in self._files.values():
+            f.flush()
+
+    def close(self):
+        self.flush()
+        for f in self._files.values():
+            f.close()
+
+
+def load_columnar(directory):
+    """
+    Return (schema, {field: memory-mapped float64 array}). Columns are cut
+    to the shortest one, so a session killed mid-write still loads.
+    """
+    with open(os.path.join(directory, "schema.json")) as f:
+        schema = json.load(f)
+    if schema.get("version") != SCHEMA_VERSION:
+        raise ValueError(f"Unsupported run log version {schema.get('version')!r}")
+    paths = {field: os.path.join(directory, f"{field}.f64") for field in schema["fields"]}
+    rows = min(os.path.getsize(p) // 8 for p in paths.values())
+    if rows == 0:
+        return schema, {field: np.zeros(0) for field in paths}
+    return schema, {field: np.memmap(p, dtype=np.float64, mode="r", shape=(rows,))
+                    for field, p in paths.items()}
+
+
+# -------------------------------------------------------------------------
+# BACKGROUND WRITER
+# -------------------------------------------------------------------------
+class BackgroundRunLog:
+    """
+    Queue records for ``sink`` (a CsvRunLog or ColumnarRunLog) and write
+    them on a daemon thread in batches of up to ``batch_size``, flushing at
+    least every ``flush_s`` seconds. log() never blocks on disk I/O.
+
+    A failed write does not stop the thread: the last error is kept in
+    ``error`` and the records it lost are counted in ``dropped``, for the
+    caller to show.
+    """
+
+    def __init__(self, sink, batch_size=256, flush_s=1.0):
+        self.sink = sink
+        self.batch_size = batch_size
+        self.flush_s = flush_s
+        self.error = None
+        self.dropped = 0
+        self._queue = queue.Queue()
+        self._flush_requested = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def log(self, record):
+        self._queue.put(record)
+
+    def flush(self):
+        """Ask the writer to flush now (does not wait)."""
+        self._flush_requested.set()
+        self._queue.put(None)
+
+    def close(self):
+        """Write everything still queued, then close the sink."""
+        self._queue.put(StopIteration)
+        self._thread.join()
+        self.sink.close()
+
+    def _run(self):
+        last_flush = time.monotonic()
+        stop = False
+        while not stop:
+            try:
+                item = self._queue.get(timeout=self.flush_s)
+            except queue.Empty:
+                item = None
+            batch = []
+            while True:
+                if item is StopIteration:
+                    stop = True
+                elif item is not None:
+                    batch.append(item)
+                if stop or len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if batch:
+                try:
+                    self.sink.write(batch)
+                except OSError as exc:
+                    self.error = exc
+                    self.dropped += len(batch)
+            now = time.monotonic()
+            try:
+                if (stop or self._flush_requested.is_set()
+                        or now - last_flush >= self.flush_s):
+                    self._flush_requested.clear()
+                    self.sink.flush()
+                    last_flush = now
+            except OSError as exc:
+                # Keep the writer (and the UI) alive; the caller reports it
+                self.error = exc
@@ -0,0 +1,138 @@
+import threading
+import time
+
+
+class SolveScheduler:
+    """
+    Run a solver off the Tk main loop with latest-request-wins semantics.
+
+    - submit() is called on the UI thread for every input change. Requests
+      arriving within ``delay_ms`` of each other are coalesced; only the last
+      one is handed to the worker.
+    - A single worker thread runs ``solve(request)``. If newer requests came
+      in while it was busy, it skips straight to the newest one.
+    - Results are never delivered from the worker thread: the UI thread
+      polls for them with ``after()`` (Tk is not thread-safe) and passes only
+      the result of the newest request to ``on_result(request, result)``.
+      Results of superseded requests are dropped.
+
+    With ``stats`` (an instrumentation.LatencyStats) it records, under
+    ``name``: the time from the first change of a burst until the worker
+    picks it up ("<name>_queue") and until its result is shown
+    ("<name>_end_to_end"), plus how late the Tk event loop runs the poll
+    callbacks ("tk_backlog").
+    """
+
+    def __init__(self, widget, solve, on_result, on_error=None,
+                 delay_ms=15, poll_ms=16, stats=None, name="solve"):
+        self.widget = widget
+        self.solve = solve
+        self.on_result = on_result
+        self.on_error = on_error
+        self.delay_ms = delay_ms
+        self.poll_ms = poll_ms
+        self.stats = stats
+        self.name = name
+
+        self._pending = None
+        self._pending_since = None
+        self._poll_due = None
+        self._dispatch_id = None
+        self._poll_id = None
+        self._submitted = 0       # generation of the newest request (UI thread)
+
+        self._cond = threading.Condition()
+        self._queued = None       # (generation, request, since) waiting for the worker
+        self._running = None      # (generation, request, since) being solved
+        self._done = None         # (generation, request, since, result, error)
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    # -------------------------------------------------------------------------
+    # UI THREAD
+    # -------------------------------------------------------------------------
+    def submit(self, request):
+        """Queue ``request``, replacing any request not yet dispatched."""
+        self._pending = request
+        if self._pending_since is None:
+            self._pending_since = time.perf_counter()
+        if self._dispatch_id is None:
+            self._dispatch_id = self.widget.after(self.delay_ms, self._dispatch)
+
+    def _dispatch(self):
+        self._dispatch_id = None
+        self._submitted += 1
+        with self._cond:
+            self._queued = (self._submitted, self._pending, self._pending_since)
+            self._cond.notify()
+        self._pending = self._pending_since = None
+        if self._poll_id is None:
+            self._schedule_poll()
+
+    def _schedule_poll(self):
+        self._poll_due = time.perf_counter() + self.poll_ms / 1000.0
+        self._poll_id = self.widget.after(self.poll_ms, self._poll)
+
+    def _poll(self):
+        self._poll_id = None
+        if self.stats is not None:
+            self.stats.record("tk_backlog", max(0.0, time.perf_counter() - self._poll_due))
+        with self._cond:
+            done, self._done = self._done, None
+        if done is not None:
+            generation, request, since, result, error = done
+            if generation == self._submitted:
+                if error is None:
+                    self.on_result(request, result)
+                    if self.stats is not None:
+                        self.stats.record(f"{self.name}_end_to_end",
+                                          time.perf_counter() - since)
+                elif self.on_error is not None:
+                    self.on_error(request, error)
+                else:
+                    raise error
+        if self.busy():
+            self._schedule_poll()
+
+    def busy(self):
+        """True while a dispatched request has not been delivered yet."""
+        with self._cond:
+            return (self._queued is not None
+                    or self._running is not None
+                    or self._done is not None)
+
+    def close(self):
+        """Stop the worker and cancel pending callbacks."""
+        for after_id in (self._dispatch_id, self._poll_id):
+            if after_id is not None:
+                self.widget.after_cancel(after_id)
+        self._dispatch_id = self._poll_id = None
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+
+    # -------------------------------------------------------------------------
+    # WORKER THREAD
+    # -------------------------------------------------------------------------
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._queued is None and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                generation, request, since = self._running = self._queued
+                self._queued = None
+            if self.stats is not None:
+                self.stats.record(f"{self.name}_queue", time.perf_counter() - since)
+            result = error = None
+            try:
+                result = self.solve(request)
+            except Exception as exc:
+                error = exc
+            with self._cond:
+                self._running = None
+                # A newer request already queued makes this result stale
+                if self._queued is None:
+                    self._done = (generation, request, since, result, error)
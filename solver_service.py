@@ -0,0 +1,300 @@
+"""
+Local JSON-over-HTTP service for the torque and reach numbers.
+
+    python solver_service.py --port 8765
+
+Endpoints:
+
+    GET  /health   -> {"status": "ok", ...}
+    POST /solve    body: one case, or {"cases": [case, ...]}
+                   -> one report, or {"results": [report, ...]}
+
+A case is a JSON object of overrides of the GUI defaults: any mass, limit,
+link length (L1_mm, L2_mm, L3_mm), "mode" and "resolution_deg"; the report
+is the one ``arm_solver.py`` prints. The event loop only parses and answers
+HTTP: cases from requests that arrive within ``--batch-ms`` of each other
+are merged into one batch and solved in a process pool, whose workers keep
+the memory-mapped workspace tables (workspace_cache) and the current
+geometry warm between batches. Grid-mode cases sharing link lengths and resolution
+are solved in one ReachGeometry.solve_batch call.
+
+load_test.py measures throughput and latency against a running service.
+"""
+import argparse
+import asyncio
+import concurrent.futures
+import json
+import os
+import signal
+import sys
+import time
+
+import numpy as np
+
+import arm_solver
+import workspace_cache
+
+CASE_KEYS = (set(arm_solver.INPUT_KEYS) | set(arm_solver.LENGTH_KEYS)
+             | {"mode", "resolution_deg"})
+MAX_BODY = 16 << 20
+
+
+# -------------------------------------------------------------------------
+# WORKER
+# -------------------------------------------------------------------------
+def warm_worker():
+    """Process pool initializer: disk cache on, default geometry loaded."""
+    workspace_cache.enable()
+    arm_solver.GEOMETRY_CACHE.get(*(L / 1000.0 for L in arm_solver.DEFAULT_LENGTHS_MM))
+
+
+def normalize_case(case):
+    """Return the full inputs for a case of overrides; ValueError if invalid."""
+    full = arm_solver.default_inputs()
+    full.update(zip(arm_solver.LENGTH_KEYS, (float(L) for L in arm_solver.DEFAULT_LENGTHS_MM)))
+    full.update(arm_solver.check_overrides(case, CASE_KEYS))
+    return full
+
+
+def solve_cases(cases):
+    """Solve normalized cases; returns their reports in the same order."""
+    reports = [None] * len(cases)
+    groups = {}
+    for i, case in enumerate(cases):
+        lengths_mm = tuple(case[key] for key in arm_solver.LENGTH_KEYS)
+        if case["mode"] == "grid":
+            resolution = arm_solver.reach_resolution("grid", case.get("resolution_deg"))
+            groups.setdefault((lengths_mm, resolution), []).append(i)
+        else:
+            reports[i] = arm_solver.result_report(
+                case, lengths_mm, arm_solver.solve_scenarios(case, lengths_mm))
+
+    for (lengths_mm, resolution), rows in groups.items():
+        masses = np.array([[cases[i][key] for key in arm_solver.MASS_KEYS] for i in rows])
+        shoulder_limits = np.array([cases[i]["shoulder_limit"] for i in rows])
+        elbow_limits = np.array([cases[i]["elbow_limit"] for i in rows])
+        Ts, Te = arm_solver.scenario1_torque_batch(masses)
+        geometry = arm_solver.GEOMETRY_CACHE.get(*(L / 1000.0 for L in lengths_mm),
+                                                 resolution)
+        max_x, t1, t2 = geometry.solve_batch(masses, shoulder_limits, elbow_limits)
+        for k, i in enumerate(rows):
+            found = max_x[k] > 0
+            result = {
+                "shoulder_torque": float(Ts[k]),
+                "elbow_torque": float(Te[k]),
+                "max_x": float(max_x[k]),
+                "t1": float(t1[k]),
+                "t2": float(t2[k]),
+                "t3": arm_solver.T3 if found else 0.0,
+            }
+            reports[i] = arm_solver.result_report(cases[i], lengths_mm, result)
+    return reports
+
+
+# -------------------------------------------------------------------------
+# BATCHING
+# -------------------------------------------------------------------------
+class RequestBatcher:
+    """
+    Collect cases from concurrent requests and solve them together: a batch
+    is dispatched ``delay_s`` after its first case arrives, or as soon as
+    it holds ``max_cases``.
+    """
+
+    def __init__(self, pool, delay_s=0.002, max_cases=4096):
+        self.pool = pool
+        self.delay_s = delay_s
+        self.max_cases = max_cases
+        self.batches = 0
+        self.cases = 0
+        self._pending = []        # (cases, future)
+        self._pending_cases = 0
+        self._timer = None
+
+    async def solve(self, cases):
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((cases, future))
+        self._pending_cases += len(cases)
+        if self._pending_cases >= self.max_cases:
+            self._dispatch()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(
+                self.delay_s, self._dispatch)
+        return await future
+
+    def _dispatch(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending, self._pending_cases = self._pending, [], 0
+        if pending:
+            asyncio.ensure_future(self._run(pending))
+
+    async def _run(self, pending):
+        cases = [case for request, _ in pending for case in request]
+        self.batches += 1
+        self.cases += len(cases)
+        try:
+            reports = await asyncio.get_running_loop().run_in_executor(
+                self.pool, solve_cases, cases)
+        except Exception as exc:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        start = 0
+        for request, future in pending:
+            if not future.done():
+                future.set_result(reports[start:start + len(request)])
+            start += len(request)
+
+
+# -------------------------------------------------------------------------
+# HTTP
+# -------------------------------------------------------------------------
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 413: "Payload Too Large",
+           500: "Internal Server Error"}
+
+
+class SolverService:
+    def __init__(self, workers=None, delay_s=0.002, max_cases=4096):
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = concurrent.futures.ProcessPoolExecutor(
+            self.workers, initializer=warm_worker)
+        self.batcher = RequestBatcher(self.pool, delay_s, max_cases)
+        self.requests = 0
+        self.started = time.time()
+
+    async def handle(self, method, path, body):
+        """Return (status, JSON-ready payload) for one request."""
+        if path == "/health":
+            return 200, {"status": "ok", "uptime_s": time.time() - self.started,
+                         "requests": self.requests, "batches": self.batcher.batches,
+                         "cases": self.batcher.cases}
+        if path != "/solve":
+            return 404, {"error": f"no route {path}"}
+        if method != "POST":
+            return 405, {"error": "use POST"}
+        try:
+            payload = json.loads(body or b"null")
+            batched = isinstance(payload, dict) and "cases" in payload
+            raw = payload["cases"] if batched else [payload]
+            if not isinstance(raw, list):
+                raise ValueError("cases must be a list")
+            cases = [normalize_case(case) for case in raw]
+        except (ValueError, TypeError) as exc:
+            return 400, {"error": str(exc)}
+        self.requests += 1
+        reports = await self.batcher.solve(cases) if cases else []
+        return 200, {"results": reports} if batched else reports[0]
+
+    async def serve_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                close = headers.get("connection", "").lower() == "close"
+                try:
+                    length = int(headers.get("content-length", 0) or 0)
+                except ValueError:
+                    length = -1
+                # Without a usable length the rest of the stream cannot be
+                # framed (or is not worth reading): answer and hang up
+                if length < 0:
+                    status, payload = 400, {"error": "invalid Content-Length"}
+                    close = True
+                elif length > MAX_BODY:
+                    status, payload = 413, {"error": "request body too large"}
+                    close = True
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    try:
+                        status, payload = await self.handle(
+                            method, path.split("?", 1)[0], body)
+                    except Exception as exc:
+                        status, payload = 500, {"error": f"{exc.__class__.__name__}: {exc}"}
+                data = json.dumps(payload).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'close' if close else 'keep-alive'}\r\n\r\n"
+                    .encode() + data)
+                await writer.drain()
+                if close:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=8765, ready=None):
+        # Warm every worker before accepting connections
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(
+            loop.run_in_executor(self.pool, solve_cases, [normalize_case({})])
+            for _ in range(self.workers)))
+        server = await asyncio.start_server(self.serve_connection, host, port)
+        # SIGTERM (e.g. load_test.py --spawn) stops the server like Ctrl+C,
+        # so the caller still shuts the pool down
+        stop = loop.create_future()
+        try:
+            loop.add_signal_handler(signal.SIGTERM, stop.cancel)
+        except (NotImplementedError, RuntimeError):
+            pass    # Windows, or not the main thread
+        if ready:
+            ready(server.sockets[0].getsockname())
+        async with server:
+            try:
+                await stop
+            except asyncio.CancelledError:
+                pass
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+
+# -------------------------------------------------------------------------
+# COMMAND LINE
+# -------------------------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="solver processes (default: CPU count)")
+    parser.add_argument("--batch-ms", type=float, default=2.0,
+                        help="how long a batch waits for more requests")
+    parser.add_argument("--max-batch", type=int, default=4096,
+                        help="cases that trigger an immediate dispatch")
+    args = parser.parse_args(argv)
+
+    service = SolverService(args.workers, args.batch_ms / 1000.0, args.max_batch)
+
+    def ready(address):
+        print(f"listening on http://{address[0]}:{address[1]}", file=sys.stderr, flush=True)
+
+    try:
+        asyncio.run(service.serve(args.host, args.port, ready))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
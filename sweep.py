@@ -0,0 +1,224 @@
+"""
+Parallel parameter sweep over the masses, motor limits and link lengths.
+
+Every combination of the given values is solved for both scenarios. The
+work is split into chunks of consecutive combinations that run in a process
+pool, and each finished chunk is written straight into one preallocated,
+memory-mapped .npy file per column, so the full result set is never held in
+memory:
+
+    python sweep.py results/ --rock_mass 0:10:101 --shoulder_limit 20:60:41
+
+Values are given as ``start:stop:num`` (inclusive, like np.linspace), a
+comma-separated list, or a single number; anything not given keeps its GUI
+default. Load the result with load_sweep(), which memory-maps the columns.
+"""
+import argparse
+import concurrent.futures
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+import arm_solver
+import workspace_cache
+
+SWEEP_VERSION = 1
+# Link lengths vary slowest so that a chunk rarely spans two geometries
+AXIS_KEYS = (list(arm_solver.LENGTH_KEYS)
+             + [p["key"] for p in arm_solver.PARAMS + arm_solver.MOTOR_LIMITS])
+OUTPUT_KEYS = ("shoulder_torque", "elbow_torque", "max_x", "t1", "t2")
+DTYPE = np.float32
+
+
+def parse_values(text):
+    """Parse ``start:stop:num``, ``a,b,c`` or a single number into an array."""
+    if ":" in text:
+        start, stop, num = text.split(":")
+        return np.linspace(float(start), float(stop), int(num))
+    return np.array([float(v) for v in text.split(",")])
+
+
+def default_axes():
+    """Return {key: values} with every axis fixed at its default."""
+    defaults = dict(zip(arm_solver.LENGTH_KEYS, arm_solver.DEFAULT_LENGTHS_MM))
+    defaults.update(
+        (p["key"], p["default"]) for p in arm_solver.PARAMS + arm_solver.MOTOR_LIMITS)
+    return {key: np.array([float(defaults[key])]) for key in AXIS_KEYS}
+
+
+# -------------------------------------------------------------------------
+# WORKER
+# -------------------------------------------------------------------------
+def solve_chunk(axes, start, stop, mode="grid"):
+    """
+    Solve combinations [start, stop) of ``axes`` (row-major over AXIS_KEYS).
+    Returns {column: array} for the axes and OUTPUT_KEYS.
+    """
+    shape = [len(axes[key]) for key in AXIS_KEYS]
+    index = np.unravel_index(np.arange(start, stop), shape)
+    columns = {key: np.asarray(axes[key])[i] for key, i in zip(AXIS_KEYS, index)}
+    masses = np.column_stack([columns[key] for key in arm_solver.MASS_KEYS])
+    n = stop - start
+
+    Ts, Te = arm_solver.scenario1_torque_batch(masses)
+    out = {key: np.zeros(n) for key in ("max_x", "t1", "t2")}
+    lengths = np.column_stack([columns[key] for key in arm_solver.LENGTH_KEYS])
+    geometries, group = np.unique(lengths, axis=0, return_inverse=True)
+    group = group.reshape(-1)
+    for g, lengths_mm in enumerate(geometries):
+        rows = np.nonzero(group == g)[0]
+        L1_m, L2_m, L3_m = (float(L) / 1000.0 for L in lengths_mm)
+        if mode == "grid":
+            geometry = arm_solver.GEOMETRY_CACHE.get(L1_m, L2_m, L3_m)
+            solved = geometry.solve_batch(
+                masses[rows],
+                columns["shoulder_limit"][rows],
+                columns["elbow_limit"][rows],
+            )
+        else:
+            solved = np.array([
+                arm_solver.find_max_x(
+                    L1_m, L2_m, L3_m, *masses[r],
+                    columns["shoulder_limit"][r], columns["elbow_limit"][r],
+                    mode=mode)[:3]
+                for r in rows
+            ]).T
+        for key, values in zip(("max_x", "t1", "t2"), solved):
+            out[key][rows] = values
+
+    columns.update(shoulder_torque=Ts, elbow_torque=Te, **out)
+    return {key: value.astype(DTYPE) for key, value in columns.items()}
+
+
+# -------------------------------------------------------------------------
+# DRIVER
+# -------------------------------------------------------------------------
+def run_sweep(axes, out_dir, mode="grid", workers=None, chunk_size=16384,
+              progress=None):
+    """
+    Solve every combination of ``axes`` ({key: values}, missing keys fixed
+    at their defaults) and stream the results to ``out_dir``.
+
+    ``workers`` processes (default: CPU count, 1 = run in this process)
+    each solve ``chunk_size`` combinations at a time; at most two chunks per
+    worker are in flight, which bounds memory regardless of the sweep size.
+    ``progress(done, total)`` is called after every chunk. Returns the
+    number of rows written.
+    """
+    full_axes = default_axes()
+    for key, values in axes.items():
+        if key not in full_axes:
+            raise ValueError(f"Unknown sweep parameter {key!r}")
+        full_axes[key] = np.asarray(values, dtype=float)
+    if mode not in arm_solver.REACH_MODES:
+        raise ValueError(f"Unknown reach mode {mode!r}")
+    total = int(np.prod([len(v) for v in full_axes.values()]))
+    workers = workers or os.cpu_count() or 1
+
+    os.makedirs(out_dir, exist_ok=True)
+    columns = {
+        key: np.lib.format.open_memmap(
+            os.path.join(out_dir, f"{key}.npy"), mode="w+", dtype=DTYPE,
+            shape=(total,))
+        for key in list(AXIS_KEYS) + list(OUTPUT_KEYS)
+    }
+    with open(os.path.join(out_dir, "sweep.json"), "w") as f:
+        json.dump({
+            "version": SWEEP_VERSION,
+            "rows": total,
+            "mode": mode,
+            "dtype": np.dtype(DTYPE).name,
+            "axes": {key: values.tolist() for key, values in full_axes.items()},
+            "columns": list(columns),
+        }, f, indent=2)
+
+    def store(start, chunk):
+        stop = start + len(chunk["max_x"])
+        for key, values in chunk.items():
+            columns[key][start:stop] = values
+        return stop - start
+
+    starts = range(0, total, chunk_size)
+    done = 0
+    if workers == 1:
+        for start in starts:
+            stop = min(start + chunk_size, total)
+            done += store(start, solve_chunk(full_axes, start, stop, mode))
+            if progress:
+                progress(done, total)
+    else:
+        # Workers share the memory-mapped workspace tables
+        with concurrent.futures.ProcessPoolExecutor(
+                workers, initializer=workspace_cache.enable) as pool:
+            pending = {}
+            starts = iter(starts)
+            while True:
+                for start in starts:
+                    stop = min(start + chunk_size, total)
+                    future = pool.submit(solve_chunk, full_axes, start, stop, mode)
+                    pending[future] = start
+                    if len(pending) >= 2 * workers:
+                        break
+                if not pending:
+                    break
+                finished, _ = concurrent.futures.wait(
+                    pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in finished:
+                    done += store(pending.pop(future), future.result())
+                    if progress:
+                        progress(done, total)
+
+    for column in columns.values():
+        column.flush()
+    return total
+
+
+def load_sweep(out_dir):
+    """Return (metadata, {column: memory-mapped array}) for a sweep directory."""
+    with open(os.path.join(out_dir, "sweep.json")) as f:
+        meta = json.load(f)
+    if meta.get("version") != SWEEP_VERSION:
+        raise ValueError(f"Unsupported sweep version {meta.get('version')!r}")
+    return meta, {
+        key: np.load(os.path.join(out_dir, f"{key}.npy"), mmap_mode="r")
+        for key in meta["columns"]
+    }
+
+
+# -------------------------------------------------------------------------
+# COMMAND LINE
+# -------------------------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().splitlines()[0],
+        epilog="Values: start:stop:num, a,b,c or a single number.")
+    parser.add_argument("out_dir", help="directory for the .npy columns")
+    for key in AXIS_KEYS:
+        parser.add_argument(f"--{key}", type=parse_values, metavar="VALUES")
+    parser.add_argument("--mode", choices=sorted(arm_solver.REACH_MODES),
+                        default="grid")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=16384)
+    args = parser.parse_args(argv)
+
+    axes = {key: getattr(args, key) for key in AXIS_KEYS
+            if getattr(args, key) is not None}
+    start = time.perf_counter()
+
+    def progress(done, total):
+        print(f"\r{done}/{total} rows", end="", file=sys.stderr, flush=True)
+
+    rows = run_sweep(axes, args.out_dir, mode=args.mode, workers=args.workers,
+                     chunk_size=args.chunk_size, progress=progress)
+    elapsed = time.perf_counter() - start
+    print(f"\n{rows} rows in {elapsed:.2f} s ({rows / elapsed:,.0f} rows/s) "
+          f"-> {args.out_dir}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
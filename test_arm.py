@@ -0,0 +1,212 @@
+"""
+Regression tests for the solver paths that must agree with the scalar
+originals:
+
+    python -m pytest -q
+"""
+import math
+import random
+import threading
+
+import numpy as np
+import pytest
+
+import arm_solver
+import compare_reach
+
+L_M = compare_reach.L1_M, compare_reach.L2_M, compare_reach.L3_M
+
+
+# -------------------------------------------------------------------------
+# TORQUES
+# -------------------------------------------------------------------------
+def test_chain_torques_match_calculate_torques():
+    rng = random.Random(1)
+    for _ in range(200):
+        t1, t2, t3 = (rng.uniform(-math.pi, math.pi) for _ in range(3))
+        masses = [rng.uniform(0, 5) for _ in range(6)]
+        expected = arm_solver.calculate_torques(t1, t2, t3, *L_M, *masses)
+        torques = arm_solver.arm_chain(*L_M, *masses).torques(np.array([t1, t2, t3]))
+        assert torques[:2] == pytest.approx(expected, abs=1e-12)
+
+
+def baseline_scenario1_torques(m1, m2, m3, m4, m5, rock_mass):
+    """The hard-coded Scenario 1 geometry of the original GUI."""
+    g = 9.87
+    O = (0.0, 0.30)
+    A = (0.01 * ((6595.0 / 436.0) + (27.0 * math.sqrt(116319.0) / 872.0)),
+         0.01 * ((22203.0 / 872.0) + (45.0 * math.sqrt(116319.0) / 436.0)))
+    B = (0.40, 0.18)
+    E = (0.40, 0.0)
+    mid = [((p[0] + q[0]) / 2.0, (p[1] + q[1]) / 2.0) for p, q in ((O, A), (A, B), (B, E))]
+    shoulder = [(mid[0], m1), (mid[1], m2), (mid[2], m3), (A, m4), (B, m5), (E, rock_mass)]
+    elbow = [(mid[1], m2), (mid[2], m3), (B, m5), (E, rock_mass)]
+    Ts = sum((x - O[0]) * -mass * g for (x, _), mass in shoulder)
+    Te = sum((x - A[0]) * -mass * g for (x, _), mass in elbow)
+    return Ts, Te
+
+
+def test_scenario1_matches_baseline_geometry():
+    x, y = zip(*arm_solver.scenario1_points())
+    assert (x[1], y[1]) == pytest.approx((25.686358114609767, 60.66286038203255))
+    assert (x[3], y[3]) == (40.0, 0.0)
+    rng = random.Random(2)
+    for masses in [(0.367, 0.44, 0.15, 1.09, 0.82, 4.0)] + [
+            [rng.uniform(0, 10) for _ in range(6)] for _ in range(50)]:
+        expected = baseline_scenario1_torques(*masses)
+        assert arm_solver.calculate_scenario1_torques(*masses) == pytest.approx(
+            expected, abs=1e-12)
+
+
+# -------------------------------------------------------------------------
+# REACH
+# -------------------------------------------------------------------------
+@pytest.mark.parametrize("seed", range(5))
+def test_grid_reach_matches_scalar(seed):
+    case = compare_reach.random_case(random.Random(seed))
+    assert arm_solver.find_max_x(*L_M, *case) == arm_solver.find_max_x_scalar(*L_M, *case)
+
+
+def test_grid_reach_matches_scalar_at_limit_boundaries():
+    # Each limit equals the torque of a checked pose: decided by the last bit
+    for case in compare_reach.boundary_cases(compare_reach.DEFAULT_CASE):
+        assert (arm_solver.find_max_x(*L_M, *case)
+                == arm_solver.find_max_x_scalar(*L_M, *case)), case
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_continuous_reach_beats_dense_sampling(seed):
+    case = compare_reach.random_case(random.Random(seed)) if seed else compare_reach.DEFAULT_CASE
+    x, t1, t2, t3 = arm_solver.find_max_x_continuous(*L_M, *case)
+    phi = np.linspace(arm_solver.T1_MIN + arm_solver.T2_MIN,
+                      arm_solver.T1_MAX + arm_solver.T2_MAX, 400001)
+    dense = arm_solver._constrained_poses(phi, *L_M, np.array(case[:6]), *case[6:])[3].max()
+    if x == 0.0:
+        assert dense == -np.inf
+        return
+    # The returned pose is on the constraint and within both limits
+    L1, L2, L3 = L_M
+    assert L1 * math.sin(t1) + L2 * math.sin(t1 + t2) == pytest.approx(arm_solver.YB_TARGET)
+    Ts, Te = arm_solver.calculate_torques(t1, t2, t3, *L_M, *case[:6])
+    assert abs(Ts) <= case[6] + 1e-9 and abs(Te) <= case[7] + 1e-9
+    assert x == pytest.approx(L1 * math.cos(t1) + L2 * math.cos(t1 + t2) + L3 * math.cos(t3))
+    # ... and at least as good as 400k evenly spaced samples of the curve
+    assert 0.0 <= x - dense < 2e-5
+
+
+@pytest.fixture(scope="module")
+def fine_geometries():
+    # Built directly, outside GEOMETRY_CACHE (which holds a single grid)
+    return {resolution: arm_solver.ReachGeometry(*L_M, resolution)
+            for resolution in (0.5, 0.25, 0.1)}
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_adaptive_reach_matches_fine_grid(seed, fine_geometries):
+    case = compare_reach.random_case(random.Random(seed)) if seed else compare_reach.DEFAULT_CASE
+    for resolution, geometry in fine_geometries.items():
+        assert (arm_solver.find_max_x_adaptive(*L_M, *case, resolution)
+                == geometry.solve(np.array(case[:6]), *case[6:])), resolution
+
+
+def test_find_max_x_passes_the_resolution_on(fine_geometries):
+    case = compare_reach.DEFAULT_CASE
+    expected = fine_geometries[0.5].solve(np.array(case[:6]), *case[6:])
+    assert arm_solver.find_max_x(*L_M, *case, mode="grid", resolution_deg=0.5) == expected
+    assert arm_solver.find_max_x(*L_M, *case, mode="adaptive", resolution_deg=0.5) == expected
+    assert (arm_solver.find_max_x(*L_M, *case, mode="adaptive")
+            == arm_solver.find_max_x_adaptive(*L_M, *case, 0.01))
+    # The continuous solver has no grid to refine
+    assert (arm_solver.find_max_x(*L_M, *case, mode="continuous", resolution_deg=0.5)
+            == arm_solver.find_max_x_continuous(*L_M, *case))
+
+
+def test_solve_scenarios_resolution_is_part_of_the_cache_key():
+    cache = arm_solver.ResultCache()
+    inputs = arm_solver.default_inputs()
+    coarse = cache.solve(inputs)
+    fine = cache.solve({**inputs, "resolution_deg": 0.1})
+    assert cache.info()["misses"] == 2
+    assert coarse == arm_solver.solve_scenarios(inputs)
+    assert fine == arm_solver.solve_scenarios({**inputs, "resolution_deg": 0.1})
+    assert fine["max_x"] > coarse["max_x"]
+
+
+# -------------------------------------------------------------------------
+# CACHES
+# -------------------------------------------------------------------------
+def test_result_cache_evicts_least_recently_used():
+    cache = arm_solver.ResultCache(maxsize=2)
+    a, b, c = ({**arm_solver.default_inputs(), "rock_mass": rock} for rock in (1.0, 2.0, 3.0))
+    cache.solve(a)
+    cache.solve(b)
+    cache.solve(a)                  # a is now the most recent
+    cache.solve(c)                  # evicts b
+    assert cache.info() == {"hits": 1, "misses": 3, "size": 2, "maxsize": 2}
+    cache.solve(a)
+    assert cache.info()["hits"] == 2
+    cache.solve(b)
+    assert cache.info()["misses"] == 4
+
+
+def test_result_cache_hits_on_rounded_inputs_and_returns_copies():
+    cache = arm_solver.ResultCache()
+    inputs = arm_solver.default_inputs()
+    first = cache.solve({**inputs, "m1": 0.3671})
+    first["max_x"] = -1.0
+    second = cache.solve({**inputs, "m1": 0.3674})
+    assert cache.info()["hits"] == 1
+    assert second == arm_solver.solve_scenarios({**inputs, "m1": 0.367})
+
+
+def test_result_cache_invalidate():
+    cache = arm_solver.ResultCache()
+    inputs = arm_solver.default_inputs()
+    for lengths in ((400, 450, 180), (410, 450, 180)):
+        cache.solve(inputs, lengths)
+        cache.solve({**inputs, "mode": "continuous"}, lengths)
+    cache.invalidate((410.0001, 450, 180))
+    assert cache.info()["size"] == 2
+    cache.solve(inputs, (400, 450, 180))
+    assert cache.info()["hits"] == 1
+    cache.invalidate()
+    assert cache.info()["size"] == 0
+
+
+def test_geometry_cache_returns_the_callers_geometry():
+    cache = arm_solver.GeometryCache()
+    keys = [(0.40, 0.45, 0.18), (0.41, 0.45, 0.18)]
+    wrong = []
+
+    def worker(lengths):
+        for _ in range(30):
+            if cache.get(*lengths).lengths != lengths:
+                wrong.append(lengths)
+
+    threads = [threading.Thread(target=worker, args=(lengths,)) for lengths in keys]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert wrong == []
+
+
+# -------------------------------------------------------------------------
+# INPUTS
+# -------------------------------------------------------------------------
+KEYS = set(arm_solver.INPUT_KEYS) | set(arm_solver.LENGTH_KEYS) | {"mode"}
+
+
+def test_check_overrides_accepts_numbers():
+    assert arm_solver.check_overrides({"m1": 1, "L1_mm": 350.5, "mode": "adaptive"}, KEYS) == {
+        "m1": 1.0, "L1_mm": 350.5, "mode": "adaptive"}
+
+
+@pytest.mark.parametrize("overrides", [
+    [], {"m7": 1.0}, {"mode": "fast"}, {"m1": "1"}, {"m1": True}, {"m1": None},
+    {"m1": float("nan")}, {"rock_mass": float("inf")}, {"m1": 10 ** 400},
+    {"L1_mm": 0}, {"L3_mm": -1.0}, {"resolution_deg": 0},
+])
+def test_check_overrides_rejects(overrides):
+    with pytest.raises(ValueError):
+        arm_solver.check_overrides(overrides, KEYS)
@@ -0,0 +1,59 @@
+"""
+design_optimizer: an interrupted run resumes from its checkpoint, and a
+checkpoint written with other settings is refused.
+
+    python -m pytest -q
+"""
+import json
+
+import pytest
+
+import design_optimizer
+
+AXES = {"L1_mm": [380.0, 400.0, 420.0], "L2_mm": [430.0, 450.0], "L3_mm": [160.0, 180.0]}
+HEADROOM = (0.0, 0.1, 0.2)
+
+
+def optimize(path, axes=AXES, workers=1, **options):
+    evaluated = []
+    result = design_optimizer.optimize(
+        axes, str(path), headroom=HEADROOM, workers=workers, chunk_size=1,
+        progress=lambda done, total: evaluated.append(done), **options)
+    return result, len(evaluated)
+
+
+def test_resume_evaluates_only_missing_candidates(tmp_path):
+    expected, evaluated = optimize(tmp_path / "full.jsonl")
+    assert evaluated == expected["candidates"] == 12
+    assert expected["front"] and expected["best"] == expected["front"][0]
+
+    # Interrupted after part of the grid, with a half-written last line
+    path = tmp_path / "resumed.jsonl"
+    optimize(path, axes={**AXES, "L1_mm": [380.0, 400.0]})
+    with open(path) as f:
+        lines = f.readlines()
+    assert len(lines) == 1 + 8
+    with open(path, "w") as f:
+        f.writelines(lines[:-1])
+        f.write(lines[-1][:20])
+
+    result, evaluated = optimize(path)
+    assert evaluated == 12 - 7
+    assert result == expected
+    with open(path) as f:
+        assert all(json.loads(line) for line in f)
+
+
+def test_workers_do_not_change_the_result(tmp_path):
+    assert optimize(tmp_path / "a.jsonl", workers=2)[0] == optimize(tmp_path / "b.jsonl")[0]
+
+
+def test_checkpoint_with_other_settings_is_refused(tmp_path):
+    path = tmp_path / "run.jsonl"
+    optimize(path, axes={**AXES, "L1_mm": [400.0]})
+    with pytest.raises(ValueError, match="different settings"):
+        optimize(path, inputs={"rock_mass": 5.0})
+    with pytest.raises(ValueError, match="different settings"):
+        optimize(path, scale_masses=False)
+    # The refused runs left the checkpoint alone
+    assert optimize(path, axes={**AXES, "L1_mm": [400.0]})[1] == 0
@@ -0,0 +1,27 @@
+"""
+montecarlo: results depend on the seed, not on the number of workers.
+
+    python -m pytest -q
+"""
+import pytest
+
+import montecarlo
+
+
+def run(workers, **options):
+    report = montecarlo.run_monte_carlo(samples=12_000, batch_size=1000, workers=workers,
+                                        min_samples=4000, **options)
+    report.pop("elapsed_s")
+    return report
+
+
+@pytest.mark.parametrize("options", [
+    {"seed": 3},
+    # Loose tolerances: stops early, at the same batch for every worker count
+    {"seed": 3, "reach_tol_mm": 50.0, "prob_tol": 0.5},
+])
+def test_report_does_not_depend_on_workers(options, tmp_path, monkeypatch):
+    monkeypatch.setenv("ARM_WORKSPACE_CACHE", str(tmp_path))
+    serial = run(1, **options)
+    assert serial == run(2, **options) == run(3, **options)
+    assert run(1, **{**options, "seed": 4}) != serial
@@ -0,0 +1,37 @@
+"""
+payload_envelope: the heaviest rock at each reach agrees with find_max_x
+run with that rock.
+
+    python -m pytest -q
+"""
+import math
+
+import numpy as np
+import pytest
+
+import arm_solver
+from payload_envelope import payload_envelope
+
+L_M = 0.400, 0.450, 0.180
+ARM_MASSES = (0.367, 0.44, 0.15, 1.09, 0.82)
+
+
+@pytest.mark.parametrize("limits", [(33.0, 21.0), (60.0, 15.0), (12.0, 30.0)])
+def test_envelope_matches_find_max_x(limits):
+    reach_m, max_rock = payload_envelope(*L_M, *ARM_MASSES, *limits)
+    assert reach_m[0] == 0.0 and reach_m[-1] == pytest.approx(sum(L_M))
+    finite = np.isfinite(max_rock)
+    assert finite.any()
+    # Heavier rocks never reach further
+    assert np.all(np.diff(max_rock[finite]) <= 0)
+    for reach, rock in list(zip(reach_m[finite], max_rock[finite]))[::7]:
+        # The envelope's rock still reaches this far, a heavier one does not
+        lighter = arm_solver.find_max_x(*L_M, *ARM_MASSES, rock * (1 - 1e-9), *limits)[0]
+        heavier = arm_solver.find_max_x(*L_M, *ARM_MASSES, rock * (1 + 1e-6) + 1e-6,
+                                        *limits)[0]
+        assert lighter >= reach
+        assert heavier < reach or math.isclose(heavier, reach)
+    # Beyond the envelope, not even an empty gripper reaches
+    last = int(np.nonzero(finite)[0][-1])
+    if last + 1 < reach_m.size:
+        assert arm_solver.find_max_x(*L_M, *ARM_MASSES, 0.0, *limits)[0] < reach_m[last + 1]
@@ -0,0 +1,70 @@
+"""
+pose_batch: the torque matrix matches the scalar Scenario 1 torques, and a
+wrist out of reach marks its row instead of stopping the batch.
+
+    python -m pytest -q
+"""
+import json
+
+import numpy as np
+import pytest
+
+import arm_solver
+import pose_batch
+
+MASS_SETS = [(0.367, 0.44, 0.15, 1.09, 0.82, 4.0), (0.4, 0.5, 0.2, 1.0, 0.8, 9.0)]
+
+
+def write(path, text):
+    path.write_text(text)
+    return str(path)
+
+
+def test_matrix_matches_scalar_torques():
+    poses = [arm_solver.SCENARIO1_POSE, arm_solver.scenario1_pose((35.0, 25.0), -60.0)]
+    batch = pose_batch.PoseBatch(poses, MASS_SETS, 33.0, 21.0)
+    assert batch.shoulder_torque.shape == (2, 2)
+    for m, masses in enumerate(MASS_SETS):
+        assert (batch.shoulder_torque[0, m], batch.elbow_torque[0, m]) == pytest.approx(
+            arm_solver.calculate_scenario1_torques(*masses), abs=1e-12)
+    row = batch.row(3)
+    assert (row["pose"], row["mass_set"], row["reachable"]) == (1, 1, True)
+    assert row["shoulder_over"] == (abs(row["shoulder_torque"]) > 33.0)
+
+
+def test_unreachable_wrist_is_marked_not_fatal(tmp_path):
+    poses = write(tmp_path / "poses.csv",
+                  "name,wrist_x_cm,wrist_y_cm\nref,40,18\nfar,200,18\nnear,35,25\n")
+    errors = []
+    batch = pose_batch.load_batch(poses, errors=errors)
+    assert errors == [f"{poses}, pose far: wrist (200, 18) cm is out of reach"]
+    assert batch.reachable.tolist() == [True, False, True]
+    assert np.isnan(batch.shoulder_torque[1]).all() and not batch.violations[1].any()
+    inputs = arm_solver.default_inputs()
+    assert batch.row(0)["shoulder_torque"] == pytest.approx(arm_solver.calculate_scenario1_torques(
+        *(inputs[key] for key in arm_solver.MASS_KEYS))[0], abs=1e-12)
+
+    summary = batch.summary()
+    assert summary["unreachable_poses"] == ["far"]
+    assert summary["safe_poses"] <= 2
+    assert summary["max_abs_shoulder_torque_nm"] == pytest.approx(
+        np.nanmax(np.abs(batch.shoulder_torque)))
+    json.dumps(summary, allow_nan=False)
+
+
+def test_all_unreachable_summary_is_valid_json(tmp_path):
+    poses = write(tmp_path / "poses.csv", "wrist_x_cm,wrist_y_cm\n200,18\n")
+    summary = pose_batch.load_batch(poses).summary()
+    assert summary["safe_poses"] == 0
+    assert summary["max_abs_elbow_torque_nm"] is None
+    json.dumps(summary, allow_nan=False)
+
+
+def test_cli_reports_unreachable_poses(tmp_path, capsys):
+    poses = write(tmp_path / "far.csv", "wrist_x_cm,wrist_y_cm\n40,18\n200,18\n")
+    out = tmp_path / "torques.csv"
+    assert pose_batch.main([poses, "--out", str(out), "--rock_mass", "0"]) == 1
+    captured = capsys.readouterr()
+    assert json.loads(captured.out)["unreachable_poses"] == ["1"]
+    assert "pose 1: wrist (200, 18) cm is out of reach" in captured.err
+    assert out.read_text().splitlines()[2].startswith("1,inputs,nan,nan,0,0")
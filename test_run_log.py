@@ -0,0 +1,69 @@
+"""
+run_log: files that cannot be appended to roll over to a fresh name, and a
+failing background writer counts what it dropped.
+
+    python -m pytest -q
+"""
+import json
+import os
+
+import arm_solver
+import run_log
+
+
+def record():
+    inputs = arm_solver.default_inputs()
+    result = arm_solver.solve_scenarios(inputs)
+    return run_log.make_record(inputs, arm_solver.DEFAULT_LENGTHS_MM, result, timestamp=0.0)
+
+
+def test_csv_log_rolls_over_on_other_columns(tmp_path):
+    path = str(tmp_path / "log.csv")
+    (tmp_path / "log.csv").write_text("a,b\n1,2\n")
+    os.mkdir(tmp_path / "log_2.csv")
+    log = run_log.CsvRunLog(path)
+    log.write([record()])
+    log.close()
+    assert log.location == str(tmp_path / "log_3.csv")
+    # Same columns: appended to
+    again = run_log.CsvRunLog(path)
+    assert again.location == log.location
+    again.close()
+
+
+def test_columnar_log_rolls_over_on_unreadable_schema(tmp_path):
+    directory = tmp_path / "cols"
+    directory.mkdir()
+    (directory / "schema.json").write_text("{not json")
+    (tmp_path / "cols_2").write_text("a plain file")
+    other = tmp_path / "cols_3"
+    other.mkdir()
+    (other / "schema.json").write_text(json.dumps({"version": -1}))
+    log = run_log.ColumnarRunLog(str(directory))
+    log.write([record(), record()])
+    log.close()
+    assert log.location == str(tmp_path / "cols_4")
+    schema, columns = run_log.load_columnar(log.location)
+    assert len(columns["max_x_mm"]) == 2
+    assert columns["max_x_mm"][0] == record()["max_x_mm"]
+
+
+def test_background_log_counts_dropped_records():
+    class FullDisk:
+        location = "nowhere"
+
+        def write(self, records):
+            raise OSError("disk full")
+
+        def flush(self):
+            pass
+
+        def close(self):
+            pass
+
+    log = run_log.BackgroundRunLog(FullDisk())
+    for _ in range(3):
+        log.log(record())
+    log.close()
+    assert str(log.error) == "disk full"
+    assert log.dropped == 3
@@ -0,0 +1,62 @@
+"""
+SolveScheduler: results reach the UI thread only for the newest request.
+
+    python -m pytest -q
+"""
+import threading
+import time
+
+from solve_scheduler import SolveScheduler
+
+
+class FakeWidget:
+    """Stands in for Tk: after() callbacks run when run_pending() is called."""
+
+    def __init__(self):
+        self.callbacks = {}
+        self.next_id = 0
+
+    def after(self, ms, callback):
+        self.next_id += 1
+        self.callbacks[self.next_id] = callback
+        return self.next_id
+
+    def after_cancel(self, after_id):
+        self.callbacks.pop(after_id, None)
+
+    def run_pending(self):
+        callbacks, self.callbacks = self.callbacks, {}
+        for callback in callbacks.values():
+            callback()
+
+
+def test_scheduler_drops_stale_results():
+    widget = FakeWidget()
+    release = threading.Event()
+    started = threading.Event()
+    solved, delivered = [], []
+
+    def solve(request):
+        started.set()
+        if request == "old":
+            release.wait(5)
+        solved.append(request)
+        return request.upper()
+
+    scheduler = SolveScheduler(widget, solve, lambda req, res: delivered.append((req, res)))
+    try:
+        scheduler.submit("old")
+        widget.run_pending()          # dispatch "old"; the worker blocks on it
+        assert started.wait(5)
+        scheduler.submit("new")
+        widget.run_pending()          # dispatch "new" (and poll: nothing yet)
+        release.set()
+        deadline = time.monotonic() + 5
+        while scheduler.busy() or widget.callbacks:
+            assert time.monotonic() < deadline
+            widget.run_pending()
+            time.sleep(0.001)
+    finally:
+        scheduler.close()
+    assert solved == ["old", "new"]
+    assert delivered == [("new", "NEW")]
@@ -0,0 +1,62 @@
+"""
+trajectory: violation runs across chunk boundaries and the CSV reader.
+
+    python -m pytest -q
+"""
+import numpy as np
+import pytest
+
+import trajectory
+
+
+def violation_runs(over, chunk):
+    runs = trajectory.ViolationRuns("shoulder")
+    index = np.arange(over.size)
+    torque = np.where(over, 1.0 + index, 0.0)
+    found = []
+    for start in range(0, over.size, chunk):
+        part = slice(start, start + chunk)
+        found += runs.feed(index[part], index[part] * 0.01, over[part], torque[part])
+    return found + runs.finish()
+
+
+@pytest.mark.parametrize("chunk", [1, 2, 3, 5, 7, 64])
+def test_violation_runs_do_not_split_at_chunk_boundaries(chunk):
+    over = np.zeros(40, dtype=bool)
+    over[[0, 1, 2, 6, 7, 8, 9, 10, 11, 20, 33, 34, 35, 36, 37, 38, 39]] = True
+    expected = violation_runs(over, over.size)
+    assert [(r["start_index"], r["end_index"], r["samples"]) for r in expected] == [
+        (0, 2, 3), (6, 11, 6), (20, 20, 1), (33, 39, 7)]
+    assert violation_runs(over, chunk) == expected
+
+
+def test_csv_reader_parses_only_trajectory_columns(tmp_path):
+    path = tmp_path / "run.csv"
+    path.write_text('label,time,t1,t2,stamp\n'
+                    'a,0.0,-0.7,1.7,"2026-01-01T00:00:00, UTC"\n'
+                    'b,0.1,-0.6,1.6,2026-01-01T00:00:01\n'
+                    'c,0.2,-0.5,1.5,2026-01-01T00:00:02\n')
+    chunks = list(trajectory.read_chunks(str(path), chunk_size=2))
+    assert [start for _, start in chunks] == [0, 2]
+    assert set(chunks[0][0]) == {"time", "t1", "t2"}
+    np.testing.assert_array_equal(
+        np.concatenate([chunk["t2"] for chunk, _ in chunks]), [1.7, 1.6, 1.5])
+
+
+def test_csv_reader_skips_blank_lines(tmp_path):
+    path = tmp_path / "run.csv"
+    path.write_text("t1,t2\n-0.5,1.5\n\n-0.4,1.4\n\n\n\n")
+    chunks = list(trajectory.read_chunks(str(path), chunk_size=2))
+    assert [start for _, start in chunks] == [0, 1]
+    summary = trajectory.check_trajectory(str(path), chunk_size=2)
+    assert summary["samples"] == 2
+
+
+def test_csv_reader_errors(tmp_path):
+    path = tmp_path / "run.csv"
+    path.write_text("a,b\n1,2\n")
+    with pytest.raises(ValueError, match="none of the columns"):
+        list(trajectory.read_chunks(str(path)))
+    path.write_text("t1,t2\n1,x\n")
+    with pytest.raises(ValueError, match="could not convert"):
+        list(trajectory.read_chunks(str(path)))
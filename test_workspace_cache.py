@@ -0,0 +1,56 @@
+"""
+WorkspaceStore: a saved workspace table loads back memory-mapped and
+solves exactly like a freshly built one.
+
+    python -m pytest -q
+"""
+import os
+
+import numpy as np
+
+import arm_solver
+import workspace_cache
+
+L_M = 0.400, 0.450, 0.180
+MASSES = np.array((0.367, 0.44, 0.15, 1.09, 0.82, 4.0))
+
+
+def test_store_round_trip(tmp_path):
+    store = workspace_cache.WorkspaceStore(str(tmp_path))
+    built = arm_solver.ReachGeometry(*L_M)
+    first = store.get(*L_M)
+    assert (store.hits, store.misses) == (0, 1)
+    assert os.path.exists(store.path(*L_M))
+
+    # A second store (another session) maps the same file
+    other = workspace_cache.WorkspaceStore(str(tmp_path))
+    loaded = other.get(*L_M)
+    assert (other.hits, other.misses) == (1, 0)
+    assert isinstance(loaded.x_end, np.memmap)
+    for geometry in (first, loaded):
+        assert geometry.key == built.key
+        np.testing.assert_array_equal(geometry.to_table(), built.to_table())
+        for limits in ((33.0, 21.0), (20.0, 10.0), (5.0, 2.0)):
+            assert geometry.solve(MASSES, *limits) == built.solve(MASSES, *limits)
+
+
+def test_store_keys_and_clear(tmp_path):
+    store = workspace_cache.WorkspaceStore(str(tmp_path))
+    paths = {store.path(*L_M), store.path(*L_M, resolution_deg=0.5),
+             store.path(0.401, 0.450, 0.180)}
+    assert len(paths) == 3
+    assert store.load(*L_M) is None
+    store.get(*L_M)
+    store.clear()
+    assert os.listdir(tmp_path) == []
+
+
+def test_store_rebuilds_a_corrupt_table(tmp_path):
+    store = workspace_cache.WorkspaceStore(str(tmp_path))
+    with open(store.path(*L_M), "wb") as f:
+        f.write(b"not a table")
+    assert store.load(*L_M) is None
+    geometry = store.get(*L_M)
+    assert store.misses == 1
+    assert geometry.solve(MASSES, 33.0, 21.0) == arm_solver.find_max_x_scalar(
+        *L_M, *MASSES, 33.0, 21.0)
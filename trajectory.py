@@ -0,0 +1,271 @@
+"""
+Streaming torque check of recorded joint-angle trajectories.
+
+A trajectory is a CSV file with a header naming its columns (t1, t2 and
+optionally t3 and time, all numeric; other columns, e.g. labels, are
+ignored and never parsed) or an (n, k) .npy array
+whose columns are named with ``columns``. It is read ``chunk_size`` samples
+at a time, the shoulder/elbow torques of every sample are computed with the
+calculate_torques model in one vectorized pass per chunk, and the results
+are streamed out, so memory stays constant however long the recording is:
+
+    python trajectory.py telemetry.csv --torques torques.csv \\
+        --intervals violations.csv --rock_mass 5 --degrees
+
+The torque file gets one row per sample; the interval file one row per run
+of consecutive samples above a joint's limit, with its peak torque. The
+command exits with status 1 if any limit is exceeded.
+"""
+import argparse
+import contextlib
+import csv
+import itertools
+import json
+import sys
+import time
+
+import numpy as np
+
+import arm_solver
+
+# Column names of a .npy trajectory without ``columns``, by column count
+DEFAULT_COLUMNS = {
+    2: ("t1", "t2"),
+    3: ("t1", "t2", "t3"),
+    4: ("time", "t1", "t2", "t3"),
+}
+# The only CSV columns read
+TRAJECTORY_COLUMNS = ("time", "t1", "t2", "t3")
+TORQUE_HEADER = ("index", "time", "shoulder_torque", "elbow_torque",
+                 "shoulder_over", "elbow_over")
+INTERVAL_HEADER = ("joint", "start_index", "end_index", "start_time", "end_time",
+                   "samples", "peak_torque")
+
+
+# -------------------------------------------------------------------------
+# READING
+# -------------------------------------------------------------------------
+def read_chunks(path, chunk_size=65536, columns=None):
+    """
+    Yield ({column: array}, start_index) for consecutive chunks of the
+    trajectory at ``path``. ``columns`` names the columns of a .npy file
+    (default: DEFAULT_COLUMNS for its column count) or overrides the CSV
+    header; only the TRAJECTORY_COLUMNS of a CSV file are parsed, and blank
+    lines are skipped.
+    """
+    if path.endswith(".npy"):
+        data = np.load(path, mmap_mode="r")
+        if data.ndim == 1:
+            data = data[:, None]
+        if columns is None and data.shape[1] not in DEFAULT_COLUMNS:
+            raise ValueError(f"{path} has {data.shape[1]} columns; pass their names (--columns)")
+        names = list(columns or DEFAULT_COLUMNS[data.shape[1]])
+        if len(names) != data.shape[1]:
+            raise ValueError(f"{path} has {data.shape[1]} columns, got names {names}")
+        for start in range(0, data.shape[0], chunk_size):
+            chunk = np.asarray(data[start:start + chunk_size], dtype=float)
+            yield dict(zip(names, chunk.T)), start
+        return
+
+    with open(path, newline="") as f:
+        header = next(csv.reader([f.readline()]))
+        names = list(columns or [name.strip() for name in header])
+        usecols = [i for i, name in enumerate(names) if name in TRAJECTORY_COLUMNS]
+        if not usecols:
+            raise ValueError(f"{path} has none of the columns {', '.join(TRAJECTORY_COLUMNS)}")
+        used = [names[i] for i in usecols]
+        start = 0
+        while True:
+            lines = list(itertools.islice(f, chunk_size))
+            if not lines:
+                return
+            lines = [line for line in lines if line.strip()]
+            if not lines:
+                continue
+            try:
+                chunk = np.loadtxt(lines, delimiter=",", usecols=usecols, ndmin=2,
+                                   quotechar='"')
+            except ValueError as exc:
+                raise ValueError(f"{path}, chunk from sample {start}: {exc}") from None
+            yield dict(zip(used, chunk.T)), start
+            start += chunk.shape[0]
+
+
+# -------------------------------------------------------------------------
+# VIOLATION INTERVALS
+# -------------------------------------------------------------------------
+class ViolationRuns:
+    """
+    Turn a stream of per-sample "over the limit" masks for one joint into
+    closed intervals. A run still open at the end of a chunk is carried
+    into the next one, so intervals never split at chunk boundaries.
+    """
+
+    def __init__(self, joint):
+        self.joint = joint
+        self.open = None
+
+    def feed(self, index, times, over, torque):
+        """Consume one chunk and return the intervals it closed."""
+        closed = []
+        edges = np.diff(np.concatenate(([0], over.astype(np.int8), [0])))
+        starts = np.nonzero(edges == 1)[0]
+        ends = np.nonzero(edges == -1)[0]
+        if self.open is not None and not (over.size and over[0]):
+            closed.append(self.open)
+            self.open = None
+        for s, e in zip(starts, ends):
+            peak = s + int(np.argmax(np.abs(torque[s:e])))
+            run = {
+                "joint": self.joint,
+                "start_index": int(index[s]),
+                "end_index": int(index[e - 1]),
+                "start_time": float(times[s]),
+                "end_time": float(times[e - 1]),
+                "samples": int(e - s),
+                "peak_torque": float(torque[peak]),
+            }
+            if s == 0 and self.open is not None:
+                previous = self.open
+                run["start_index"] = previous["start_index"]
+                run["start_time"] = previous["start_time"]
+                run["samples"] += previous["samples"]
+                if abs(previous["peak_torque"]) >= abs(run["peak_torque"]):
+                    run["peak_torque"] = previous["peak_torque"]
+                self.open = None
+            if e == over.size:
+                self.open = run
+            else:
+                closed.append(run)
+        return closed
+
+    def finish(self):
+        """Return the run still open at the end of the stream, if any."""
+        closed, self.open = ([self.open] if self.open else []), None
+        return closed
+
+
+# -------------------------------------------------------------------------
+# PIPELINE
+# -------------------------------------------------------------------------
+def check_trajectory(path, inputs=None, lengths_mm=arm_solver.DEFAULT_LENGTHS_MM,
+                     torques_path=None, intervals_path=None, degrees=False,
+                     columns=None, chunk_size=65536, progress=None):
+    """
+    Evaluate the shoulder/elbow torque of every sample of the trajectory at
+    ``path`` for the masses and limits in ``inputs`` (default: GUI
+    defaults) and link lengths in mm.
+
+    Per-sample torques are streamed to ``torques_path`` and violation
+    intervals to ``intervals_path`` (both CSV, optional). Missing t3 means
+    link3 hangs straight down (T3); missing time uses the sample index.
+    ``progress(samples)`` is called after each chunk. Returns a summary
+    dict (sample count, peak torques, violating samples and intervals per
+    joint).
+    """
+    inputs = {**arm_solver.default_inputs(), **(inputs or {})}
+    masses = [inputs[key] for key in arm_solver.MASS_KEYS]
+    limits = {"shoulder": inputs["shoulder_limit"], "elbow": inputs["elbow_limit"]}
+    L_m = [L / 1000.0 for L in lengths_mm]
+    scale = np.pi / 180.0 if degrees else 1.0
+    runs = {joint: ViolationRuns(joint) for joint in limits}
+    summary = {
+        "samples": 0,
+        **{f"{joint}_peak_torque": 0.0 for joint in limits},
+        **{f"{joint}_over_samples": 0 for joint in limits},
+        **{f"{joint}_intervals": 0 for joint in limits},
+    }
+
+    with contextlib.ExitStack() as stack:
+        torques_file, intervals_file = (
+            stack.enter_context(open(p, "w", newline="")) if p else None
+            for p in (torques_path, intervals_path))
+        if torques_file:
+            torques_file.write(",".join(TORQUE_HEADER) + "\n")
+        intervals_writer = None
+        if intervals_file:
+            intervals_writer = csv.DictWriter(intervals_file, INTERVAL_HEADER)
+            intervals_writer.writeheader()
+
+        def emit(intervals):
+            for interval in intervals:
+                summary[f"{interval['joint']}_intervals"] += 1
+                if intervals_writer:
+                    intervals_writer.writerow(interval)
+
+        for chunk, start in read_chunks(path, chunk_size, columns):
+            missing = {"t1", "t2"} - set(chunk)
+            if missing:
+                raise ValueError(f"{path}: missing column(s) {sorted(missing)}")
+            n = chunk["t1"].size
+            index = np.arange(start, start + n)
+            times = chunk.get("time", index.astype(float))
+            t3 = chunk["t3"] * scale if "t3" in chunk else arm_solver.T3
+            torque = dict(zip(limits, arm_solver.calculate_torques_array(
+                chunk["t1"] * scale, chunk["t2"] * scale, t3, *L_m, *masses)))
+            over = {joint: np.abs(torque[joint]) > limit
+                    for joint, limit in limits.items()}
+
+            for joint in limits:
+                peak = torque[joint][np.argmax(np.abs(torque[joint]))]
+                if abs(peak) > abs(summary[f"{joint}_peak_torque"]):
+                    summary[f"{joint}_peak_torque"] = float(peak)
+                summary[f"{joint}_over_samples"] += int(over[joint].sum())
+                emit(runs[joint].feed(index, times, over[joint], torque[joint]))
+            if torques_file:
+                np.savetxt(torques_file, np.column_stack(
+                    (index, times, torque["shoulder"], torque["elbow"],
+                     over["shoulder"], over["elbow"])),
+                    fmt=("%d", "%.9g", "%.6f", "%.6f", "%d", "%d"), delimiter=",")
+            summary["samples"] += n
+            if progress:
+                progress(summary["samples"])
+
+        for joint in limits:
+            emit(runs[joint].finish())
+    return summary
+
+
+# -------------------------------------------------------------------------
+# COMMAND LINE
+# -------------------------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("trajectory", help="CSV with a header, or .npy")
+    parser.add_argument("--torques", metavar="CSV", help="per-sample torque output")
+    parser.add_argument("--intervals", metavar="CSV", help="violation interval output")
+    parser.add_argument("--degrees", action="store_true",
+                        help="angles are in degrees (default radians)")
+    parser.add_argument("--columns",
+                        help="comma-separated column names (for .npy input or "
+                             "to override the CSV header)")
+    parser.add_argument("--chunk-size", type=int, default=65536)
+    arm_solver.add_arm_arguments(parser)
+    args = parser.parse_args(argv)
+
+    inputs = {key: getattr(args, key) for key in arm_solver.INPUT_KEYS}
+    lengths_mm = tuple(getattr(args, key) for key in arm_solver.LENGTH_KEYS)
+    start = time.perf_counter()
+
+    def progress(samples):
+        print(f"\r{samples} samples", end="", file=sys.stderr, flush=True)
+
+    try:
+        summary = check_trajectory(
+            args.trajectory, inputs, lengths_mm,
+            torques_path=args.torques, intervals_path=args.intervals,
+            degrees=args.degrees,
+            columns=args.columns.split(",") if args.columns else None,
+            chunk_size=args.chunk_size, progress=progress)
+    except ValueError as exc:
+        parser.error(str(exc))
+    elapsed = time.perf_counter() - start
+    print(f"\n{summary['samples']} samples in {elapsed:.2f} s "
+          f"({summary['samples'] / max(elapsed, 1e-9):,.0f} samples/s)", file=sys.stderr)
+    json.dump(summary, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return 1 if any(summary[f"{j}_intervals"] for j in ("shoulder", "elbow")) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
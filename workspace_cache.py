@@ -0,0 +1,119 @@
+"""
+Persistent, memory-mapped cache of the Scenario 2 workspace table.
+
+For a given arm geometry and grid resolution the poses find_max_x considers
+(the yB band filter survivors), their end-effector X and their lever arms
+never change. WorkspaceStore writes that table (ReachGeometry.to_table) once
+to a versioned .npy file and later opens it with mmap_mode="r", so the first
+solve of a new session or process pays no recompute and all processes using
+the same file share its pages.
+
+    import workspace_cache
+    workspace_cache.enable()      # arm_solver.GEOMETRY_CACHE now uses the disk
+"""
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+
+import arm_solver
+
+# Bump whenever the table layout or the band filter changes
+FORMAT_VERSION = 2
+ENV_CACHE_DIR = "ARM_WORKSPACE_CACHE"
+
+
+def default_cache_dir():
+    """$ARM_WORKSPACE_CACHE, else ~/.cache/robotic_arm_workspace."""
+    return os.environ.get(ENV_CACHE_DIR) or os.path.join(
+        os.path.expanduser("~"), ".cache", "robotic_arm_workspace")
+
+
+def cache_key(L1_m, L2_m, L3_m, resolution_deg):
+    """Everything the table depends on, as a JSON-serializable dict."""
+    return {
+        "version": FORMAT_VERSION,
+        "lengths_m": [float(L1_m), float(L2_m), float(L3_m)],
+        "resolution_deg": float(resolution_deg),
+        "t1_range_deg": [arm_solver.T1_RANGE_DEG[0], arm_solver.T1_RANGE_DEG[-1]],
+        "t2_range_deg": [arm_solver.T2_RANGE_DEG[0], arm_solver.T2_RANGE_DEG[-1]],
+        "t3": arm_solver.T3,
+        "yb_target": arm_solver.YB_TARGET,
+        "yb_tolerance": arm_solver.YB_TOLERANCE,
+        "g": arm_solver.G,
+    }
+
+
+class WorkspaceStore:
+    """Load ReachGeometry tables from ``cache_dir``, building missing ones."""
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, L1_m, L2_m, L3_m, resolution_deg=1):
+        key = json.dumps(cache_key(L1_m, L2_m, L3_m, resolution_deg), sort_keys=True)
+        digest = hashlib.sha1(key.encode()).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"workspace_v{FORMAT_VERSION}_{digest}.npy")
+
+    def load(self, L1_m, L2_m, L3_m, resolution_deg=1):
+        """Return the memory-mapped geometry, or None if it is not cached."""
+        try:
+            table = np.load(self.path(L1_m, L2_m, L3_m, resolution_deg), mmap_mode="r")
+            return arm_solver.ReachGeometry.from_table(
+                L1_m, L2_m, L3_m, resolution_deg, table)
+        except (OSError, ValueError):
+            return None
+
+    def save(self, geometry):
+        """
+        Write ``geometry`` atomically (temp file + rename), so concurrent
+        processes never see a partial table. Returns the path.
+        """
+        path = self.path(*geometry.lengths, geometry.resolution_deg)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, geometry.to_table())
+            os.chmod(tmp, 0o644)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        return path
+
+    def get(self, L1_m, L2_m, L3_m, resolution_deg=1):
+        """Return the cached geometry, building and saving it on a miss."""
+        geometry = self.load(L1_m, L2_m, L3_m, resolution_deg)
+        if geometry is not None:
+            self.hits += 1
+            return geometry
+        self.misses += 1
+        geometry = arm_solver.ReachGeometry(L1_m, L2_m, L3_m, resolution_deg)
+        try:
+            self.save(geometry)
+        except OSError:
+            # A read-only or full disk only costs us the cache
+            return geometry
+        return self.load(L1_m, L2_m, L3_m, resolution_deg) or geometry
+
+    def clear(self):
+        """Delete every cached table of the current format version."""
+        if not os.path.isdir(self.cache_dir):
+            return
+        prefix = f"workspace_v{FORMAT_VERSION}_"
+        for name in os.listdir(self.cache_dir):
+            if name.startswith(prefix) and name.endswith(".npy"):
+                os.unlink(os.path.join(self.cache_dir, name))
+
+
+def enable(cache_dir=None):
+    """Back arm_solver.GEOMETRY_CACHE with a WorkspaceStore and return it."""
+    store = WorkspaceStore(cache_dir)
+    arm_solver.GEOMETRY_CACHE.store = store
+    arm_solver.GEOMETRY_CACHE.clear()
+    return store